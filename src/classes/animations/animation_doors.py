@@ -48,8 +48,7 @@ class animationDoors(object):
         - animationTime[int]: Animation time from start in milliseconds
         - sequencePosition [np.array]: Positions for the door for the animation frames
         - framesNumber [int]: Total number of animation frames
-        - sequenceTime [int]: Total animation running time in milliseconds
-        - sequenceCurrentFrame [int]: Current frame position within the sequencePosition-Array
+        - sequenceCurrentFrame [int]: Current frame position within the sequencePosition-Array. Frame i is shown from i * timePerPixel milliseconds on
         
     Methods:
         - startAnimation(onClick [bool]): Setup the animation, onClick is true if the player started the animation manually
@@ -114,7 +113,6 @@ class animationDoors(object):
         
                 # Finish animation definition
                 self.framesNumber = len(self.sequencePosition)  # Number of frames remaining
-                self.sequenceTime = np.arange(self.framesNumber) * self.timePerPixel    # Total animation running time
                 self.sequenceCurrentFrame = -1
 
                 # Set the animation to running
@@ -140,7 +138,7 @@ class animationDoors(object):
             ##
             # Update time and the current frame selection
             self.animationTime += dt
-            currentFrame = max(np.where(self.sequenceTime <= self.animationTime)[0])    
+            currentFrame = min(self.animationTime // self.timePerPixel, self.framesNumber - 1)
                         
             ##
             # Check if a framechange happened
@@ -0,0 +1,97 @@
+###
+#
+# Scheduler which advances all running animations on a common timeline
+#
+###
+
+
+###
+# Load packages
+
+# Logging
+import logging
+
+# Typing
+from typing import Dict, Hashable
+
+
+###
+# Setup logging
+logger = logging.getLogger(__name__)
+
+
+###
+# Animation scheduler definition
+class animationScheduler(object):
+    """
+    
+    Keeps track of the running animations and only advances those. Animations are grouped (e.g. 'Doors') and identified by a key within their group (e.g. the doorKey).
+    Any animation object can be scheduled if it provides the field stillRunning [bool] and the method updateAnimation(dt [int]) returning whether its frame changed.
+    Finished animations are removed from the active set automatically.
+    
+    Fields:
+        - activeAnimations [Dict]: Running animations, key: (group, key)
+        - time [int]: Time of the timeline in milliseconds, advanced by every update
+    
+    Methods:
+        - startAnimation(group [str], key [Hashable], animation, *args): Start the animation with animation.startAnimation(*args) and schedule it if it is running afterwards
+        - addAnimation(group [str], key [Hashable], animation): Schedule an animation which is already running
+        - update(dt [int]): Advance all running animations by dt milliseconds. Returns a dictionary group:list of keys of the animations whose frame changed
+        - isRunning(group [str], key [Hashable]): Returns whether the animation is scheduled
+    
+    """
+    
+    
+    ###
+    # Initialization
+    def __init__(self) -> None:
+        logger.debug('Initialize the animation scheduler')
+        
+        self.activeAnimations = dict()
+        self.time = 0
+    
+    
+    ###
+    # Start an animation and schedule it if it runs
+    def startAnimation(self, group: str, key: Hashable, animation, *args) -> None:
+        animation.startAnimation(*args)
+        
+        if animation.stillRunning:
+            self.activeAnimations[(group, key)] = animation
+    
+    
+    ###
+    # Schedule a running animation
+    def addAnimation(self, group: str, key: Hashable, animation) -> None:
+        if animation.stillRunning:
+            self.activeAnimations[(group, key)] = animation
+    
+    
+    ###
+    # Advance the running animations
+    def update(self, dt: int) -> Dict:
+        self.time += dt
+        
+        ###
+        # Collect the changed animations per group, remove the finished ones
+        changedAnimations = dict()
+        for (group, key), animation in list(self.activeAnimations.items()):
+            if animation.updateAnimation(dt):
+                changedAnimations.setdefault(group, list()).append(key)
+            
+            if not animation.stillRunning:
+                del self.activeAnimations[(group, key)]
+        
+        return(changedAnimations)
+    
+    
+    ###
+    # Check whether an animation is scheduled
+    def isRunning(self, group: str, key: Hashable) -> bool:
+        return((group, key) in self.activeAnimations)
+    
+    
+    ###
+    # Number of running animations
+    def __len__(self) -> int:
+        return(len(self.activeAnimations))
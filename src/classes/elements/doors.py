@@ -21,23 +21,41 @@ import numpy as np
 import pygame
 
 
+###
+# Import ressources
+
+# Cache for the rendered images
+import src.classes.elements.image_cache as imageCache
+
+# State arrays
+import src.classes.ships.ship_state as shipState
+
+
 ###
 # Setup logging
 logger = logging.getLogger(__name__)
 
 
+###
+# Rendered door images shared between all the doors of all ships. They only depend on the orientation, the level and how far the door is opened
+sharedDoorImages = imageCache.imageCache('door', 500)
+
+
 ###
 # Define the room class
 class door(object):
     """
     
     Object which controls and returns the sprites for a given door. The active sprite is always found in the field currentSprite.
+    Its image references one of the door images shared through the module level cache sharedDoorImages and must not be drawn onto.
+    Headless doors (simulation without display) never select or draw an image.
+    The position, level, hacked and bashed state of the door (fields currentPosition, level, hacked, bashed) are stored in the state arrays (fields state and stateIndex), which are shared with the ship once the door is added to it with shareState(state, stateIndex).
     
     """
     
     ###
     # Initialize
-    def __init__(self, doorKey: str, vertical: bool, parameters: Dict, field1: Tuple, field2: Tuple, field1Roomkey: int, field2Roomkey: int, level: int, canvCoord: np.ndarray, hacked: bool = False, currentPosition: int = 0, bashed: bool = False):
+    def __init__(self, doorKey: str, vertical: bool, parameters: Dict, field1: Tuple, field2: Tuple, field1Roomkey: int, field2Roomkey: int, level: int, canvCoord: np.ndarray, hacked: bool = False, currentPosition: int = 0, bashed: bool = False, headless: bool = False):
         logger.debug('Initialize door {}'.format(doorKey))
         
         ##
@@ -56,6 +74,10 @@ class door(object):
         self.field2 = field2
         self.field2Roomkey = field2Roomkey
 
+        # Own state arrays until the door is added to the ship
+        self.state = shipState.shipState(np.array([]), np.array([doorKey]))
+        self.stateIndex = 0
+        
         # Further parameters
         self.hacked = hacked
         self.currentPosition = currentPosition
@@ -63,6 +85,8 @@ class door(object):
         
         self.bashed = bashed    # Not used yet
         self.userOpened = False
+        
+        self.headless = headless
                 
         # Check if door is connected to space
         if (self.field1Roomkey == 0) or (self.field2Roomkey == 0):
@@ -74,229 +98,232 @@ class door(object):
         self.minimumPixel = 0   # Door closed
         self.maximumPixel = self.parameters['General']['DoorHeightPixel'] - self.parameters['General']['DoorMinimumPixel']    # Door fully opened
         
-        # Create dict for the sprites
-        self.sprites = dict()
-        
-        # Create empty sprites
-        for level in range(0, 5):   # Level of doors
-            self.sprites[level] = dict()
-            for position in range(0, self.parameters['General']['DoorHeightPixel'] - self.parameters['General']['DoorMinimumPixel'] + 1): # How far is the door retracted
-                self.sprites[level][position] = pygame.sprite.Sprite()
-        
-        # Add for hacked doors
-        self.sprites['Hacked'] = dict()
-        for position in range(0, self.parameters['General']['DoorHeightPixel'] - self.parameters['General']['DoorMinimumPixel'] + 1): # How far is the door retracted
-            self.sprites['Hacked'][position] = pygame.sprite.Sprite()
+        # Position of the door on the canvas, shared by all images of the door
+        if self.vertical:
+            self.rect = pygame.Rect(canvCoord[0] - 3, canvCoord[1] + self.parameters['General']['RoomHeightPixel'] // 2 - self.parameters['General']['DoorHeightPixel'] - 1, 6, 2 * self.parameters['General']['DoorHeightPixel'] + 3)
+        else:
+            self.rect = pygame.Rect(canvCoord[0] + self.parameters['General']['RoomHeightPixel'] // 2 - self.parameters['General']['DoorHeightPixel'] - 1, canvCoord[1] - 3, 2 * self.parameters['General']['DoorHeightPixel'] + 3, 6)
             
-        # Initialize active sprite
+        # Initialize active sprite, the door images are drawn when they are needed
         self.currentSprite = pygame.sprite.Sprite()
-        
-        # Create all the sprites
-        self.drawAllDoors(canvCoord)
+        sharedDoorImages.setMaximumSize(self.parameters['General']['DoorImageCacheSize'])
         
         # Set the first sprite
         self.selectSprite()
 
 
+    ###
+    # The state of the door is stored in the state arrays
+    @property
+    def currentPosition(self) -> int:
+        return(int(self.state.doorPosition[self.stateIndex]))
+    
+    @currentPosition.setter
+    def currentPosition(self, currentPosition: int) -> None:
+        self.state.doorPosition[self.stateIndex] = currentPosition
+    
+    @property
+    def level(self) -> int:
+        return(int(self.state.doorLevel[self.stateIndex]))
+    
+    @level.setter
+    def level(self, level: int) -> None:
+        self.state.doorLevel[self.stateIndex] = level
+    
+    @property
+    def hacked(self) -> bool:
+        return(bool(self.state.doorHacked[self.stateIndex]))
+    
+    @hacked.setter
+    def hacked(self, hacked: bool) -> None:
+        self.state.doorHacked[self.stateIndex] = hacked
+    
+    @property
+    def bashed(self) -> bool:
+        return(bool(self.state.doorBashed[self.stateIndex]))
+    
+    @bashed.setter
+    def bashed(self, bashed: bool) -> None:
+        self.state.doorBashed[self.stateIndex] = bashed
+    
+    
+    ###
+    # Function to keep the state in the state arrays of the ship
+    def shareState(self, state: shipState.shipState, stateIndex: int) -> None:
+        state.doors[:, stateIndex] = self.state.doors[:, self.stateIndex]
+        
+        self.state = state
+        self.stateIndex = stateIndex
+
+
     ###
     # Function to set the current sprite based on the rooms condition
     def selectSprite(self) -> None:
+        if self.headless:
+            return
+        
         if self.hacked:
-            self.currentSprite.image = self.sprites['Hacked'][self.currentPosition].image.copy()
-            self.currentSprite.rect = self.sprites['Hacked'][self.currentPosition].rect
+            level = 'Hacked'
         else:
-            self.currentSprite.image = self.sprites[self.level][self.currentPosition].image.copy()
-            self.currentSprite.rect = self.sprites[self.level][self.currentPosition].rect
+            level = self.level
+        
+        self.currentSprite.image = sharedDoorImages.get((self.vertical, level, self.currentPosition), lambda: self.drawDoorImage(level, self.currentPosition))
+        self.currentSprite.rect = self.rect
         
 
     ###
     # Function to change all room rects
     def moveDoorRects(self, delta: np.ndarray) -> None:
         logger.debug('Move door {doorKey} by x = {x}, y = {y} pixels'.format(doorKey = str(self.doorKey), x = str(delta[0]), y = str(delta[1])))
-        for level in range(0, 5):   # Level of doors
-            for position in range(0, self.maximumPixel + 1): # How far is the door retracted
-                self.sprites[level][position].rect.topleft += delta
         
-        for position in range(0, self.maximumPixel + 1):
-            self.sprites['Hacked'][position].rect.topleft += delta
+        # All images share the same rect
+        self.rect.topleft += delta
     
     
     ###    
-    # Initial drawing of all the sprites
-    def drawAllDoors(self, canvCoord: np.ndarray):
-        # For each level of doors
-        for level in range(0, 5):   # Level of doors
-            for position in range(0, self.parameters['General']['DoorHeightPixel'] - self.parameters['General']['DoorMinimumPixel'] + 1): # How for is the door retracted
-                if self.vertical:
-                    self.sprites[level][position].image = pygame.Surface([6, 2 * self.parameters['General']['DoorHeightPixel'] + 3])
-                else:
-                    self.sprites[level][position].image = pygame.Surface([2 * self.parameters['General']['DoorHeightPixel'] + 3, 6])
-
-                self.sprites[level][position].image.fill(self.parameters['Colors']['White'])
-                self.sprites[level][position].image.set_colorkey(self.parameters['Colors']['White'])
-                
-                # Create the door wings
-                if self.vertical:
-                    if level <= 1:  # Two wings
-                        # Upper wing
-                        pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['Black'], [0, 0, 6, self.parameters['General']['DoorHeightPixel'] + 2 - position])
-                        pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['DoorLevel' + str(level)], [1, 1, 4, self.parameters['General']['DoorHeightPixel'] - position])
-        
-                        # Lower wing
-                        pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['Black'], [0, self.parameters['General']['DoorHeightPixel'] + 1 + position, 6, self.parameters['General']['DoorHeightPixel'] + 2 - position])
-                        pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['DoorLevel' + str(level)], [1, self.parameters['General']['DoorHeightPixel'] + 2 + position, 4, self.parameters['General']['DoorHeightPixel'] - position])
-                    
-                    else: 
-                        if position:    # Opened doors
-                            # Upper wing
-                            pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['Black'], [0, 0, 6, self.parameters['General']['DoorHeightPixel'] + 2 - position])
-                            pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['DoorLevel' + str(level)], [1, 1, 4, self.parameters['General']['DoorHeightPixel'] - position])
-                            
-                            # Lower wing
-                            pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['Black'], [0, self.parameters['General']['DoorHeightPixel'] + 1 + position, 6, self.parameters['General']['DoorHeightPixel'] + 2 - position])
-                            pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['DoorLevel' + str(level)], [1, self.parameters['General']['DoorHeightPixel'] + 2 + position, 4, self.parameters['General']['DoorHeightPixel'] - position])
-
-                            # Add the bars
-                            if level == 3:
-                                for i in range(0, self.parameters['General']['DoorHeightPixel'] - self.parameters['General']['DoorMinimumPixel'] - position + 1):
-                                    if (i+3)%4 == 0:
-                                        pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['DoorGreyOverlay'], [1, 1 + i, 4, 1])
-                                        pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['DoorGreyOverlay'], [1, 2 * self.parameters['General']['DoorHeightPixel'] + 1 - i, 4, 1])
-                                        
-                            elif level == 4:
-                                for i in range(0, self.parameters['General']['DoorHeightPixel'] - self.parameters['General']['DoorMinimumPixel'] - position + 1):
-                                    if (i+1)%2 == 0:
-                                        pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['DoorGreyOverlay'], [1, 1 + i, 4, 1])
-                                        pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['DoorGreyOverlay'], [1, 2 * self.parameters['General']['DoorHeightPixel'] + 1 - i, 4, 1])
-
-                        else:
-                            pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['Black'], [0, 0, 6, 2 * self.parameters['General']['DoorHeightPixel'] + 3])
-                            pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['DoorLevel' + str(level)], [1, 1, 4, 2 * self.parameters['General']['DoorHeightPixel'] + 1])
-
-                            # Add the bars
-                            if level == 3:
-                                for i in range(0, self.parameters['General']['DoorHeightPixel'] - self.parameters['General']['DoorMinimumPixel'] + 2):
-                                    if (i+3)%4 == 0:
-                                        pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['DoorGreyOverlay'], [1, 1 + i, 4, 1])
-                                        pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['DoorGreyOverlay'], [1, 2 * self.parameters['General']['DoorHeightPixel'] + 1 - i, 4, 1])
-                                        
-                            elif level == 4:
-                                for i in range(0, self.parameters['General']['DoorHeightPixel'] - self.parameters['General']['DoorMinimumPixel'] + 2):
-                                    if (i+1)%2 == 0:
-                                        pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['DoorGreyOverlay'], [1, 1 + i, 4, 1])
-                                        pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['DoorGreyOverlay'], [1, 2 * self.parameters['General']['DoorHeightPixel'] + 1 - i, 4, 1])
-                            
-
-                    
-                    # Set rect on canvas
-                    self.sprites[level][position].rect = self.sprites[level][position].image.get_rect()
-                    
-                    self.sprites[level][position].rect.x = canvCoord[0] - 3
-                    self.sprites[level][position].rect.y = canvCoord[1] + self.parameters['General']['RoomHeightPixel'] // 2 - self.parameters['General']['DoorHeightPixel'] - 1
-                
-                # Horizontal doors
-                else:
-                    if level <= 1:  # Two wings
-                        # Left wing
-                        pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['Black'], [0, 0, self.parameters['General']['DoorHeightPixel'] + 2 - position, 6])
-                        pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['DoorLevel' + str(level)], [1, 1, self.parameters['General']['DoorHeightPixel'] - position, 4])
-        
-                        # Right wing
-                        pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['Black'], [self.parameters['General']['DoorHeightPixel'] + 1 + position, 0, self.parameters['General']['DoorHeightPixel'] + 2 - position, 6])
-                        pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['DoorLevel' + str(level)], [self.parameters['General']['DoorHeightPixel'] + 2 + position, 1, self.parameters['General']['DoorHeightPixel'] - position, 4])
-
-                    else: 
-                        if position:    # Opened doors
-                            # Left wing
-                            pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['Black'], [0, 0, self.parameters['General']['DoorHeightPixel'] + 2 - position, 6])
-                            pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['DoorLevel' + str(level)], [1, 1, self.parameters['General']['DoorHeightPixel'] - position, 4])
-                            
-                            # Right wing
-                            pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['Black'], [self.parameters['General']['DoorHeightPixel'] + 1 + position, 0, self.parameters['General']['DoorHeightPixel'] + 2 - position, 6])
-                            pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['DoorLevel' + str(level)], [self.parameters['General']['DoorHeightPixel'] + 2 + position, 1, self.parameters['General']['DoorHeightPixel'] - position, 4])
-
-                            # Add the bars
-                            if level == 3:
-                                for i in range(0, self.parameters['General']['DoorHeightPixel'] - self.parameters['General']['DoorMinimumPixel'] - position + 1):
-                                    if (i+3)%4 == 0:
-                                        pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['DoorGreyOverlay'], [1 + i, 1, 1, 4])
-                                        pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['DoorGreyOverlay'], [2 * self.parameters['General']['DoorHeightPixel'] + 1 - i, 1, 1, 4])
-                                        
-                            elif level == 4:
-                                for i in range(0, self.parameters['General']['DoorHeightPixel'] - self.parameters['General']['DoorMinimumPixel'] - position + 1):
-                                    if (i+1)%2 == 0:
-                                        pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['DoorGreyOverlay'], [1 + i, 1, 1, 4])
-                                        pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['DoorGreyOverlay'], [2 * self.parameters['General']['DoorHeightPixel'] + 1 - i, 1, 1, 4])
-
-                        else:
-                            pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['Black'], [0, 0, 2 * self.parameters['General']['DoorHeightPixel'] + 3, 6])
-                            pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['DoorLevel' + str(level)], [1, 1, 2 * self.parameters['General']['DoorHeightPixel'] + 1, 4])
-                            
-                            # Add the bars
-                            if level == 3:
-                                for i in range(0, self.parameters['General']['DoorHeightPixel'] - self.parameters['General']['DoorMinimumPixel'] + 2):
-                                    if (i+3)%4 == 0:
-                                        pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['DoorGreyOverlay'], [1 + i, 1, 1, 4])
-                                        pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['DoorGreyOverlay'], [2 * self.parameters['General']['DoorHeightPixel'] + 1 - i, 1, 1, 4])
-                                        
-                            elif level == 4:
-                                for i in range(0, self.parameters['General']['DoorHeightPixel'] - self.parameters['General']['DoorMinimumPixel'] + 2):
-                                    if (i+1)%2 == 0:
-                                        pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['DoorGreyOverlay'], [1 + i, 1, 1, 4])
-                                        pygame.draw.rect(self.sprites[level][position].image, self.parameters['Colors']['DoorGreyOverlay'], [2 * self.parameters['General']['DoorHeightPixel'] + 1 - i, 1, 1, 4])
-                                        
-                            
-                    # Set rect on canvas
-                    self.sprites[level][position].rect = self.sprites[level][position].image.get_rect()
-                    
-                    self.sprites[level][position].rect.x = canvCoord[0] + self.parameters['General']['RoomHeightPixel'] // 2 - self.parameters['General']['DoorHeightPixel'] - 1
-                    self.sprites[level][position].rect.y = canvCoord[1] - 3
-                                        
-
-        # Create the hacked doors
-        for position in range(0, self.parameters['General']['DoorHeightPixel'] - self.parameters['General']['DoorMinimumPixel'] + 1): # How far is the door retracted
+    # Drawing of a single door image. Only called if the image is not present in the shared cache
+    def drawDoorImage(self, level: [int, str], position: int) -> pygame.Surface:
+        # Hacked doors
+        if level == 'Hacked':
             if self.vertical:
-                self.sprites['Hacked'][position].image = pygame.Surface([6, 2 * self.parameters['General']['DoorHeightPixel'] + 3])
+                image = pygame.Surface([6, 2 * self.parameters['General']['DoorHeightPixel'] + 3])
             else:
-                self.sprites['Hacked'][position].image = pygame.Surface([2 * self.parameters['General']['DoorHeightPixel'] + 3, 6])
+                image = pygame.Surface([2 * self.parameters['General']['DoorHeightPixel'] + 3, 6])
 
-            self.sprites['Hacked'][position].image.fill(self.parameters['Colors']['White'])
-            self.sprites['Hacked'][position].image.set_colorkey(self.parameters['Colors']['White'])
+            image.fill(self.parameters['Colors']['White'])
+            image.set_colorkey(self.parameters['Colors']['White'])
             
             # Create the door wings
             if self.vertical:
                 # Upper wing
-                pygame.draw.rect(self.sprites['Hacked'][position].image, self.parameters['Colors']['Black'], [0, 0, 6, self.parameters['General']['DoorHeightPixel'] + 2 - position])
-                pygame.draw.rect(self.sprites['Hacked'][position].image, self.parameters['Colors']['DoorHacked'], [1, 1, 4, self.parameters['General']['DoorHeightPixel'] - position])
+                pygame.draw.rect(image, self.parameters['Colors']['Black'], [0, 0, 6, self.parameters['General']['DoorHeightPixel'] + 2 - position])
+                pygame.draw.rect(image, self.parameters['Colors']['DoorHacked'], [1, 1, 4, self.parameters['General']['DoorHeightPixel'] - position])
 
                 # Lower wing
-                pygame.draw.rect(self.sprites['Hacked'][position].image, self.parameters['Colors']['Black'], [0, self.parameters['General']['DoorHeightPixel'] + 1 + position, 6, self.parameters['General']['DoorHeightPixel'] + 2 - position])
-                pygame.draw.rect(self.sprites['Hacked'][position].image, self.parameters['Colors']['DoorHacked'], [1, self.parameters['General']['DoorHeightPixel'] + 2 + position, 4, self.parameters['General']['DoorHeightPixel'] - position])
+                pygame.draw.rect(image, self.parameters['Colors']['Black'], [0, self.parameters['General']['DoorHeightPixel'] + 1 + position, 6, self.parameters['General']['DoorHeightPixel'] + 2 - position])
+                pygame.draw.rect(image, self.parameters['Colors']['DoorHacked'], [1, self.parameters['General']['DoorHeightPixel'] + 2 + position, 4, self.parameters['General']['DoorHeightPixel'] - position])
             
-                # Set rect on canvas
-                self.sprites['Hacked'][position].rect = self.sprites['Hacked'][position].image.get_rect()
                 
-                self.sprites['Hacked'][position].rect.x = canvCoord[0] - 3
-                self.sprites['Hacked'][position].rect.y = canvCoord[1] + self.parameters['General']['RoomHeightPixel'] // 2 - self.parameters['General']['DoorHeightPixel'] - 1
-            
             else:
                 # Left wing
-                pygame.draw.rect(self.sprites['Hacked'][position].image, self.parameters['Colors']['Black'], [0, 0, self.parameters['General']['DoorHeightPixel'] + 2 - position, 6])
-                pygame.draw.rect(self.sprites['Hacked'][position].image, self.parameters['Colors']['DoorHacked'], [1, 1, self.parameters['General']['DoorHeightPixel'] - position, 4])
+                pygame.draw.rect(image, self.parameters['Colors']['Black'], [0, 0, self.parameters['General']['DoorHeightPixel'] + 2 - position, 6])
+                pygame.draw.rect(image, self.parameters['Colors']['DoorHacked'], [1, 1, self.parameters['General']['DoorHeightPixel'] - position, 4])
 
                 # Right wing
-                pygame.draw.rect(self.sprites['Hacked'][position].image, self.parameters['Colors']['Black'], [self.parameters['General']['DoorHeightPixel'] + 1 + position, 0, self.parameters['General']['DoorHeightPixel'] + 2 - position, 6])
-                pygame.draw.rect(self.sprites['Hacked'][position].image, self.parameters['Colors']['DoorHacked'], [self.parameters['General']['DoorHeightPixel'] + 2 + position, 1, self.parameters['General']['DoorHeightPixel'] - position, 4])
+                pygame.draw.rect(image, self.parameters['Colors']['Black'], [self.parameters['General']['DoorHeightPixel'] + 1 + position, 0, self.parameters['General']['DoorHeightPixel'] + 2 - position, 6])
+                pygame.draw.rect(image, self.parameters['Colors']['DoorHacked'], [self.parameters['General']['DoorHeightPixel'] + 2 + position, 1, self.parameters['General']['DoorHeightPixel'] - position, 4])
+        
+        # Doors of the given level
+        else:
+            if self.vertical:
+                image = pygame.Surface([6, 2 * self.parameters['General']['DoorHeightPixel'] + 3])
+            else:
+                image = pygame.Surface([2 * self.parameters['General']['DoorHeightPixel'] + 3, 6])
 
-                # Set rect on canvas
-                self.sprites['Hacked'][position].rect = self.sprites[level][position].image.get_rect()
+            image.fill(self.parameters['Colors']['White'])
+            image.set_colorkey(self.parameters['Colors']['White'])
+            
+            # Create the door wings
+            if self.vertical:
+                if level <= 1:  # Two wings
+                    # Upper wing
+                    pygame.draw.rect(image, self.parameters['Colors']['Black'], [0, 0, 6, self.parameters['General']['DoorHeightPixel'] + 2 - position])
+                    pygame.draw.rect(image, self.parameters['Colors']['DoorLevel' + str(level)], [1, 1, 4, self.parameters['General']['DoorHeightPixel'] - position])
+    
+                    # Lower wing
+                    pygame.draw.rect(image, self.parameters['Colors']['Black'], [0, self.parameters['General']['DoorHeightPixel'] + 1 + position, 6, self.parameters['General']['DoorHeightPixel'] + 2 - position])
+                    pygame.draw.rect(image, self.parameters['Colors']['DoorLevel' + str(level)], [1, self.parameters['General']['DoorHeightPixel'] + 2 + position, 4, self.parameters['General']['DoorHeightPixel'] - position])
                 
-                self.sprites['Hacked'][position].rect.x = canvCoord[0] + self.parameters['General']['RoomHeightPixel'] // 2 - self.parameters['General']['DoorHeightPixel'] - 1
-                self.sprites['Hacked'][position].rect.y = canvCoord[1] - 3
+                else: 
+                    if position:    # Opened doors
+                        # Upper wing
+                        pygame.draw.rect(image, self.parameters['Colors']['Black'], [0, 0, 6, self.parameters['General']['DoorHeightPixel'] + 2 - position])
+                        pygame.draw.rect(image, self.parameters['Colors']['DoorLevel' + str(level)], [1, 1, 4, self.parameters['General']['DoorHeightPixel'] - position])
+                        
+                        # Lower wing
+                        pygame.draw.rect(image, self.parameters['Colors']['Black'], [0, self.parameters['General']['DoorHeightPixel'] + 1 + position, 6, self.parameters['General']['DoorHeightPixel'] + 2 - position])
+                        pygame.draw.rect(image, self.parameters['Colors']['DoorLevel' + str(level)], [1, self.parameters['General']['DoorHeightPixel'] + 2 + position, 4, self.parameters['General']['DoorHeightPixel'] - position])
 
+                        # Add the bars
+                        if level == 3:
+                            for i in range(0, self.parameters['General']['DoorHeightPixel'] - self.parameters['General']['DoorMinimumPixel'] - position + 1):
+                                if (i+3)%4 == 0:
+                                    pygame.draw.rect(image, self.parameters['Colors']['DoorGreyOverlay'], [1, 1 + i, 4, 1])
+                                    pygame.draw.rect(image, self.parameters['Colors']['DoorGreyOverlay'], [1, 2 * self.parameters['General']['DoorHeightPixel'] + 1 - i, 4, 1])
+                                    
+                        elif level == 4:
+                            for i in range(0, self.parameters['General']['DoorHeightPixel'] - self.parameters['General']['DoorMinimumPixel'] - position + 1):
+                                if (i+1)%2 == 0:
+                                    pygame.draw.rect(image, self.parameters['Colors']['DoorGreyOverlay'], [1, 1 + i, 4, 1])
+                                    pygame.draw.rect(image, self.parameters['Colors']['DoorGreyOverlay'], [1, 2 * self.parameters['General']['DoorHeightPixel'] + 1 - i, 4, 1])
+
+                    else:
+                        pygame.draw.rect(image, self.parameters['Colors']['Black'], [0, 0, 6, 2 * self.parameters['General']['DoorHeightPixel'] + 3])
+                        pygame.draw.rect(image, self.parameters['Colors']['DoorLevel' + str(level)], [1, 1, 4, 2 * self.parameters['General']['DoorHeightPixel'] + 1])
+
+                        # Add the bars
+                        if level == 3:
+                            for i in range(0, self.parameters['General']['DoorHeightPixel'] - self.parameters['General']['DoorMinimumPixel'] + 2):
+                                if (i+3)%4 == 0:
+                                    pygame.draw.rect(image, self.parameters['Colors']['DoorGreyOverlay'], [1, 1 + i, 4, 1])
+                                    pygame.draw.rect(image, self.parameters['Colors']['DoorGreyOverlay'], [1, 2 * self.parameters['General']['DoorHeightPixel'] + 1 - i, 4, 1])
+                                    
+                        elif level == 4:
+                            for i in range(0, self.parameters['General']['DoorHeightPixel'] - self.parameters['General']['DoorMinimumPixel'] + 2):
+                                if (i+1)%2 == 0:
+                                    pygame.draw.rect(image, self.parameters['Colors']['DoorGreyOverlay'], [1, 1 + i, 4, 1])
+                                    pygame.draw.rect(image, self.parameters['Colors']['DoorGreyOverlay'], [1, 2 * self.parameters['General']['DoorHeightPixel'] + 1 - i, 4, 1])
+                        
+
+            # Horizontal doors
+            else:
+                if level <= 1:  # Two wings
+                    # Left wing
+                    pygame.draw.rect(image, self.parameters['Colors']['Black'], [0, 0, self.parameters['General']['DoorHeightPixel'] + 2 - position, 6])
+                    pygame.draw.rect(image, self.parameters['Colors']['DoorLevel' + str(level)], [1, 1, self.parameters['General']['DoorHeightPixel'] - position, 4])
     
-    
-    
-    
-    
-    
\ No newline at end of file
+                    # Right wing
+                    pygame.draw.rect(image, self.parameters['Colors']['Black'], [self.parameters['General']['DoorHeightPixel'] + 1 + position, 0, self.parameters['General']['DoorHeightPixel'] + 2 - position, 6])
+                    pygame.draw.rect(image, self.parameters['Colors']['DoorLevel' + str(level)], [self.parameters['General']['DoorHeightPixel'] + 2 + position, 1, self.parameters['General']['DoorHeightPixel'] - position, 4])
+
+                else: 
+                    if position:    # Opened doors
+                        # Left wing
+                        pygame.draw.rect(image, self.parameters['Colors']['Black'], [0, 0, self.parameters['General']['DoorHeightPixel'] + 2 - position, 6])
+                        pygame.draw.rect(image, self.parameters['Colors']['DoorLevel' + str(level)], [1, 1, self.parameters['General']['DoorHeightPixel'] - position, 4])
+                        
+                        # Right wing
+                        pygame.draw.rect(image, self.parameters['Colors']['Black'], [self.parameters['General']['DoorHeightPixel'] + 1 + position, 0, self.parameters['General']['DoorHeightPixel'] + 2 - position, 6])
+                        pygame.draw.rect(image, self.parameters['Colors']['DoorLevel' + str(level)], [self.parameters['General']['DoorHeightPixel'] + 2 + position, 1, self.parameters['General']['DoorHeightPixel'] - position, 4])
+
+                        # Add the bars
+                        if level == 3:
+                            for i in range(0, self.parameters['General']['DoorHeightPixel'] - self.parameters['General']['DoorMinimumPixel'] - position + 1):
+                                if (i+3)%4 == 0:
+                                    pygame.draw.rect(image, self.parameters['Colors']['DoorGreyOverlay'], [1 + i, 1, 1, 4])
+                                    pygame.draw.rect(image, self.parameters['Colors']['DoorGreyOverlay'], [2 * self.parameters['General']['DoorHeightPixel'] + 1 - i, 1, 1, 4])
+                                    
+                        elif level == 4:
+                            for i in range(0, self.parameters['General']['DoorHeightPixel'] - self.parameters['General']['DoorMinimumPixel'] - position + 1):
+                                if (i+1)%2 == 0:
+                                    pygame.draw.rect(image, self.parameters['Colors']['DoorGreyOverlay'], [1 + i, 1, 1, 4])
+                                    pygame.draw.rect(image, self.parameters['Colors']['DoorGreyOverlay'], [2 * self.parameters['General']['DoorHeightPixel'] + 1 - i, 1, 1, 4])
+
+                    else:
+                        pygame.draw.rect(image, self.parameters['Colors']['Black'], [0, 0, 2 * self.parameters['General']['DoorHeightPixel'] + 3, 6])
+                        pygame.draw.rect(image, self.parameters['Colors']['DoorLevel' + str(level)], [1, 1, 2 * self.parameters['General']['DoorHeightPixel'] + 1, 4])
+                        
+                        # Add the bars
+                        if level == 3:
+                            for i in range(0, self.parameters['General']['DoorHeightPixel'] - self.parameters['General']['DoorMinimumPixel'] + 2):
+                                if (i+3)%4 == 0:
+                                    pygame.draw.rect(image, self.parameters['Colors']['DoorGreyOverlay'], [1 + i, 1, 1, 4])
+                                    pygame.draw.rect(image, self.parameters['Colors']['DoorGreyOverlay'], [2 * self.parameters['General']['DoorHeightPixel'] + 1 - i, 1, 1, 4])
+                                    
+                        elif level == 4:
+                            for i in range(0, self.parameters['General']['DoorHeightPixel'] - self.parameters['General']['DoorMinimumPixel'] + 2):
+                                if (i+1)%2 == 0:
+                                    pygame.draw.rect(image, self.parameters['Colors']['DoorGreyOverlay'], [1 + i, 1, 1, 4])
+                                    pygame.draw.rect(image, self.parameters['Colors']['DoorGreyOverlay'], [2 * self.parameters['General']['DoorHeightPixel'] + 1 - i, 1, 1, 4])
+        
+        return(image)
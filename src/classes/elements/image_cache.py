@@ -0,0 +1,106 @@
+###
+#
+# Define a bounded cache for rendered images which can be shared between several objects
+#
+###
+
+
+###
+# Load packages
+
+# Logging
+import logging
+
+# Typing
+from typing import Callable, Hashable
+
+# Ordered dictionary used to keep track of the least recently used images
+from collections import OrderedDict
+
+# Pygame
+import pygame
+
+
+###
+# Setup logging
+logger = logging.getLogger(__name__)
+
+
+###
+# Define the image cache class
+class imageCache(object):
+    """
+
+    Least recently used cache of rendered images. Images are created on first request by the passed function and shared between all objects requesting the same key.
+    Cached images are shared and must not be drawn onto.
+
+    Init:
+        - name [str]: Name of the cache, used for logging
+        - maximumSize [int]: Maximum number of images kept in the cache
+
+    Fields:
+        - name [str]: Name of the cache
+        - maximumSize [int]: Maximum number of images kept in the cache
+        - images [OrderedDict]: Cached images, the least recently used image comes first
+        - hits [int]: Number of requests served from the cache
+        - misses [int]: Number of requests which needed a new image to be created
+
+    Methods:
+        - get(key [Hashable], createImage [Callable]): Returns the image for the key, creates it with createImage() if it is not cached
+        - setMaximumSize(maximumSize [int]): Change the maximum number of cached images, removes the least recently used images if necessary
+        - clear(): Remove all images from the cache
+
+    """
+
+
+    ###
+    # Initialization
+    def __init__(self, name: str, maximumSize: int) -> None:
+        logger.debug('Initialize the {} image cache'.format(name))
+
+        self.name = name
+        self.maximumSize = maximumSize
+        self.images = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+
+    ###
+    # Return an image, create it if it is not present
+    def get(self, key: Hashable, createImage: Callable[[], pygame.Surface]) -> pygame.Surface:
+        if key in self.images:
+            self.hits += 1
+            self.images.move_to_end(key)
+            return(self.images[key])
+
+        ###
+        # Create and save the new image
+        self.misses += 1
+        image = createImage()
+        self.images[key] = image
+
+        # Remove the least recently used images. Objects still showing them keep their reference
+        while len(self.images) > self.maximumSize:
+            self.images.popitem(last = False)
+
+        return(image)
+
+
+    ###
+    # Change the size of the cache
+    def setMaximumSize(self, maximumSize: int) -> None:
+        if maximumSize != self.maximumSize:
+            logger.debug('Set the size of the {name} image cache to {size}'.format(name = self.name, size = str(maximumSize)))
+
+            self.maximumSize = maximumSize
+            while len(self.images) > self.maximumSize:
+                self.images.popitem(last = False)
+
+
+    ###
+    # Remove all images
+    def clear(self) -> None:
+        logger.debug('Clear the {} image cache'.format(self.name))
+
+        self.images.clear()
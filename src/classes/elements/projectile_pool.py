@@ -0,0 +1,216 @@
+###
+#
+# Define a pool holding all flying projectiles of a battle in arrays
+#
+###
+
+
+###
+# Load packages
+
+# Logging
+import logging
+
+# Typing
+from typing import List, Tuple
+
+# Arrays and matrices
+import numpy as np
+
+
+###
+# Setup logging
+logger = logging.getLogger(__name__)
+
+
+###
+# Define the projectile pool class
+class projectilePool(object):
+    """
+    
+    Pool of the flying projectiles of both ships, stored in preallocated arrays. Every slot is either active (flying) or free, the pool grows if more projectiles are fired than there are slots.
+    All active projectiles are moved, animated and tested against the shields and their target room in one vectorized update per time step.
+    Ships are indexed by 0 (player) and 1 (enemy), a projectile always flies at the other ship than its owner. Positions are given in the coordinates of the target ship.
+    
+    Init:
+        - weaponNames [List]: Names of all weapons which can fire projectiles
+        - capacity [int]: Initial number of slots
+    
+    Fields:
+        - weaponNames [List]: Names of all weapons which can fire projectiles
+        - weaponIndex [Dict]: Mapping weapon name:index into weaponNames
+        - capacity [int]: Number of slots
+        - active [np.array]: Logical vector, True for every slot holding a flying projectile
+        - position [np.array]: Center of the projectiles in pixels (capacity x 2)
+        - velocity [np.array]: Velocity of the projectiles in pixels per second (capacity x 2)
+        - radius [np.array]: Radius of the projectiles in pixels
+        - frame [np.array]: Current animation frame of the projectiles, as float to keep the progress between frames
+        - frames [np.array]: Number of animation frames of the projectiles
+        - weapon [np.array]: Index of the weapon which fired the projectiles
+        - owner [np.array]: Index of the ship which fired the projectiles
+        - targetRoom [np.array]: Roomkey of the target room of the projectiles
+        - targetRect [np.array]: Rect of the target room as x1, y1, x2, y2 (capacity x 4)
+        - missed [np.array]: Logical vector, True for projectiles which miss their target and fly past the room
+        - shieldChecked [np.array]: Logical vector, True for projectiles which already reached the shields of the target
+    
+    Methods:
+        - spawn(weaponName [str], owner [int], positions [np.array], targetPositions [np.array], targetRooms [np.array], targetRects [np.array], speed [float], radius [float], frames [int], missed [None, np.array]): Add projectiles flying from positions to targetPositions. Returns their slots
+        - update(dt [int], shieldEllipses [np.array], shieldsUp [np.array], bounds [np.array], framesPerSecond [float]): Move and animate all projectiles by dt milliseconds and test them against the shields and the target rooms
+        - release(slots [np.array]): Free the slots of the given projectiles
+        - getActive(): Returns the slots of all flying projectiles
+    
+    Auxiliary methods (called internally):
+        - grow(capacity [int]): Enlarge all arrays to the given number of slots
+    
+    """
+    
+    
+    ###
+    # Initialization
+    def __init__(self, weaponNames: List, capacity: int = 64) -> None:
+        logger.debug('Initialize the projectile pool with {} slots'.format(capacity))
+        
+        self.weaponNames = list(weaponNames)
+        self.weaponIndex = {weaponName: index for index, weaponName in enumerate(self.weaponNames)}
+        
+        self.capacity = 0
+        self.active = np.zeros(0, dtype = bool)
+        self.position = np.zeros((0, 2))
+        self.velocity = np.zeros((0, 2))
+        self.radius = np.zeros(0)
+        self.frame = np.zeros(0)
+        self.frames = np.ones(0, dtype = int)
+        self.weapon = np.zeros(0, dtype = int)
+        self.owner = np.zeros(0, dtype = int)
+        self.targetRoom = np.zeros(0, dtype = int)
+        self.targetRect = np.zeros((0, 4))
+        self.missed = np.zeros(0, dtype = bool)
+        self.shieldChecked = np.zeros(0, dtype = bool)
+        
+        self.grow(capacity)
+    
+    
+    ###
+    # Enlarge the arrays, the existing projectiles keep their slots
+    def grow(self, capacity: int) -> None:
+        logger.debug('Grow the projectile pool to {} slots'.format(capacity))
+        
+        added = capacity - self.capacity
+        
+        self.active = np.concatenate((self.active, np.zeros(added, dtype = bool)))
+        self.position = np.concatenate((self.position, np.zeros((added, 2))))
+        self.velocity = np.concatenate((self.velocity, np.zeros((added, 2))))
+        self.radius = np.concatenate((self.radius, np.zeros(added)))
+        self.frame = np.concatenate((self.frame, np.zeros(added)))
+        self.frames = np.concatenate((self.frames, np.ones(added, dtype = int)))
+        self.weapon = np.concatenate((self.weapon, np.zeros(added, dtype = int)))
+        self.owner = np.concatenate((self.owner, np.zeros(added, dtype = int)))
+        self.targetRoom = np.concatenate((self.targetRoom, np.zeros(added, dtype = int)))
+        self.targetRect = np.concatenate((self.targetRect, np.zeros((added, 4))))
+        self.missed = np.concatenate((self.missed, np.zeros(added, dtype = bool)))
+        self.shieldChecked = np.concatenate((self.shieldChecked, np.zeros(added, dtype = bool)))
+        
+        self.capacity = capacity
+    
+    
+    ###
+    # Add projectiles, e.g. a single shot or all shots of a flak volley at once
+    def spawn(self, weaponName: str, owner: int, positions: np.ndarray, targetPositions: np.ndarray, targetRooms: np.ndarray, targetRects: np.ndarray, speed: float, radius: float, frames: int, missed: [None, np.ndarray] = None) -> np.ndarray:
+        positions = np.atleast_2d(positions)
+        
+        ##
+        # Free slots, grow the pool if there are not enough
+        slots = np.flatnonzero(~self.active)[:positions.shape[0]]
+        if slots.shape[0] < positions.shape[0]:
+            self.grow(max(2 * self.capacity, self.capacity + positions.shape[0]))
+            slots = np.flatnonzero(~self.active)[:positions.shape[0]]
+        
+        
+        ##
+        # Fly straight to the target positions
+        direction = np.atleast_2d(targetPositions) - positions
+        distance = np.linalg.norm(direction, axis = 1, keepdims = True)
+        
+        self.active[slots] = True
+        self.position[slots] = positions
+        self.velocity[slots] = direction / np.maximum(distance, 1e-9) * speed
+        self.radius[slots] = radius
+        self.frame[slots] = 0
+        self.frames[slots] = frames
+        self.weapon[slots] = self.weaponIndex[weaponName]
+        self.owner[slots] = owner
+        self.targetRoom[slots] = targetRooms
+        self.targetRect[slots] = targetRects
+        self.missed[slots] = False if missed is None else missed
+        self.shieldChecked[slots] = False
+        
+        return(slots)
+    
+    
+    ###
+    # Move all projectiles and check for collisions
+    def update(self, dt: int, shieldEllipses: np.ndarray, shieldsUp: np.ndarray, bounds: np.ndarray, framesPerSecond: float) -> Tuple:
+        """
+        
+        Move and animate all projectiles by dt milliseconds and test them against the shields and their target rooms.
+        
+        Input:
+            - shieldEllipses [np.array]: Shield ellipse of both ships as center x, center y, semi-axis x, semi-axis y (2 x 4)
+            - shieldsUp [np.array]: Logical vector whether the shields of the ships can block projectiles
+            - bounds [np.array]: Area of both ships as x1, y1, x2, y2 (2 x 4). Projectiles leaving it are lost
+            - framesPerSecond [float]: Speed of the projectile animations
+        
+        Output:
+            - shieldCrossings: Slots of the projectiles which reached raised shields in this step. They keep flying unless they are released by the caller
+            - roomHits: Slots of the projectiles which hit their target room. They are released
+            - lost: Slots of the projectiles which left the bounds. They are released
+        
+        """
+        
+        if not self.active.any():
+            noSlots = np.zeros(0, dtype = int)
+            return(noSlots, noSlots, noSlots)
+        
+        
+        ###
+        # Move and animate, free slots are moved along as this is cheaper than selecting the active ones
+        self.position += self.velocity * (dt / 1000)
+        self.frame += framesPerSecond * dt / 1000
+        np.mod(self.frame, self.frames, out = self.frame)
+        
+        target = 1 - self.owner
+        
+        
+        ###
+        # Shields, every projectile is tested until it reaches the shield ellipse once
+        ellipses = shieldEllipses[target]
+        offset = (self.position - ellipses[:, :2]) / (ellipses[:, 2:] + self.radius[:, np.newaxis])
+        
+        reachedShields = ((offset * offset).sum(axis = 1) <= 1) & self.active & ~self.shieldChecked
+        self.shieldChecked |= reachedShields
+        
+        blocking = reachedShields & shieldsUp[target]
+        
+        
+        ###
+        # Target rooms and bounds
+        insideRoom = (self.position >= self.targetRect[:, :2]).all(axis = 1) & (self.position <= self.targetRect[:, 2:]).all(axis = 1) & self.active & ~self.missed & ~blocking
+        
+        areas = bounds[target]
+        outside = ((self.position < areas[:, :2]) | (self.position > areas[:, 2:])).any(axis = 1) & self.active & ~insideRoom
+        
+        self.active &= ~(insideRoom | outside)
+        
+        return(np.flatnonzero(blocking), np.flatnonzero(insideRoom), np.flatnonzero(outside))
+    
+    
+    ###
+    # Free slots
+    def release(self, slots: np.ndarray) -> None:
+        self.active[slots] = False
+    
+    
+    ###
+    # Flying projectiles
+    def getActive(self) -> np.ndarray:
+        return(np.flatnonzero(self.active))
@@ -25,39 +25,64 @@ import pygame
 # Import ressources
 from src.misc.helperfunctions import colorInterpolation
 
+# Cache for the rendered images
+import src.classes.elements.image_cache as imageCache
+
+# State arrays
+import src.classes.ships.ship_state as shipState
+
 
 ###
 # Setup logging
 logger = logging.getLogger(__name__)
 
 
+###
+# Rendered room images shared between all the rooms of all ships. Rooms with the same shape, doors, system and condition look the same
+sharedRoomImages = imageCache.imageCache('room', 2000)
+
+
 ###
 # Define the room class
 class room(object):
     """
     
     Object which controls and returns the sprites for a given room. The active sprite is always found in the field currentSprite.
+    Room images are only drawn when they are shown for the first time and are shared with all other rooms of the same look through the module level cache sharedRoomImages.
     
     Fields:
         - system [str]: System present in the room, '' if no room is present
-        - visible [bool]: Logical if the room is visible or not
+        - visible [bool]: Logical if the room is visible or not. Stored in the state arrays
         - roomKey [int]: Roomkey as assigned in the layout parameters
         
-        - status [int]: Status of the system in the room: 0: Normal, 1: Damaged, 2: Destroyed, 3: Ionized. Hacked is treated separately
-        - oxygen [float]: Amount of oxygen in the room, inside the interval [0, 100]. Crew takes damage below an oxygen level of 5
-        - hacked [bool]: Logical indicating whether the room is hacked
+        - status [int]: Status of the system in the room: 0: Normal, 1: Damaged, 2: Destroyed, 3: Ionized. Hacked is treated separately. Stored in the state arrays
+        - oxygen [float]: Amount of oxygen in the room, inside the interval [0, 100]. Crew takes damage below an oxygen level of 5. Stored in the state arrays
+        - hacked [bool]: Logical indicating whether the room is hacked. Stored in the state arrays
+        - state [shipState]: State arrays holding the values of the room, shared with the ship once the room is added to it
+        - stateIndex [int]: Index of the room within the state arrays
         
-        - currentSprite [pygame.sprite.Sprite]: Current sprite which should be drawn onto the screen
+        - currentSprite [pygame.sprite.Sprite]: Current sprite which should be drawn onto the screen. Its image references a pre-rendered surface and must not be drawn onto
+        - rect [pygame.Rect]: Position of the room on the canvas, shared by all images of the room
+        - consoleImages [Dict]: Room images with the console drawn onto, created on first use. Key: (visible, status, oxygen level, console glow level)
         
         - parameters [Dict]: Reference to all parameters
         
         - playerShip [bool]: Logical indicating whether the room is on the player or enemy ship
         - consoleOrientationEnemyShip [np.array, None]: Orientation of consoles on enemy ships
         - relevantSystemInformation [Dict]: Dictionary containing the relevant information necessary to draw the room
+        - spritesAll [Dict]: Reference to all loaded sprites, necessary to draw the room images
+        - clonebayOrientation [np.array]: Position and orientation of the clonebay within the clonebay room (x, y, orientation)
+        - doorOpenings [Dict]: Logicals for each field along the left, right, upper and lower wall of the room, indicating where a door is present
+        - headless [bool]: If true, no images are selected or drawn (simulation without display)
+        - imageKeyBase [tuple]: Part of the key into the shared room images describing the look of the room independent of its condition
         
     
     Methods:
-        - selectSprite(): Selects the currently valid sprite and copies it into the field currentSprite
+        - selectSprite(): Selects the currently valid sprite and references it in the field currentSprite
+        - shareState(state [shipState], stateIndex [int]): Keep the values of the room in the state arrays of the ship
+        - getRoomImage(visible [bool], status [int], oxygenRounded [int, None]): Returns the room image for the given condition from the shared cache, draws it if necessary
+        - drawRoomImage(visible [bool], status [int], oxygenRounded [int, None]): Draws a single room image
+        - getConsoleGlowLevel(): Returns the console glow to be drawn for the current condition of the room, None if no glow is drawn
         - moveRoomRects(delta [np.array]): Move all saved room sprites by the specified pixel amount. Updates the currentSprite afterwards
         
     
@@ -66,16 +91,21 @@ class room(object):
     
     ###
     # Initialization
-    def __init__(self, roomKey: int, parameters: Dict, spritesAll: Dict, doorMatrixHorizontal: np.ndarray, doorMatrixVertical: np.ndarray, clonebayOrientation: np.ndarray, playerShip: bool, consoleOrientationEnemyShip: [None, Dict], relevantSystemInformation: Dict, system: [str, None] = None, visible: bool = True, oxygen: float = 100, hacked: bool = False) -> None:
+    def __init__(self, roomKey: int, parameters: Dict, spritesAll: [None, Dict], doorMatrixHorizontal: np.ndarray, doorMatrixVertical: np.ndarray, clonebayOrientation: np.ndarray, playerShip: bool, consoleOrientationEnemyShip: [None, Dict], relevantSystemInformation: Dict, system: [str, None] = None, visible: bool = True, oxygen: float = 100, hacked: bool = False, headless: bool = False) -> None:
         logger.debug('Initialize room {}'.format(str(roomKey)))
         
         ###
         # Set values        
         self.system = system
-        self.visible = visible
         self.roomKey = roomKey
-
+        self.headless = headless
+        
+        # Own state arrays until the room is added to the ship
+        self.state = shipState.shipState(np.array([roomKey]), np.array([]))
+        self.stateIndex = 0
+        
         # Initialize rooms as normal with full oxygen
+        self.visible = visible
         self.status = 0     # 0: Normal, 1: Damaged, 2: Destroyed, 3: Ionized
         self.oxygen = oxygen
         self.hacked = False
@@ -85,42 +115,97 @@ class room(object):
         self.playerShip = playerShip
         self.consoleOrientationEnemyShip = consoleOrientationEnemyShip  # Needed for enemy ships
         self.relevantSystemInformation = relevantSystemInformation
-
-        # Prepare empty sprites
-        self.sprites = dict()
-        for visible in [True, False]:
-            self.sprites[visible] = dict()
-            for status in [0, 1, 2, 3]:
-                if visible:
-                    self.sprites[visible][status] = dict()
-                    for oxygenRounded in range(0, 21):
-                        self.sprites[visible][status][oxygenRounded] = pygame.sprite.Sprite()
-                else:
-                    self.sprites[visible][status] = pygame.sprite.Sprite()
+        
+        # Needed to draw the room images once they are requested
+        self.spritesAll = spritesAll
+        self.clonebayOrientation = clonebayOrientation
+        
+        # Save where the walls have to be opened for doors
+        roomOrigin = self.relevantSystemInformation['RoomOriginCoord']
+        self.doorOpenings = dict()
+        self.doorOpenings['Left'] = tuple(bool(doorMatrixVertical[roomOrigin[1] + iy, roomOrigin[0] - 1]) for iy in range(0, self.relevantSystemInformation['RoomHeight']))
+        self.doorOpenings['Right'] = tuple(bool(doorMatrixVertical[roomOrigin[1] + iy, roomOrigin[0] - 1 + self.relevantSystemInformation['RoomWidth']]) for iy in range(0, self.relevantSystemInformation['RoomHeight']))
+        self.doorOpenings['Upper'] = tuple(bool(doorMatrixHorizontal[roomOrigin[1] - 1, roomOrigin[0] + ix]) for ix in range(0, self.relevantSystemInformation['RoomWidth']))
+        self.doorOpenings['Lower'] = tuple(bool(doorMatrixHorizontal[roomOrigin[1] - 1 + self.relevantSystemInformation['RoomHeight'], roomOrigin[0] + ix]) for ix in range(0, self.relevantSystemInformation['RoomWidth']))
+        
+        # Everything that defines the look of the room apart from its condition
+        if self.playerShip and (self.system is not None) and self.relevantSystemInformation['BackgroundSprite']:
+            backgroundSprite = (str(self.relevantSystemInformation['RoomSize']), self.relevantSystemInformation.get('Sprite'), tuple(int(value) for value in self.clonebayOrientation) if self.system == 'Clonebay' else None)
+        else:
+            backgroundSprite = None
+        
+        self.imageKeyBase = (int(self.relevantSystemInformation['RoomWidth']), int(self.relevantSystemInformation['RoomHeight']), self.system, self.relevantSystemInformation.get('BackgroundSprite', False), backgroundSprite, 
+                             self.doorOpenings['Left'], self.doorOpenings['Right'], self.doorOpenings['Upper'], self.doorOpenings['Lower'])
+        
+        # Position of the room on the canvas
+        self.rect = pygame.Rect(self.relevantSystemInformation['RoomOriginCoordCanvas'][0], self.relevantSystemInformation['RoomOriginCoordCanvas'][1], 
+                                self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'], self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel'])
         
         self.currentSprite = pygame.sprite.Sprite()
+        self.consoleImages = dict()
 
-        # Create all the sprites
-        self.drawAllRooms(spritesAll, doorMatrixHorizontal, doorMatrixVertical, clonebayOrientation)
-        self.addConsole(spritesAll)
+        # Prepare the console, the room images are drawn when they are needed. Headless rooms have no console sprites
+        sharedRoomImages.setMaximumSize(self.parameters['General']['RoomImageCacheSize'])
+        if self.headless:
+            self.console = False
+        else:
+            self.addConsole(spritesAll)
         
         # Set current sprite
         self.selectSprite()
 
 
+    ###
+    # The values of the room are stored in the state arrays
+    @property
+    def oxygen(self) -> float:
+        return(self.state.roomOxygen[self.stateIndex])
+    
+    @oxygen.setter
+    def oxygen(self, oxygen: float) -> None:
+        self.state.roomOxygen[self.stateIndex] = oxygen
+    
+    @property
+    def status(self) -> int:
+        return(int(self.state.roomStatus[self.stateIndex]))
+    
+    @status.setter
+    def status(self, status: int) -> None:
+        self.state.roomStatus[self.stateIndex] = status
+    
+    @property
+    def visible(self) -> bool:
+        return(bool(self.state.roomVisible[self.stateIndex]))
+    
+    @visible.setter
+    def visible(self, visible: bool) -> None:
+        self.state.roomVisible[self.stateIndex] = visible
+    
+    @property
+    def hacked(self) -> bool:
+        return(bool(self.state.roomHacked[self.stateIndex]))
+    
+    @hacked.setter
+    def hacked(self, hacked: bool) -> None:
+        self.state.roomHacked[self.stateIndex] = hacked
+    
+    
+    ###
+    # Function to keep the values in the state arrays of the ship
+    def shareState(self, state: shipState.shipState, stateIndex: int) -> None:
+        state.rooms[:, stateIndex] = self.state.rooms[:, self.stateIndex]
+        
+        self.state = state
+        self.stateIndex = stateIndex
+
+
     ###
     # Function to mpve all room rects by a given pixel amount
     def moveRoomRects(self, delta: np.ndarray) -> None:
         logger.debug('Move room {roomKey} by x = {x}, y = {y} pixels'.format(roomKey = str(self.roomKey), x = str(delta[0]), y = str(delta[1])))
         
-        # Move all room sprites
-        for visible in [True, False]:
-            for status in [0, 1, 2, 3]:
-                if visible:
-                    for oxygenRounded in range(0, 21):
-                        self.sprites[visible][status][oxygenRounded].rect.topleft += delta 
-                else:
-                    self.sprites[visible][status].rect.topleft += delta
+        # Move the room, all images share the same rect
+        self.rect.topleft += delta
 
         # Reset current sprite
         self.selectSprite()
@@ -129,21 +214,39 @@ class room(object):
     ###
     # Function to set the current sprite based on the rooms condition
     def selectSprite(self) -> None:        
+        if self.headless:
+            return
+        
         if self.visible:
-            self.currentSprite.image = self.sprites[self.visible][self.status][int(self.oxygen) // 5].image.copy()
-            self.currentSprite.rect = self.sprites[self.visible][self.status][int(self.oxygen) // 5].rect
+            oxygenRounded = int(self.oxygen) // 5
         else:
-            self.currentSprite.image = self.sprites[self.visible][self.status].image.copy()
-            self.currentSprite.rect = self.sprites[self.visible][self.status].rect
-            
-        # Add the console glow
-        self.drawConsole()
+            oxygenRounded = None
+        
+        self.currentSprite.rect = self.rect
         
+        # Rooms without console are shown as they are
+        if not self.console:
+            self.currentSprite.image = self.getRoomImage(self.visible, self.status, oxygenRounded)
+            return
+        
+        # Rooms with console: Draw the console once for each combination and reuse it afterwards
+        imageKey = (self.visible, self.status, oxygenRounded, self.getConsoleGlowLevel())
+        if imageKey not in self.consoleImages:
+            self.consoleImages[imageKey] = self.getRoomImage(self.visible, self.status, oxygenRounded).copy()
+            self.drawConsole(self.consoleImages[imageKey])
+        
+        self.currentSprite.image = self.consoleImages[imageKey]
+    
     
     ###
-    # Function to draw all the rooms initially
-    # Draw the rooms
-    def drawAllRooms(self, spritesAll: Dict, doorMatrixHorizontal: np.ndarray, doorMatrixVertical: np.ndarray, clonebayOrientation: np.ndarray):
+    # Function to get a room image from the shared cache
+    def getRoomImage(self, visible: bool, status: int, oxygenRounded: [None, int]) -> pygame.Surface:
+        return(sharedRoomImages.get((visible, status, oxygenRounded) + self.imageKeyBase, lambda: self.drawRoomImage(visible, status, oxygenRounded)))
+        
+    
+    ###
+    # Function to draw a single room image. Only called if the image is not present in the shared cache
+    def drawRoomImage(self, visible: bool, status: int, oxygenRounded: [None, int]) -> pygame.Surface:
         # Define dict for color selection based on status
         colorSelection = dict()
         colorSelection[0] = 'OverlayGrey'
@@ -151,204 +254,191 @@ class room(object):
         colorSelection[2] = 'OverlayRed'
         colorSelection[3] = 'OverlayBlue'
         
-        surfaceRoomLines = pygame.Surface([self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'], self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel']])
-        surfaceRoomLines.fill(self.parameters['Colors']['White'])
-        surfaceRoomLines.set_colorkey(self.parameters['Colors']['White'])
-        surfaceRoomLines.set_alpha(100)
-
-        # Add room lines
-        for ix in range(0, self.relevantSystemInformation['RoomWidth'] - 1):
-            pygame.draw.rect(surfaceRoomLines, self.parameters['Colors']['Grey1'], [(ix + 1) * self.parameters['General']['RoomHeightPixel'] - 1, 0, 2, self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel']])
-
-        for iy in range(0, self.relevantSystemInformation['RoomHeight'] - 1):
-            pygame.draw.rect(surfaceRoomLines, self.parameters['Colors']['Grey1'], [0, (iy + 1) * self.parameters['General']['RoomHeightPixel'] - 1, self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'], 2])
+        if visible:
+            surfaceRoomLines = pygame.Surface([self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'], self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel']])
+            surfaceRoomLines.fill(self.parameters['Colors']['White'])
+            surfaceRoomLines.set_colorkey(self.parameters['Colors']['White'])
+            surfaceRoomLines.set_alpha(100)
+
+            # Add room lines
+            for ix in range(0, self.relevantSystemInformation['RoomWidth'] - 1):
+                pygame.draw.rect(surfaceRoomLines, self.parameters['Colors']['Grey1'], [(ix + 1) * self.parameters['General']['RoomHeightPixel'] - 1, 0, 2, self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel']])
+
+            for iy in range(0, self.relevantSystemInformation['RoomHeight'] - 1):
+                pygame.draw.rect(surfaceRoomLines, self.parameters['Colors']['Grey1'], [0, (iy + 1) * self.parameters['General']['RoomHeightPixel'] - 1, self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'], 2])
         
-        for visible in [True, False]:
-            for status in [0, 1, 2, 3]:
-                if visible:
-                    for oxygenRounded in range(0, 21):
-                        oxyColor = colorInterpolation(self.parameters['Colors']['GreyRoom'], self.parameters['Colors']['PinkRoom'], oxygenRounded / 20)
-                        
-                        # Prepare Sprite
-                        self.sprites[visible][status][oxygenRounded].image = pygame.Surface([self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'], self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel']])
-                        self.sprites[visible][status][oxygenRounded].image.fill(oxyColor)
-                        self.sprites[visible][status][oxygenRounded].image.set_colorkey(self.parameters['Colors']['White'])
-                            
-                        
-                        # Rect
-                        self.sprites[visible][status][oxygenRounded].rect = self.sprites[visible][status][oxygenRounded].image.get_rect()
-                        
-                        # Set rect on Canvas
-                        self.sprites[visible][status][oxygenRounded].rect.x = self.relevantSystemInformation['RoomOriginCoordCanvas'][0]
-                        self.sprites[visible][status][oxygenRounded].rect.y = self.relevantSystemInformation['RoomOriginCoordCanvas'][1]
-                    
+            oxyColor = colorInterpolation(self.parameters['Colors']['GreyRoom'], self.parameters['Colors']['PinkRoom'], oxygenRounded / 20)
+            
+            # Prepare Sprite
+            image = pygame.Surface([self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'], self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel']])
+            image.fill(oxyColor)
+            image.set_colorkey(self.parameters['Colors']['White'])
 
-                        if oxygenRounded == 0:
-                            # Add no oxygen stripes
-                            
-                            # Draw all lines
-                            for ix in range(0, self.relevantSystemInformation['RoomWidth']):
-                                for iy in range(0, self.relevantSystemInformation['RoomHeight']):
-                                    pygame.draw.polygon(self.sprites[visible][status][oxygenRounded].image, self.parameters['Colors']['RedRoomNoOxygen'], 
-                                                        [(ix * self.parameters['General']['RoomHeightPixel'], 27 + iy * self.parameters['General']['RoomHeightPixel']), 
-                                                         (7 + ix * self.parameters['General']['RoomHeightPixel'], 34 + iy * self.parameters['General']['RoomHeightPixel']),
-                                                         (ix * self.parameters['General']['RoomHeightPixel'], 34 + iy * self.parameters['General']['RoomHeightPixel'])
-                                                        ])
-    
-                                    pygame.draw.polygon(self.sprites[visible][status][oxygenRounded].image, self.parameters['Colors']['RedRoomNoOxygen'], 
-                                                        [(ix * self.parameters['General']['RoomHeightPixel'], 9 + iy * self.parameters['General']['RoomHeightPixel']), 
-                                                         (25 + ix * self.parameters['General']['RoomHeightPixel'], 34 + iy * self.parameters['General']['RoomHeightPixel']), 
-                                                         (17 + ix * self.parameters['General']['RoomHeightPixel'], 34 + iy * self.parameters['General']['RoomHeightPixel']),
-                                                         (ix * self.parameters['General']['RoomHeightPixel'], 17 + iy * self.parameters['General']['RoomHeightPixel'])                                                         
-                                                         ])
-
-                                    pygame.draw.polygon(self.sprites[visible][status][oxygenRounded].image, self.parameters['Colors']['RedRoomNoOxygen'], 
-                                                        [(ix * self.parameters['General']['RoomHeightPixel'], iy * self.parameters['General']['RoomHeightPixel']), 
-                                                         (34 + ix * self.parameters['General']['RoomHeightPixel'], 34 + iy * self.parameters['General']['RoomHeightPixel']), 
-                                                         (34 + ix * self.parameters['General']['RoomHeightPixel'], 26 + iy * self.parameters['General']['RoomHeightPixel']),
-                                                         (8 + ix * self.parameters['General']['RoomHeightPixel'], iy * self.parameters['General']['RoomHeightPixel'])                                                         
-                                                         ])
-
-                                    pygame.draw.polygon(self.sprites[visible][status][oxygenRounded].image, self.parameters['Colors']['RedRoomNoOxygen'], 
-                                                        [(18 + ix * self.parameters['General']['RoomHeightPixel'], iy * self.parameters['General']['RoomHeightPixel']), 
-                                                         (34 + ix * self.parameters['General']['RoomHeightPixel'], 16 + iy * self.parameters['General']['RoomHeightPixel']), 
-                                                         (34 + ix * self.parameters['General']['RoomHeightPixel'], 8 + iy * self.parameters['General']['RoomHeightPixel']),
-                                                         (26 + ix * self.parameters['General']['RoomHeightPixel'], iy * self.parameters['General']['RoomHeightPixel'])                                                         
-                                                         ])
-    
-                        # Roomlines
-                        self.sprites[visible][status][oxygenRounded].image.blit(surfaceRoomLines, [0,0])
 
-                        
-                        # Add room sprites (only for player ship)                        
-                        if self.playerShip:
-                            if self.system is not None and self.relevantSystemInformation['BackgroundSprite']:
-                                if self.system == 'Clonebay':
-                                    # First the clonebay background sprite, then the rest
-                                    self.sprites[visible][status][oxygenRounded].image.blit(pygame.transform.rotate(spritesAll['GeneralShip'].roomSprites[self.system]['Room'][0].image, 360 - (clonebayOrientation[2] - 1) * 90), [clonebayOrientation[0] * self.parameters['General']['RoomHeightPixel'], clonebayOrientation[1] * self.parameters['General']['RoomHeightPixel']])
-                                    self.sprites[visible][status][oxygenRounded].image.blit(pygame.transform.rotate(spritesAll['GeneralShip'].roomSprites[self.system]['Room'][1].image, 360 - (clonebayOrientation[2] - 1) * 90), [clonebayOrientation[0] * self.parameters['General']['RoomHeightPixel'], clonebayOrientation[1] * self.parameters['General']['RoomHeightPixel']])
-                            
-                                elif self.system == 'CrewTeleporter':
-                                    for ix in range(0, self.relevantSystemInformation['RoomWidth']):
-                                        for iy in range(0, self.relevantSystemInformation['RoomHeight']):
-                                            self.sprites[visible][status][oxygenRounded].image.blit(spritesAll['GeneralShip'].roomSprites[self.system]['Room'].image, [ix * self.parameters['General']['RoomHeightPixel'] + (self.parameters['General']['RoomHeightPixel'] - 24) // 2, iy * self.parameters['General']['RoomHeightPixel'] + (self.parameters['General']['RoomHeightPixel'] - 23) // 2])
-    
-                                else:
-                                    self.sprites[visible][status][oxygenRounded].image.blit(spritesAll['GeneralShip'].roomSprites[self.system]['Room' + str(self.relevantSystemInformation['RoomSize'])][self.relevantSystemInformation['Sprite']].image, [0, 0])
-                        
-                        # Draw the system sprite
-                        if self.system is not None:
-                            if self.system == 'Artillery':
-                                self.sprites[visible][status][oxygenRounded].image.blit(spritesAll['GeneralShip'].symbolSprites['Artillery'][colorSelection[status]].image, [2 + ((self.relevantSystemInformation['RoomWidth'] - 1) * self.parameters['General']['RoomHeightPixel']) // 2, 2 + ((self.relevantSystemInformation['RoomHeight'] - 1) * self.parameters['General']['RoomHeightPixel']) // 2])
-                            else:
-                                self.sprites[visible][status][oxygenRounded].image.blit(spritesAll['GeneralShip'].symbolSprites[self.system][colorSelection[status]].image, [2 + ((self.relevantSystemInformation['RoomWidth'] - 1) * self.parameters['General']['RoomHeightPixel']) // 2, 2 + ((self.relevantSystemInformation['RoomHeight'] - 1) * self.parameters['General']['RoomHeightPixel']) // 2])
-                        
-                        # Draw the walls
-                        pygame.draw.rect(self.sprites[visible][status][oxygenRounded].image, self.parameters['Colors']['Black'], [0, 0, self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'], 2])
-                        pygame.draw.rect(self.sprites[visible][status][oxygenRounded].image, self.parameters['Colors']['Black'], [0, 0, 2, self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel']])
-                        pygame.draw.rect(self.sprites[visible][status][oxygenRounded].image, self.parameters['Colors']['Black'], [self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'] - 2, 0, 2, self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel']])
-                        pygame.draw.rect(self.sprites[visible][status][oxygenRounded].image, self.parameters['Colors']['Black'], [0, self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel'] - 2, self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'], 2])
-                        
-                        # Check for doors, if true then remove the walls for that section
-                        for iy in range(0, self.relevantSystemInformation['RoomHeight']):
-                            # Left room doors
-                            if doorMatrixVertical[self.relevantSystemInformation['RoomOriginCoord'][1] + iy, self.relevantSystemInformation['RoomOriginCoord'][0] - 1]:
-                                pygame.draw.rect(self.sprites[visible][status][oxygenRounded].image, oxyColor, [0, self.parameters['General']['RoomHeightPixel'] * iy + self.parameters['General']['RoomHeightPixel'] // 2 - self.parameters['General']['DoorHeightPixel'] - 1, 2, 2 * self.parameters['General']['DoorHeightPixel'] + 3])
-
-                                if oxygenRounded == 0:
-                                    pygame.draw.polygon(self.sprites[visible][status][oxygenRounded].image, self.parameters['Colors']['RedRoomNoOxygen'], 
-                                                        [(0, 9 + iy * self.parameters['General']['RoomHeightPixel']), 
-                                                         (1, 10 + iy * self.parameters['General']['RoomHeightPixel']), 
-                                                         (1, 18 + iy * self.parameters['General']['RoomHeightPixel']),
-                                                         (0, 17 + iy * self.parameters['General']['RoomHeightPixel'])                                                         
-                                                         ])
-                                
-                            # Right room doors
-                            if doorMatrixVertical[self.relevantSystemInformation['RoomOriginCoord'][1] + iy, self.relevantSystemInformation['RoomOriginCoord'][0] - 1 + self.relevantSystemInformation['RoomWidth']]:
-                                pygame.draw.rect(self.sprites[visible][status][oxygenRounded].image, oxyColor, [self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'] - 2, self.parameters['General']['RoomHeightPixel'] * iy + self.parameters['General']['RoomHeightPixel'] // 2 - self.parameters['General']['DoorHeightPixel'] - 1, 2, 2 * self.parameters['General']['DoorHeightPixel'] + 3])
-
-                                if oxygenRounded == 0:
-                                    pygame.draw.polygon(self.sprites[visible][status][oxygenRounded].image, self.parameters['Colors']['RedRoomNoOxygen'], 
-                                                        [(self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'] - 2, 15 + iy * self.parameters['General']['RoomHeightPixel']), 
-                                                         (self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'] - 1, 16 + iy * self.parameters['General']['RoomHeightPixel']), 
-                                                         (self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'] - 1, 8 + iy * self.parameters['General']['RoomHeightPixel']),
-                                                         (self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'] - 2, 7 + iy * self.parameters['General']['RoomHeightPixel'])                                                         
-                                                         ])
-                                    
-                        for ix in range(0, self.relevantSystemInformation['RoomWidth']):
-                            # Upper room doors
-                            if doorMatrixHorizontal[self.relevantSystemInformation['RoomOriginCoord'][1] - 1, self.relevantSystemInformation['RoomOriginCoord'][0] + ix]:
-                                pygame.draw.rect(self.sprites[visible][status][oxygenRounded].image, oxyColor, [self.parameters['General']['RoomHeightPixel'] * ix + self.parameters['General']['RoomHeightPixel'] // 2 - self.parameters['General']['DoorHeightPixel'] - 1, 0, 2 * self.parameters['General']['DoorHeightPixel'] + 3, 2])
-
-                                if oxygenRounded == 0:
-                                    pygame.draw.polygon(self.sprites[visible][status][oxygenRounded].image, self.parameters['Colors']['RedRoomNoOxygen'], 
-                                                        [(18 + ix * self.parameters['General']['RoomHeightPixel'], 0), 
-                                                         (19 + ix * self.parameters['General']['RoomHeightPixel'], 1), 
-                                                         (27 + ix * self.parameters['General']['RoomHeightPixel'], 1),
-                                                         (26 + ix * self.parameters['General']['RoomHeightPixel'], 0)                                                         
-                                                         ])
-                            # Lower room doors
-                            if doorMatrixHorizontal[self.relevantSystemInformation['RoomOriginCoord'][1] - 1 + self.relevantSystemInformation['RoomHeight'], self.relevantSystemInformation['RoomOriginCoord'][0] + ix]:
-                                pygame.draw.rect(self.sprites[visible][status][oxygenRounded].image, oxyColor, [self.parameters['General']['RoomHeightPixel'] * ix + self.parameters['General']['RoomHeightPixel'] // 2 - self.parameters['General']['DoorHeightPixel'] - 1, self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel'] - 2, 2 * self.parameters['General']['DoorHeightPixel'] + 3, 2])
-
-                                if oxygenRounded == 0:
-                                    pygame.draw.polygon(self.sprites[visible][status][oxygenRounded].image, self.parameters['Colors']['RedRoomNoOxygen'], 
-                                                        [(24 + ix * self.parameters['General']['RoomHeightPixel'], self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel'] - 2), 
-                                                         (25 + ix * self.parameters['General']['RoomHeightPixel'], self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel'] - 1), 
-                                                         (17 + ix * self.parameters['General']['RoomHeightPixel'], self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel'] - 1),
-                                                         (16 + ix * self.parameters['General']['RoomHeightPixel'], self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel'] - 2)                                                         
-                                                         ])
+            if oxygenRounded == 0:
+                # Add no oxygen stripes
                 
-                else:   # Invisible
-                    self.sprites[visible][status].image = pygame.Surface([self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'], self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel']])
-                    self.sprites[visible][status].image.fill(self.parameters['Colors']['Grey2'])
-                    self.sprites[visible][status].image.set_colorkey(self.parameters['Colors']['White'])
+                # Draw all lines
+                for ix in range(0, self.relevantSystemInformation['RoomWidth']):
+                    for iy in range(0, self.relevantSystemInformation['RoomHeight']):
+                        pygame.draw.polygon(image, self.parameters['Colors']['RedRoomNoOxygen'], 
+                                            [(ix * self.parameters['General']['RoomHeightPixel'], 27 + iy * self.parameters['General']['RoomHeightPixel']), 
+                                             (7 + ix * self.parameters['General']['RoomHeightPixel'], 34 + iy * self.parameters['General']['RoomHeightPixel']),
+                                             (ix * self.parameters['General']['RoomHeightPixel'], 34 + iy * self.parameters['General']['RoomHeightPixel'])
+                                            ])
+
+                        pygame.draw.polygon(image, self.parameters['Colors']['RedRoomNoOxygen'], 
+                                            [(ix * self.parameters['General']['RoomHeightPixel'], 9 + iy * self.parameters['General']['RoomHeightPixel']), 
+                                             (25 + ix * self.parameters['General']['RoomHeightPixel'], 34 + iy * self.parameters['General']['RoomHeightPixel']), 
+                                             (17 + ix * self.parameters['General']['RoomHeightPixel'], 34 + iy * self.parameters['General']['RoomHeightPixel']),
+                                             (ix * self.parameters['General']['RoomHeightPixel'], 17 + iy * self.parameters['General']['RoomHeightPixel'])                                                         
+                                             ])
+
+                        pygame.draw.polygon(image, self.parameters['Colors']['RedRoomNoOxygen'], 
+                                            [(ix * self.parameters['General']['RoomHeightPixel'], iy * self.parameters['General']['RoomHeightPixel']), 
+                                             (34 + ix * self.parameters['General']['RoomHeightPixel'], 34 + iy * self.parameters['General']['RoomHeightPixel']), 
+                                             (34 + ix * self.parameters['General']['RoomHeightPixel'], 26 + iy * self.parameters['General']['RoomHeightPixel']),
+                                             (8 + ix * self.parameters['General']['RoomHeightPixel'], iy * self.parameters['General']['RoomHeightPixel'])                                                         
+                                             ])
+
+                        pygame.draw.polygon(image, self.parameters['Colors']['RedRoomNoOxygen'], 
+                                            [(18 + ix * self.parameters['General']['RoomHeightPixel'], iy * self.parameters['General']['RoomHeightPixel']), 
+                                             (34 + ix * self.parameters['General']['RoomHeightPixel'], 16 + iy * self.parameters['General']['RoomHeightPixel']), 
+                                             (34 + ix * self.parameters['General']['RoomHeightPixel'], 8 + iy * self.parameters['General']['RoomHeightPixel']),
+                                             (26 + ix * self.parameters['General']['RoomHeightPixel'], iy * self.parameters['General']['RoomHeightPixel'])                                                         
+                                             ])
+
+            # Roomlines
+            image.blit(surfaceRoomLines, [0,0])
 
-                    # Rect
-                    self.sprites[visible][status].rect = self.sprites[visible][status].image.get_rect()
-                    
-                    # Set rect on Canvas
-                    self.sprites[visible][status].rect.x = self.relevantSystemInformation['RoomOriginCoordCanvas'][0]
-                    self.sprites[visible][status].rect.y = self.relevantSystemInformation['RoomOriginCoordCanvas'][1]
-                    
-                    # Add room lines
-                    for ix in range(0, self.relevantSystemInformation['RoomWidth'] - 1):
-                        pygame.draw.rect(self.sprites[visible][status].image, self.parameters['Colors']['Grey1'], [(ix + 1) * self.parameters['General']['RoomHeightPixel'] - 1, 0, 2, self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel']])
-        
-                    for iy in range(0, self.relevantSystemInformation['RoomHeight'] - 1):
-                        pygame.draw.rect(self.sprites[visible][status].image, self.parameters['Colors']['Grey1'], [0, (iy + 1) * self.parameters['General']['RoomHeightPixel'] - 1, self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'], 2])
+            
+            # Add room sprites (only for player ship)                        
+            if self.playerShip:
+                if self.system is not None and self.relevantSystemInformation['BackgroundSprite']:
+                    if self.system == 'Clonebay':
+                        # First the clonebay background sprite, then the rest
+                        image.blit(pygame.transform.rotate(self.spritesAll['GeneralShip'].roomSprites[self.system]['Room'][0].image, 360 - (self.clonebayOrientation[2] - 1) * 90), [self.clonebayOrientation[0] * self.parameters['General']['RoomHeightPixel'], self.clonebayOrientation[1] * self.parameters['General']['RoomHeightPixel']])
+                        image.blit(pygame.transform.rotate(self.spritesAll['GeneralShip'].roomSprites[self.system]['Room'][1].image, 360 - (self.clonebayOrientation[2] - 1) * 90), [self.clonebayOrientation[0] * self.parameters['General']['RoomHeightPixel'], self.clonebayOrientation[1] * self.parameters['General']['RoomHeightPixel']])
+                
+                    elif self.system == 'CrewTeleporter':
+                        for ix in range(0, self.relevantSystemInformation['RoomWidth']):
+                            for iy in range(0, self.relevantSystemInformation['RoomHeight']):
+                                image.blit(self.spritesAll['GeneralShip'].roomSprites[self.system]['Room'].image, [ix * self.parameters['General']['RoomHeightPixel'] + (self.parameters['General']['RoomHeightPixel'] - 24) // 2, iy * self.parameters['General']['RoomHeightPixel'] + (self.parameters['General']['RoomHeightPixel'] - 23) // 2])
 
-                    # Draw the system sprite
-                    if self.system is not None and self.relevantSystemInformation['BackgroundSprite']:
-                        if self.system == 'Artillery':
-                            self.sprites[visible][status].image.blit(spritesAll['GeneralShip'].symbolSprites['Artillery'][colorSelection[status]].image, [2 + ((self.relevantSystemInformation['RoomWidth'] - 1) * self.parameters['General']['RoomHeightPixel']) // 2, 2 + ((self.relevantSystemInformation['RoomHeight'] - 1) * self.parameters['General']['RoomHeightPixel']) // 2])
-                        else:
-                            self.sprites[visible][status].image.blit(spritesAll['GeneralShip'].symbolSprites[self.system][colorSelection[status]].image, [2 + ((self.relevantSystemInformation['RoomWidth'] - 1) * self.parameters['General']['RoomHeightPixel']) // 2, 2 + ((self.relevantSystemInformation['RoomHeight'] - 1) * self.parameters['General']['RoomHeightPixel']) // 2])
+                    else:
+                        image.blit(self.spritesAll['GeneralShip'].roomSprites[self.system]['Room' + str(self.relevantSystemInformation['RoomSize'])][self.relevantSystemInformation['Sprite']].image, [0, 0])
+            
+            # Draw the system sprite
+            if self.system is not None:
+                if self.system == 'Artillery':
+                    image.blit(self.spritesAll['GeneralShip'].symbolSprites['Artillery'][colorSelection[status]].image, [2 + ((self.relevantSystemInformation['RoomWidth'] - 1) * self.parameters['General']['RoomHeightPixel']) // 2, 2 + ((self.relevantSystemInformation['RoomHeight'] - 1) * self.parameters['General']['RoomHeightPixel']) // 2])
+                else:
+                    image.blit(self.spritesAll['GeneralShip'].symbolSprites[self.system][colorSelection[status]].image, [2 + ((self.relevantSystemInformation['RoomWidth'] - 1) * self.parameters['General']['RoomHeightPixel']) // 2, 2 + ((self.relevantSystemInformation['RoomHeight'] - 1) * self.parameters['General']['RoomHeightPixel']) // 2])
+            
+            # Draw the walls
+            pygame.draw.rect(image, self.parameters['Colors']['Black'], [0, 0, self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'], 2])
+            pygame.draw.rect(image, self.parameters['Colors']['Black'], [0, 0, 2, self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel']])
+            pygame.draw.rect(image, self.parameters['Colors']['Black'], [self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'] - 2, 0, 2, self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel']])
+            pygame.draw.rect(image, self.parameters['Colors']['Black'], [0, self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel'] - 2, self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'], 2])
+            
+            # Check for doors, if true then remove the walls for that section
+            for iy in range(0, self.relevantSystemInformation['RoomHeight']):
+                # Left room doors
+                if self.doorOpenings['Left'][iy]:
+                    pygame.draw.rect(image, oxyColor, [0, self.parameters['General']['RoomHeightPixel'] * iy + self.parameters['General']['RoomHeightPixel'] // 2 - self.parameters['General']['DoorHeightPixel'] - 1, 2, 2 * self.parameters['General']['DoorHeightPixel'] + 3])
+
+                    if oxygenRounded == 0:
+                        pygame.draw.polygon(image, self.parameters['Colors']['RedRoomNoOxygen'], 
+                                            [(0, 9 + iy * self.parameters['General']['RoomHeightPixel']), 
+                                             (1, 10 + iy * self.parameters['General']['RoomHeightPixel']), 
+                                             (1, 18 + iy * self.parameters['General']['RoomHeightPixel']),
+                                             (0, 17 + iy * self.parameters['General']['RoomHeightPixel'])                                                         
+                                             ])
+                    
+                # Right room doors
+                if self.doorOpenings['Right'][iy]:
+                    pygame.draw.rect(image, oxyColor, [self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'] - 2, self.parameters['General']['RoomHeightPixel'] * iy + self.parameters['General']['RoomHeightPixel'] // 2 - self.parameters['General']['DoorHeightPixel'] - 1, 2, 2 * self.parameters['General']['DoorHeightPixel'] + 3])
+
+                    if oxygenRounded == 0:
+                        pygame.draw.polygon(image, self.parameters['Colors']['RedRoomNoOxygen'], 
+                                            [(self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'] - 2, 15 + iy * self.parameters['General']['RoomHeightPixel']), 
+                                             (self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'] - 1, 16 + iy * self.parameters['General']['RoomHeightPixel']), 
+                                             (self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'] - 1, 8 + iy * self.parameters['General']['RoomHeightPixel']),
+                                             (self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'] - 2, 7 + iy * self.parameters['General']['RoomHeightPixel'])                                                         
+                                             ])
+                        
+            for ix in range(0, self.relevantSystemInformation['RoomWidth']):
+                # Upper room doors
+                if self.doorOpenings['Upper'][ix]:
+                    pygame.draw.rect(image, oxyColor, [self.parameters['General']['RoomHeightPixel'] * ix + self.parameters['General']['RoomHeightPixel'] // 2 - self.parameters['General']['DoorHeightPixel'] - 1, 0, 2 * self.parameters['General']['DoorHeightPixel'] + 3, 2])
+
+                    if oxygenRounded == 0:
+                        pygame.draw.polygon(image, self.parameters['Colors']['RedRoomNoOxygen'], 
+                                            [(18 + ix * self.parameters['General']['RoomHeightPixel'], 0), 
+                                             (19 + ix * self.parameters['General']['RoomHeightPixel'], 1), 
+                                             (27 + ix * self.parameters['General']['RoomHeightPixel'], 1),
+                                             (26 + ix * self.parameters['General']['RoomHeightPixel'], 0)                                                         
+                                             ])
+                # Lower room doors
+                if self.doorOpenings['Lower'][ix]:
+                    pygame.draw.rect(image, oxyColor, [self.parameters['General']['RoomHeightPixel'] * ix + self.parameters['General']['RoomHeightPixel'] // 2 - self.parameters['General']['DoorHeightPixel'] - 1, self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel'] - 2, 2 * self.parameters['General']['DoorHeightPixel'] + 3, 2])
+
+                    if oxygenRounded == 0:
+                        pygame.draw.polygon(image, self.parameters['Colors']['RedRoomNoOxygen'], 
+                                            [(24 + ix * self.parameters['General']['RoomHeightPixel'], self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel'] - 2), 
+                                             (25 + ix * self.parameters['General']['RoomHeightPixel'], self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel'] - 1), 
+                                             (17 + ix * self.parameters['General']['RoomHeightPixel'], self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel'] - 1),
+                                             (16 + ix * self.parameters['General']['RoomHeightPixel'], self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel'] - 2)                                                         
+                                             ])
+    
+        else:   # Invisible
+            # Door openings use the color of a room with full oxygen
+            oxyColor = colorInterpolation(self.parameters['Colors']['GreyRoom'], self.parameters['Colors']['PinkRoom'], 1)
+            
+            image = pygame.Surface([self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'], self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel']])
+            image.fill(self.parameters['Colors']['Grey2'])
+            image.set_colorkey(self.parameters['Colors']['White'])
+            
+            # Add room lines
+            for ix in range(0, self.relevantSystemInformation['RoomWidth'] - 1):
+                pygame.draw.rect(image, self.parameters['Colors']['Grey1'], [(ix + 1) * self.parameters['General']['RoomHeightPixel'] - 1, 0, 2, self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel']])
 
-                    # Draw the walls
-                    pygame.draw.rect(self.sprites[visible][status].image, self.parameters['Colors']['Black'], [0, 0, self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'], 2])
-                    pygame.draw.rect(self.sprites[visible][status].image, self.parameters['Colors']['Black'], [0, 0, 2, self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel']])
-                    pygame.draw.rect(self.sprites[visible][status].image, self.parameters['Colors']['Black'], [self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'] - 2, 0, 2, self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel']])
-                    pygame.draw.rect(self.sprites[visible][status].image, self.parameters['Colors']['Black'], [0, self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel'] - 2, self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'], 2])
+            for iy in range(0, self.relevantSystemInformation['RoomHeight'] - 1):
+                pygame.draw.rect(image, self.parameters['Colors']['Grey1'], [0, (iy + 1) * self.parameters['General']['RoomHeightPixel'] - 1, self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'], 2])
 
-                    # Check for doors, if true then remove the walls for that section
-                    for iy in range(0, self.relevantSystemInformation['RoomHeight']):
-                        # Left room doors
-                        if doorMatrixVertical[self.relevantSystemInformation['RoomOriginCoord'][1] + iy, self.relevantSystemInformation['RoomOriginCoord'][0] - 1]:
-                            pygame.draw.rect(self.sprites[visible][status].image, oxyColor, [0, self.parameters['General']['RoomHeightPixel'] * iy + self.parameters['General']['RoomHeightPixel'] // 2 - self.parameters['General']['DoorHeightPixel'] - 1, 2, 2 * self.parameters['General']['DoorHeightPixel'] + 3])
-                            
-                        # Right room doors
-                        if doorMatrixVertical[self.relevantSystemInformation['RoomOriginCoord'][1] + iy, self.relevantSystemInformation['RoomOriginCoord'][0] - 1 + self.relevantSystemInformation['RoomWidth']]:
-                            pygame.draw.rect(self.sprites[visible][status].image, oxyColor, [self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'] - 2, self.parameters['General']['RoomHeightPixel'] * iy + self.parameters['General']['RoomHeightPixel'] // 2 - self.parameters['General']['DoorHeightPixel'] - 1, 2, 2 * self.parameters['General']['DoorHeightPixel'] + 3])
+            # Draw the system sprite
+            if self.system is not None and self.relevantSystemInformation['BackgroundSprite']:
+                if self.system == 'Artillery':
+                    image.blit(self.spritesAll['GeneralShip'].symbolSprites['Artillery'][colorSelection[status]].image, [2 + ((self.relevantSystemInformation['RoomWidth'] - 1) * self.parameters['General']['RoomHeightPixel']) // 2, 2 + ((self.relevantSystemInformation['RoomHeight'] - 1) * self.parameters['General']['RoomHeightPixel']) // 2])
+                else:
+                    image.blit(self.spritesAll['GeneralShip'].symbolSprites[self.system][colorSelection[status]].image, [2 + ((self.relevantSystemInformation['RoomWidth'] - 1) * self.parameters['General']['RoomHeightPixel']) // 2, 2 + ((self.relevantSystemInformation['RoomHeight'] - 1) * self.parameters['General']['RoomHeightPixel']) // 2])
+
+            # Draw the walls
+            pygame.draw.rect(image, self.parameters['Colors']['Black'], [0, 0, self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'], 2])
+            pygame.draw.rect(image, self.parameters['Colors']['Black'], [0, 0, 2, self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel']])
+            pygame.draw.rect(image, self.parameters['Colors']['Black'], [self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'] - 2, 0, 2, self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel']])
+            pygame.draw.rect(image, self.parameters['Colors']['Black'], [0, self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel'] - 2, self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'], 2])
+
+            # Check for doors, if true then remove the walls for that section
+            for iy in range(0, self.relevantSystemInformation['RoomHeight']):
+                # Left room doors
+                if self.doorOpenings['Left'][iy]:
+                    pygame.draw.rect(image, oxyColor, [0, self.parameters['General']['RoomHeightPixel'] * iy + self.parameters['General']['RoomHeightPixel'] // 2 - self.parameters['General']['DoorHeightPixel'] - 1, 2, 2 * self.parameters['General']['DoorHeightPixel'] + 3])
                     
-                    for ix in range(0, self.relevantSystemInformation['RoomWidth']):
-                        # Upper room doors
-                        if doorMatrixHorizontal[self.relevantSystemInformation['RoomOriginCoord'][1] - 1, self.relevantSystemInformation['RoomOriginCoord'][0] + ix]:
-                            pygame.draw.rect(self.sprites[visible][status].image, oxyColor, [self.parameters['General']['RoomHeightPixel'] * ix + self.parameters['General']['RoomHeightPixel'] // 2 - self.parameters['General']['DoorHeightPixel'] - 1, 0, 2 * self.parameters['General']['DoorHeightPixel'] + 3, 2])
-
-                        # Lower room doors
-                        if doorMatrixHorizontal[self.relevantSystemInformation['RoomOriginCoord'][1] - 1 + self.relevantSystemInformation['RoomHeight'], self.relevantSystemInformation['RoomOriginCoord'][0] + ix]:
-                            pygame.draw.rect(self.sprites[visible][status].image, oxyColor, [self.parameters['General']['RoomHeightPixel'] * ix + self.parameters['General']['RoomHeightPixel'] // 2 - self.parameters['General']['DoorHeightPixel'] - 1, self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel'] - 2, 2 * self.parameters['General']['DoorHeightPixel'] + 3, 2])
+                # Right room doors
+                if self.doorOpenings['Right'][iy]:
+                    pygame.draw.rect(image, oxyColor, [self.relevantSystemInformation['RoomWidth'] * self.parameters['General']['RoomHeightPixel'] - 2, self.parameters['General']['RoomHeightPixel'] * iy + self.parameters['General']['RoomHeightPixel'] // 2 - self.parameters['General']['DoorHeightPixel'] - 1, 2, 2 * self.parameters['General']['DoorHeightPixel'] + 3])
+            
+            for ix in range(0, self.relevantSystemInformation['RoomWidth']):
+                # Upper room doors
+                if self.doorOpenings['Upper'][ix]:
+                    pygame.draw.rect(image, oxyColor, [self.parameters['General']['RoomHeightPixel'] * ix + self.parameters['General']['RoomHeightPixel'] // 2 - self.parameters['General']['DoorHeightPixel'] - 1, 0, 2 * self.parameters['General']['DoorHeightPixel'] + 3, 2])
+
+                # Lower room doors
+                if self.doorOpenings['Lower'][ix]:
+                    pygame.draw.rect(image, oxyColor, [self.parameters['General']['RoomHeightPixel'] * ix + self.parameters['General']['RoomHeightPixel'] // 2 - self.parameters['General']['DoorHeightPixel'] - 1, self.relevantSystemInformation['RoomHeight'] * self.parameters['General']['RoomHeightPixel'] - 2, 2 * self.parameters['General']['DoorHeightPixel'] + 3, 2])
+        
+        return(image)
 
 
     ###
@@ -419,17 +509,27 @@ class room(object):
             self.console = False
 
 
+    ###
+    # Console glow to be drawn: 0: Blue console, 1: Green console, 2: Gold console, None: No glow
+    def getConsoleGlowLevel(self) -> [None, int]:
+        if self.console and self.consoleWithLevels and (self.status == 0):
+            if not self.hacked:
+                return(self.crewLevel)
+            else:
+                return(0)
+        
+        return(None)
+
+
     ###
     # Add the console glow and the console itself for enemy ships
-    def drawConsole(self) -> None:
+    def drawConsole(self, image: pygame.Surface) -> None:
         if self.console:
             if not self.playerShip: # Console needs to be added
-                self.currentSprite.image.blit(pygame.transform.rotate(self.consoleBaseSprite.image, 180 - (self.consolePosition[2] - 1) * 90), [self.consolePosition[0] * self.parameters['General']['RoomHeightPixel'], self.consolePosition[1] * self.parameters['General']['RoomHeightPixel']])
+                image.blit(pygame.transform.rotate(self.consoleBaseSprite.image, 180 - (self.consolePosition[2] - 1) * 90), [self.consolePosition[0] * self.parameters['General']['RoomHeightPixel'], self.consolePosition[1] * self.parameters['General']['RoomHeightPixel']])
             
-            if self.consoleWithLevels and (self.status == 0):  # Only these consoles get colors
-                if (self.status == 0) and not self.hacked:
-                    self.currentSprite.image.blit(pygame.transform.rotate(self.consoleSprites[self.crewLevel].image, 180 - (self.consolePosition[2] - 1) * 90), [self.consolePosition[0] * self.parameters['General']['RoomHeightPixel'] + self.consoleAdjust[self.consolePosition[2]][0], self.consolePosition[1] * self.parameters['General']['RoomHeightPixel'] + self.consoleAdjust[self.consolePosition[2]][1]])
-                else:
-                    self.currentSprite.image.blit(pygame.transform.rotate(self.consoleSprites[0].image, 180 - (self.consolePosition[2] - 1) * 90), [self.consolePosition[0] * self.parameters['General']['RoomHeightPixel'] + self.consoleAdjust[self.consolePosition[2]][0], self.consolePosition[1] * self.parameters['General']['RoomHeightPixel'] + self.consoleAdjust[self.consolePosition[2]][1]])
+            consoleGlowLevel = self.getConsoleGlowLevel()
+            if consoleGlowLevel is not None:  # Only these consoles get colors
+                image.blit(pygame.transform.rotate(self.consoleSprites[consoleGlowLevel].image, 180 - (self.consolePosition[2] - 1) * 90), [self.consolePosition[0] * self.parameters['General']['RoomHeightPixel'] + self.consoleAdjust[self.consolePosition[2]][0], self.consolePosition[1] * self.parameters['General']['RoomHeightPixel'] + self.consoleAdjust[self.consolePosition[2]][1]])
                             
     
\ No newline at end of file
@@ -0,0 +1,120 @@
+###
+#
+# Define a class which pre-composites the rooms and doors of a ship onto a single surface
+#
+###
+
+
+###
+# Load packages
+
+# Logging
+import logging
+
+# Typing
+from typing import List
+
+# Pygame
+import pygame
+
+
+###
+# Setup logging
+logger = logging.getLogger(__name__)
+
+
+###
+# Define the baked ship layer class
+class bakedShipLayer(object):
+    """
+    
+    Single sprite holding all the rooms and doors of a ship drawn onto each other, so drawing them is a single blit instead of one per element.
+    The layer is rebuilt completely with rebuild(), e.g. after the ship was moved, and only the regions of changed rooms and doors are redrawn with patch().
+    Rooms and doors are opaque apart from their colorkey white, so the layer uses the same colorkey and looks exactly like the individual sprites drawn on top of the hull.
+    
+    Init:
+        - ship [baseShip]: Ship to be drawn
+    
+    Fields:
+        - ship [baseShip]: Ship to be drawn
+        - sprite [pygame.sprite.Sprite]: Sprite with the composited image, covering all rooms and doors
+    
+    Methods:
+        - rebuild(): Redraw the whole layer from the current ship sprites and positions
+        - rebuildIfMoved(): Rebuild the layer only if the rooms and doors were moved since the last rebuild
+        - patch(dirtyRects [List]): Redraw only the given regions (in screen coordinates) of the layer
+        - getShipSprites(): Returns the room and door sprites of the ship in drawing order
+    
+    """
+    
+    
+    ###
+    # Initialization
+    def __init__(self, ship) -> None:
+        logger.debug('Initialize the baked layer of the {} ship'.format('player' if ship.playerShip else 'enemy'))
+        
+        self.ship = ship
+        
+        self.sprite = pygame.sprite.Sprite()
+        
+        self.rebuild()
+    
+    
+    ###
+    # Sprites in drawing order
+    def getShipSprites(self) -> List:
+        shipSprites = [activeSprite['Sprite'] for activeSprite in self.ship.activeSprites['Rooms'].values()]
+        shipSprites += [activeSprite['Sprite'] for activeSprite in self.ship.activeSprites['Doors'].values()]
+        
+        return(shipSprites)
+    
+    
+    ###
+    # Draw the whole layer
+    def rebuild(self) -> None:
+        logger.debug('Rebuild the baked layer of the {} ship'.format('player' if self.ship.playerShip else 'enemy'))
+        
+        ###
+        # The layer covers all the rooms and doors
+        shipSprites = self.getShipSprites()
+        self.sprite.rect = shipSprites[0].rect.unionall([sprite.rect for sprite in shipSprites[1:]])
+        
+        self.sprite.image = pygame.Surface(self.sprite.rect.size).convert()
+        self.sprite.image.set_colorkey(self.ship.parameters['Colors']['White'])
+        
+        
+        ###
+        # Draw everything
+        self.patch([self.sprite.rect])
+    
+    
+    ###
+    # Rebuild only if the ship was moved
+    def rebuildIfMoved(self) -> None:
+        shipSprites = self.getShipSprites()
+        if shipSprites[0].rect.unionall([sprite.rect for sprite in shipSprites[1:]]) != self.sprite.rect:
+            self.rebuild()
+    
+    
+    ###
+    # Redraw the given regions of the layer
+    def patch(self, dirtyRects: List) -> None:
+        shipSprites = self.getShipSprites()
+        
+        for dirtyRect in dirtyRects:
+            ##
+            # Region relative to the layer
+            layerRect = dirtyRect.clip(self.sprite.rect).move(-self.sprite.rect.x, -self.sprite.rect.y)
+            if not (layerRect.w and layerRect.h):
+                continue
+            
+            ##
+            # Clear the region and draw the overlapping elements into it
+            self.sprite.image.fill(self.ship.parameters['Colors']['White'], layerRect)
+            self.sprite.image.set_clip(layerRect)
+            
+            for sprite in shipSprites:
+                if sprite.rect.colliderect(dirtyRect):
+                    self.sprite.image.blit(sprite.image, sprite.rect.move(-self.sprite.rect.x, -self.sprite.rect.y))
+            
+            self.sprite.image.set_clip(None)
@@ -0,0 +1,140 @@
+###
+#
+# Define a class which holds all the sprites to be drawn onto the screen in named layers
+#
+###
+
+
+###
+# Load packages
+
+# Logging
+import logging
+
+# Typing
+from typing import List
+
+# Pygame
+import pygame
+
+
+###
+# Load ressources
+
+# Ships
+import src.classes.ships.base_ship as baseShip
+
+
+###
+# Setup logging
+logger = logging.getLogger(__name__)
+
+
+###
+# Define the scene class
+class drawScene(object):
+    """
+    
+    Long-lived collection of all the sprites which are drawn onto the screen, sorted into named layers.
+    Ships and ui elements register their sprites once and only swap them if a sprite object is replaced, so no sprite collection has to be built per frame.
+    Sprites which only change their image or rect (e.g. room.currentSprite, door.currentSprite) do not need to be swapped.
+    
+    Init:
+        - layerNames [List]: Names of the layers in drawing order (first layer is drawn first)
+    
+    Fields:
+        - layerNames [List]: Names of the layers in drawing order
+        - layerIndex [Dict]: Mapping layer name:layer number used in the sprite group
+        - spriteGroup [pygame.sprite.LayeredUpdates]: Sprite group holding all the registered sprites
+    
+    Methods:
+        - register(layerName [str], sprites [pygame.sprite.Sprite, List]): Add one or more sprites to the given layer
+        - unregister(sprites [pygame.sprite.Sprite, List]): Remove one or more sprites from the scene
+        - swap(layerName [str], oldSprite [pygame.sprite.Sprite, None], newSprite [pygame.sprite.Sprite, None]): Replace a sprite in the given layer, None is ignored
+        - clearLayer(layerName [str]): Remove all the sprites of a layer
+        - registerShip(ship [baseShip], layerPrefix [str], drawingOrder [List]): Add the shield and hull sprites of a ship to the layers layerPrefix + field, the other fields (e.g. the baked rooms and doors) are registered by their owners
+        - draw(surface [pygame.Surface]): Draw all sprites onto the surface, returns the list of drawn rects
+        - sprites(): Returns all the sprites in drawing order
+    
+    """
+    
+    
+    ###
+    # Initialization
+    def __init__(self, layerNames: List) -> None:
+        logger.debug('Initialize the draw scene object')
+        
+        ###
+        # Save the layer order
+        self.layerNames = list(layerNames)
+        self.layerIndex = {layerName: index for index, layerName in enumerate(self.layerNames)}
+        
+        
+        ###
+        # Create the sprite group
+        self.spriteGroup = pygame.sprite.LayeredUpdates()
+    
+    
+    ###
+    # Add sprites to a layer
+    def register(self, layerName: str, sprites: [pygame.sprite.Sprite, List]) -> None:
+        self.spriteGroup.add(sprites, layer = self.layerIndex[layerName])
+    
+    
+    ###
+    # Remove sprites from the scene
+    def unregister(self, sprites: [pygame.sprite.Sprite, List]) -> None:
+        self.spriteGroup.remove(sprites)
+    
+    
+    ###
+    # Replace a sprite within a layer
+    def swap(self, layerName: str, oldSprite: [pygame.sprite.Sprite, None], newSprite: [pygame.sprite.Sprite, None]) -> None:
+        if oldSprite is newSprite:
+            return
+        
+        if oldSprite is not None:
+            self.spriteGroup.remove(oldSprite)
+        
+        if newSprite is not None:
+            self.spriteGroup.add(newSprite, layer = self.layerIndex[layerName])
+    
+    
+    ###
+    # Remove all sprites from a layer
+    def clearLayer(self, layerName: str) -> None:
+        self.spriteGroup.remove_sprites_of_layer(self.layerIndex[layerName])
+    
+    
+    ###
+    # Add all the sprites of a ship in the given drawing order
+    def registerShip(self, ship: baseShip.baseShip, layerPrefix: str, drawingOrder: List) -> None:
+        logger.debug('Register the sprites of the {} ship'.format(layerPrefix.lower()))
+        
+        for field in drawingOrder:
+            # Shields
+            if field == 'Shield':
+                if ship.activeSprites['Shields'] is not None:  # Shield is present
+                    self.register(layerPrefix + field, ship.activeSprites['Shields']['Sprite'])
+            
+            # Hull
+            elif field == 'ShipHull':
+                self.register(layerPrefix + field, ship.shipSprites['Base'])
+    
+    
+    ###
+    # Draw the whole scene
+    def draw(self, surface: pygame.Surface) -> List:
+        return(self.spriteGroup.draw(surface))
+    
+    
+    ###
+    # Return all sprites in drawing order
+    def sprites(self) -> List:
+        return(self.spriteGroup.sprites())
+    
+    
+    ###
+    # Number of registered sprites
+    def __len__(self) -> int:
+        return(len(self.spriteGroup))
@@ -12,7 +12,7 @@
 import logging
 
 # Typing
-from typing import Dict
+from typing import Dict, Tuple
 
 # Arrays and matrices
 import numpy as np
@@ -30,8 +30,11 @@ import copy
 # Ships
 import src.classes.ships.player_ship as playerShip
 
+# Cache for the created ui sprites
+import src.classes.elements.image_cache as imageCache
+
 # Helperfunctions
-from src.misc.helperfunctions import copySprite, powerBarsMainSystem
+from src.misc.helperfunctions import referenceSprite, powerBarsMainSystem
 
 
 ###
@@ -45,13 +48,18 @@ class energyManagementUi(object):
     """
     
     Object which controls the UI-elements corresponding to energy management.
+    The ui sprites reference the loaded sprite images instead of copies. The sprites created for a given power state are cached, so switching between known states does not create new sprites.
     
     Fields:
         - parameters [Dict]: All loaded parameters
         - spritesAll [Dict]: All loaded sprites
-
-        - energySystemsRectMatrix [np.matrix]: Matrix of all system rects for the energy management ui
-        - energySystemsForRects [np.array]: Vector of the systems corresponding to the energySystemsRectMatrix rows
+        - uiSprites [List]: Ui sprites for the current power state
+        - spriteCache [imageCache]: Created ui sprites and system rects by power state
+    
+    Methods:
+        - updateScreenSprites(screenRect [pygame.Rect], saveRects [bool]): Select the ui sprites for the current power state and register the system symbols as clickable elements of the player ship if requested
+        - getPowerStateKey(screenRect [pygame.Rect]): Returns a key describing everything the ui sprites depend on
+        - createScreenSprites(screenRect [pygame.Rect]): Create the ui sprites and the system rects for the current power state
     
     
     """
@@ -68,26 +76,64 @@ class energyManagementUi(object):
         self.activePlayerShip = activePlayerShip
         
         self.uiSprites = list()
-                
-        
-        ###
-        # Initialize dictionary
-        self.energySystemsRectMatrix = dict()
+        self.spriteCache = imageCache.imageCache('energy ui', self.parameters['General']['EnergyUiCacheSize'])
         
     
     ###
-    # Function that selects and returns the appropriate sprites for the power ui
+    # Function that selects the appropriate sprites for the power ui
     def updateScreenSprites(self, screenRect: pygame.Rect, saveRects: bool = False) -> None:
         ###
         # screenRect is the rect of the screen given by screen.get_rect()
         # screenRect = screen.get_rect()
         #
-        # saveRects: When true, then the rects for the control are saved. Should only be called initially or when systems are added
+        # saveRects: When true, then the system symbols are registered as clickable elements. Should only be called initially or when systems are added
+        
+        
+        ###
+        # Get the sprites for the current state, create them if the state is new
+        uiSprites, systemRectVector, systemRectList = self.spriteCache.get(self.getPowerStateKey(screenRect), lambda: self.createScreenSprites(screenRect))
+        
+        
+        ###
+        # Register the symbols as clickable elements of the player ship
+        if saveRects:
+            self.activePlayerShip.hitTargets.removeGroup('Systems')
+            for system, rect in zip(systemRectVector, systemRectList):
+                self.activePlayerShip.hitTargets.addCircle('Systems', system, rect.center, self.parameters['General']['UiEnergySymbolsMaxDistance'])
         
         
         ###
-        # Delete and reinitialize the list with the sprites to be returned
-        del self.uiSprites
+        # Save the list
+        self.uiSprites = uiSprites
+    
+    
+    ###
+    # Key of the current power state. Contains everything the ui sprites depend on
+    def getPowerStateKey(self, screenRect: pygame.Rect) -> Tuple:
+        ###
+        # Reactor
+        reactorKey = tuple(self.activePlayerShip.reactor[field] for field in ['SystemPower', 'SystemBackupPower', 'PowerBlocked', 'PowerAvailable', 'BackupPowerAvailable'])
+        
+        
+        ###
+        # Systems with their power and condition
+        systemsKey = list()
+        for system in sorted(self.activePlayerShip.systems.keys()):
+            if (system in self.activePlayerShip.systemsPresent) or (system in ['WeaponControl', 'DroneControl']):
+                systemInformation = self.activePlayerShip.systems[system]
+                systemsKey.append((system, ) + tuple(systemInformation[field] for field in ['PowerCurrent', 'PowerMax', 'PowerCooldown', 'PowerZoltans', 'PowerBackup', 'PowerBlocked', 'IonCharges', 'Damaged', 'Destroyed']))
+        
+        
+        ###
+        # Return
+        return((tuple(screenRect), self.activePlayerShip.weapons['WeaponSlotsAvailable'], reactorKey, tuple(systemsKey)))
+    
+    
+    ###
+    # Function that creates the sprites for the power ui and the rects of the system symbols
+    def createScreenSprites(self, screenRect: pygame.Rect) -> Tuple:
+        ###
+        # Initialize the list with the sprites to be returned
         uiSprites = list()
         
         
@@ -114,20 +160,20 @@ class energyManagementUi(object):
         ###
         # Add the reactor sprites to the output list
         if totalUsedPower == 0: # No power used, no grey wires needed
-            uiSprites.append(copySprite(self.spritesAll['EnergyUi'].wires['ReactorPowerAvailable'][totalReactorPower]))
+            uiSprites.append(referenceSprite(self.spritesAll['EnergyUi'].wires['ReactorPowerAvailable'][totalReactorPower]))
             uiSprites[-1].rect.bottomleft = screenOffset
             
             greyWires = ''
         elif totalAvailablePower: # Power available: Both white and grey wires
-            uiSprites.append(copySprite(self.spritesAll['EnergyUi'].wires['ReactorPowerAvailableGrey'][totalReactorPower]))
+            uiSprites.append(referenceSprite(self.spritesAll['EnergyUi'].wires['ReactorPowerAvailableGrey'][totalReactorPower]))
             uiSprites[-1].rect.bottomleft = screenOffset
             
-            uiSprites.append(copySprite(self.spritesAll['EnergyUi'].wires['ReactorPowerAvailable'][totalAvailablePower]))
+            uiSprites.append(referenceSprite(self.spritesAll['EnergyUi'].wires['ReactorPowerAvailable'][totalAvailablePower]))
             uiSprites[-1].rect.bottomleft = screenOffset
             
             greyWires = ''
         else:   # No power available
-            uiSprites.append(copySprite(self.spritesAll['EnergyUi'].wires['ReactorPowerAvailableGrey'][totalReactorPower]))
+            uiSprites.append(referenceSprite(self.spritesAll['EnergyUi'].wires['ReactorPowerAvailableGrey'][totalReactorPower]))
             uiSprites[-1].rect.bottomleft = screenOffset
 
             greyWires = 'Grey'
@@ -144,7 +190,7 @@ class energyManagementUi(object):
         
         # Normal available power
         for i in range(0, totalAvailableNormalPower):
-            uiSprites.append(copySprite(self.spritesAll['EnergyUi'].bars['WideGreen']))
+            uiSprites.append(referenceSprite(self.spritesAll['EnergyUi'].bars['WideGreen']))
             uiSprites[-1].rect.bottomleft = screenBarOffset.copy()
             uiSprites[-1].rect.y -= barOffset
             
@@ -152,7 +198,7 @@ class energyManagementUi(object):
             
         # Backup battery available power
         for i in range(0, totalAvailableBackupPower):
-            uiSprites.append(copySprite(self.spritesAll['EnergyUi'].bars['WideBackup']))
+            uiSprites.append(referenceSprite(self.spritesAll['EnergyUi'].bars['WideBackup']))
             uiSprites[-1].rect.bottomleft = screenBarOffset.copy()
             uiSprites[-1].rect.y -= barOffset
             
@@ -160,7 +206,7 @@ class energyManagementUi(object):
 
         # Power used
         for i in range(0, totalUsedPower):
-            uiSprites.append(copySprite(self.spritesAll['EnergyUi'].bars['WideUsed']))
+            uiSprites.append(referenceSprite(self.spritesAll['EnergyUi'].bars['WideUsed']))
             uiSprites[-1].rect.bottomleft = screenBarOffset.copy()
             uiSprites[-1].rect.y -= barOffset
             
@@ -168,7 +214,7 @@ class energyManagementUi(object):
 
         # Blocked power
         for i in range(0, totalBlockedPower):
-            uiSprites.append(copySprite(self.spritesAll['EnergyUi'].bars['WideBlocked']))
+            uiSprites.append(referenceSprite(self.spritesAll['EnergyUi'].bars['WideBlocked']))
             uiSprites[-1].rect.bottomleft = screenBarOffset.copy()
             uiSprites[-1].rect.y -= barOffset
             
@@ -183,15 +229,14 @@ class energyManagementUi(object):
             if system in presentSystems:
                 systemsInDrawingOrder.append(system)
         
-        if saveRects:
-            systemRectVector = list()
-            systemRectList = list()
+        systemRectVector = list()
+        systemRectList = list()
         
         # Go through all the systems but the last one
         for index, system in enumerate(systemsInDrawingOrder[0:-1]):
             ###
             # Add the wires
-            uiSprites.append(copySprite(self.spritesAll['EnergyUi'].wires[self.parameters['EnergyManagementUi']['Wires']['TypePerSystem'][system] + 'Path' + greyWires]))
+            uiSprites.append(referenceSprite(self.spritesAll['EnergyUi'].wires[self.parameters['EnergyManagementUi']['Wires']['TypePerSystem'][system] + 'Path' + greyWires]))
             uiSprites[-1].rect.bottomleft = screenOffsetWires
             uiSprites[-1].rect.x += pixelOffset
             
@@ -216,15 +261,15 @@ class energyManagementUi(object):
                 colorSymbol = 'Grey' + suffix
             
             if colorSymbol != 'Ionized':
-                uiSprites.append(copySprite(self.spritesAll['GeneralShip'].symbolSprites[system][colorSymbol]))
+                uiSprites.append(referenceSprite(self.spritesAll['GeneralShip'].symbolSprites[system][colorSymbol]))
                 uiSprites[-1].rect.bottomleft = screenOffsetWires + self.parameters['General']['UiEnergySymbolsOffset']
                 uiSprites[-1].rect.x += pixelOffsetSymbols
                 if index == 0:
                     uiSprites[-1].rect.x += self.parameters['General']['UiEnergyWeaponSymbolFirst']
                 
-                if saveRects:
-                    systemRectVector.append(system)
-                    systemRectList.append(uiSprites[-1].rect)
+                # Save the rect for the controls
+                systemRectVector.append(system)
+                systemRectList.append(uiSprites[-1].rect)
                 
                 pixelOffsetSymbols += uiSprites[-2].rect.width
             else:
@@ -239,7 +284,7 @@ class energyManagementUi(object):
             
             offsetBar = 0
             for index, bar in enumerate(powerBars):
-                uiSprites.append(copySprite(self.spritesAll['EnergyUi'].bars[bar]))
+                uiSprites.append(referenceSprite(self.spritesAll['EnergyUi'].bars[bar]))
                 uiSprites[-1].rect.bottomleft = symbolRect
                 uiSprites[-1].rect.y -= offsetBar
                 
@@ -252,7 +297,7 @@ class energyManagementUi(object):
         # Last system: Sprites depends on whether drone control is present or not
         system = systemsInDrawingOrder[-1]
         if 'DroneControl' in presentSystems:
-            uiSprites.append(copySprite(self.spritesAll['EnergyUi'].wires[self.parameters['EnergyManagementUi']['Wires']['TypePerSystem'][system] + 'Path' + greyWires]))
+            uiSprites.append(referenceSprite(self.spritesAll['EnergyUi'].wires[self.parameters['EnergyManagementUi']['Wires']['TypePerSystem'][system] + 'Path' + greyWires]))
             uiSprites[-1].rect.bottomleft = screenOffsetWires
             uiSprites[-1].rect.x += pixelOffset
 
@@ -276,13 +321,13 @@ class energyManagementUi(object):
                 colorSymbol = 'Grey' + suffix
             
             if colorSymbol != 'Ionized':
-                uiSprites.append(copySprite(self.spritesAll['GeneralShip'].symbolSprites[system][colorSymbol]))
+                uiSprites.append(referenceSprite(self.spritesAll['GeneralShip'].symbolSprites[system][colorSymbol]))
                 uiSprites[-1].rect.bottomleft = screenOffsetWires + self.parameters['General']['UiEnergySymbolsOffset']
                 uiSprites[-1].rect.x += pixelOffsetSymbols
 
-                if saveRects:
-                    systemRectVector.append(system)
-                    systemRectList.append(uiSprites[-1].rect)
+                # Save the rect for the controls
+                systemRectVector.append(system)
+                systemRectList.append(uiSprites[-1].rect)
                 
                 pixelOffsetSymbols += uiSprites[-2].rect.width
             else:
@@ -297,7 +342,7 @@ class energyManagementUi(object):
             
             offsetBar = 0
             for index, bar in enumerate(powerBars):
-                uiSprites.append(copySprite(self.spritesAll['EnergyUi'].bars[bar]))
+                uiSprites.append(referenceSprite(self.spritesAll['EnergyUi'].bars[bar]))
                 uiSprites[-1].rect.bottomleft = symbolRect
                 uiSprites[-1].rect.y -= offsetBar
                 
@@ -326,13 +371,13 @@ class energyManagementUi(object):
                 colorSymbol = 'Grey' + suffix
             
             if colorSymbol != 'Ionized':
-                uiSprites.append(copySprite(self.spritesAll['GeneralShip'].symbolSprites[system][colorSymbol]))
+                uiSprites.append(referenceSprite(self.spritesAll['GeneralShip'].symbolSprites[system][colorSymbol]))
                 uiSprites[-1].rect.bottomleft = screenOffsetWires + self.parameters['General']['UiEnergySymbolsOffset']
                 uiSprites[-1].rect.x += pixelOffsetSymbols
 
-                if saveRects:
-                    systemRectVector.append(system)
-                    systemRectList.append(uiSprites[-1].rect)
+                # Save the rect for the controls
+                systemRectVector.append(system)
+                systemRectList.append(uiSprites[-1].rect)
             else:
                 logger.warning('Symbol for ionized systems not implemented yet')
 
@@ -344,7 +389,7 @@ class energyManagementUi(object):
             
             offsetBar = 0
             for index, bar in enumerate(powerBars):
-                uiSprites.append(copySprite(self.spritesAll['EnergyUi'].bars[bar]))
+                uiSprites.append(referenceSprite(self.spritesAll['EnergyUi'].bars[bar]))
                 uiSprites[-1].rect.bottomleft = symbolRect
                 uiSprites[-1].rect.y -= offsetBar
                 
@@ -356,12 +401,12 @@ class energyManagementUi(object):
             
             # Add drone control wire
             if self.activePlayerShip.weapons['WeaponSlotsAvailable'] == 3:
-                uiSprites.append(copySprite(self.spritesAll['EnergyUi'].wires['UnderWeapons3' + greyWires]))
+                uiSprites.append(referenceSprite(self.spritesAll['EnergyUi'].wires['UnderWeapons3' + greyWires]))
                 uiSprites[-1].rect.bottomleft = screenOffsetWires
                 uiSprites[-1].rect.x += pixelOffset
 
             elif self.activePlayerShip.weapons['WeaponSlotsAvailable'] == 4:
-                uiSprites.append(copySprite(self.spritesAll['EnergyUi'].wires['UnderWeapons4' + greyWires]))
+                uiSprites.append(referenceSprite(self.spritesAll['EnergyUi'].wires['UnderWeapons4' + greyWires]))
                 uiSprites[-1].rect.bottomleft = screenOffsetWires
                 uiSprites[-1].rect.x += pixelOffset
 
@@ -391,13 +436,13 @@ class energyManagementUi(object):
                 colorSymbol = 'Grey' + suffix
             
             if colorSymbol != 'Ionized':
-                uiSprites.append(copySprite(self.spritesAll['GeneralShip'].symbolSprites[system][colorSymbol]))
+                uiSprites.append(referenceSprite(self.spritesAll['GeneralShip'].symbolSprites[system][colorSymbol]))
                 uiSprites[-1].rect.bottomleft = screenOffsetWires + self.parameters['General']['UiEnergySymbolsOffset']
                 uiSprites[-1].rect.x += pixelOffsetSymbols + self.parameters['General']['UiEnergyWeaponSymbolCorrection']
 
-                if saveRects:
-                    systemRectVector.append(system)
-                    systemRectList.append(uiSprites[-1].rect)
+                # Save the rect for the controls
+                systemRectVector.append(system)
+                systemRectList.append(uiSprites[-1].rect)
             else:
                 logger.warning('Symbol for ionized systems not implemented yet')
 
@@ -409,7 +454,7 @@ class energyManagementUi(object):
             
             offsetBar = 0
             for index, bar in enumerate(powerBars):
-                uiSprites.append(copySprite(self.spritesAll['EnergyUi'].bars[bar]))
+                uiSprites.append(referenceSprite(self.spritesAll['EnergyUi'].bars[bar]))
                 uiSprites[-1].rect.bottomleft = symbolRect
                 uiSprites[-1].rect.y -= offsetBar
                 
@@ -421,7 +466,7 @@ class energyManagementUi(object):
         else:
             ###
             # Add the wire
-            uiSprites.append(copySprite(self.spritesAll['EnergyUi'].wires[self.parameters['EnergyManagementUi']['Wires']['TypePerSystem'][system] + 'EndPath' + greyWires]))
+            uiSprites.append(referenceSprite(self.spritesAll['EnergyUi'].wires[self.parameters['EnergyManagementUi']['Wires']['TypePerSystem'][system] + 'EndPath' + greyWires]))
             uiSprites[-1].rect.bottomleft = screenOffsetWires
             uiSprites[-1].rect.x += pixelOffset
 
@@ -444,13 +489,13 @@ class energyManagementUi(object):
                 colorSymbol = 'Grey' + suffix
             
             if colorSymbol != 'Ionized':
-                uiSprites.append(copySprite(self.spritesAll['GeneralShip'].symbolSprites[system][colorSymbol]))
+                uiSprites.append(referenceSprite(self.spritesAll['GeneralShip'].symbolSprites[system][colorSymbol]))
                 uiSprites[-1].rect.bottomleft = screenOffsetWires + self.parameters['General']['UiEnergySymbolsOffset']
                 uiSprites[-1].rect.x += pixelOffsetSymbols
 
-                if saveRects:
-                    systemRectVector.append(system)
-                    systemRectList.append(uiSprites[-1].rect)
+                # Save the rect for the controls
+                systemRectVector.append(system)
+                systemRectList.append(uiSprites[-1].rect)
                 
                 pixelOffsetSymbols += uiSprites[-2].rect.width
             else:
@@ -477,13 +522,13 @@ class energyManagementUi(object):
                 colorSymbol = 'Grey' + suffix
             
             if colorSymbol != 'Ionized':
-                uiSprites.append(copySprite(self.spritesAll['GeneralShip'].symbolSprites[system][colorSymbol]))
+                uiSprites.append(referenceSprite(self.spritesAll['GeneralShip'].symbolSprites[system][colorSymbol]))
                 uiSprites[-1].rect.bottomleft = screenOffsetWires + self.parameters['General']['UiEnergySymbolsOffset']
                 uiSprites[-1].rect.x += pixelOffsetSymbols + self.parameters['General']['UiEnergyWeaponSymbolCorrection']
 
-                if saveRects:
-                    systemRectVector.append(system)
-                    systemRectList.append(uiSprites[-1].rect)
+                # Save the rect for the controls
+                systemRectVector.append(system)
+                systemRectList.append(uiSprites[-1].rect)
 
             else:
                 logger.warning('Symbol for ionized systems not implemented yet')
@@ -496,7 +541,7 @@ class energyManagementUi(object):
             
             offsetBar = 0
             for index, bar in enumerate(powerBars):
-                uiSprites.append(copySprite(self.spritesAll['EnergyUi'].bars[bar]))
+                uiSprites.append(referenceSprite(self.spritesAll['EnergyUi'].bars[bar]))
                 uiSprites[-1].rect.bottomleft = symbolRect
                 uiSprites[-1].rect.y -= offsetBar
                 
@@ -506,49 +551,11 @@ class energyManagementUi(object):
                     offsetBar += self.parameters['General']['BarPixelsSkip'] + uiSprites[-1].rect.height
                     
         
-        if saveRects:
-            self.energySystemsForRects = np.array(systemRectVector)
-            self.energySystemsRectMatrix = np.array(systemRectList)
-
-            # Save the center point of the symbols to check whether they have been clicked on in the main loop
-            self.energySystemsRectCenters = np.array([rect.center for rect in systemRectList])
-
-            # Reference the Rects also in the player ship
-            self.activePlayerShip.energySystemsForRects = self.energySystemsForRects
-            self.activePlayerShip.energySystemsRectMatrix = self.energySystemsRectMatrix
-            self.activePlayerShip.energySystemsRectCenters = self.energySystemsRectCenters
-            
-        
         ###
         # Add the subsystems
             
 
         
         ###
-        # Save the list
-        self.uiSprites = uiSprites
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+        # Return the sprites and the system rects
+        return((uiSprites, systemRectVector, systemRectList))
@@ -12,7 +12,7 @@
 import logging
 
 # Typing
-from typing import Dict
+from typing import Dict, List
 
 # Arrays and matrices
 import numpy as np
@@ -29,12 +29,22 @@ import src.classes.setup.background_images as backgroundImages
 
 # Ships
 import src.classes.ships.player_ship as playerShip
+import src.classes.ships.enemy_ship as enemyShip
 
 # Energy management ui
 import src.classes.screen.energy_management_ui as energyManagementUi
 
+# Layered scene of all the sprites to be drawn
+import src.classes.screen.draw_scene as drawScene
+
+# Pre-composited rooms and doors
+import src.classes.screen.baked_ship_layer as bakedShipLayer
+
+# Frame profiling
+import src.misc.frame_profiler as frameProfiler
+
 # Helperfunctions
-from src.misc.helperfunctions import copySprite
+from src.misc.helperfunctions import copySprite, copySurfaceRegion, mergeRects
 
 
 ###
@@ -48,7 +58,7 @@ class updateScreen(object):
     """
     
     Object which takes all the active sprites to be drawn and draws them onto the screen.
-    All objects come with a draw [bool] attribute, which could be used to not always draw everything onto the screen, but this is not implemented yet. This would increase the drawing speed if it turnes out to be too slow.
+    All objects come with a draw [bool] attribute. If parameters['General']['DirtyRectRendering'] is set, only the regions of sprites flagged for drawing (plus changed shields, energy ui and pause elements) are redrawn on top of the restored background, and only those regions are pushed to the display.
     
     Fields:
         - screen [pygame.Surface]: Active pygame window
@@ -60,10 +70,26 @@ class updateScreen(object):
         
         - orderDrawingPlayerShip [List]: Order in which the individual elements for the player ship are to be drawn
         - orderDrawingEnemyShip [List]: Order in which the individual elements for the enemy ship are to be drawn
+        - scene [drawScene]: Long-lived layered collection of all the sprites to be drawn. Ships and ui elements are registered once and sprites are only swapped if they are replaced
+        - bakedShipLayers [Dict]: Baked layers with the rooms and doors for the player and the enemy ship (None if no enemy ship is active)
+        
+        - fullRedraw [bool]: If true, the whole screen is redrawn with the next call of drawScreen()
+        - drawnShieldSprites [Dict]: Shield sprites drawn last for the player and the enemy ship (None if no shield was drawn)
+        - drawnPause [int]: Pause element drawn last (0 if none)
+        - enemyBoxComposite [pygame.sprite.Sprite, None]: Cached enemy box with the enemy ship drawn onto and the mask applied
+        - enemyBoxCompositeShip [enemyShip, None]: Enemy ship the cached enemy box was drawn for
+        
+        - frameProfiler [frameProfiler]: Profiler of the gameplay loop, drawScreen() reports the phases 'SceneCollection', 'Drawing' and 'DisplayUpdate'. Disabled unless set by the gameplay loop
     
     Methods:
         - selectBackgroundImage(): Select a new random background image
-        - getUpdateSpriteCollection(): Returns an OrderedUpdates collection of all sprites to be drawn
+        - setActiveEnemyShip(activeEnemyShip [enemyShip, None]): Set or remove the enemy ship and register its ui elements in the scene. The sprites of a replaced enemy ship are released
+        - requestFullRedraw(): Redraw the whole screen with the next frame, e.g. after ship sprites have been moved
+        - drawScreen(redrawEnergyUi [bool]): Draw either the whole screen or only the dirty regions onto the screen and push them to the display
+        - drawDirtyRects(dirtyRects [List]): Redraw only the given regions of the screen, returns the merged regions
+        - collectDirtyRects(): Returns a list of the screen rects which changed since the last frame and resets the draw flags
+        - updateEnemyBoxComposite(dirtyRects [List, None]): Rebuild the cached enemy box or only patch the given regions
+        - drawEnemyShipOnto(surface [pygame.Surface], surfaceTopleft [np.array], onlyRect [pygame.Rect, None]): Draw the enemy ship elements in drawing order onto a surface
     
     
     """
@@ -82,15 +108,39 @@ class updateScreen(object):
         self.parameters = parameters
         
         self.activePlayerShip = activePlayerShip
-        self.activeEnemyShip = activeEnemyShip
+        self.activeEnemyShip = None
 
-        # Order, in which elements shall be drawn [Background is not mentioned explicitly but comes first]
-        self.orderDrawingPlayerShip = ['Shield', 'ZoltanShield', 'ShipHull', 'ShipRooms', 'ShipDoors']
-        self.orderDrawingEnemyShip = ['Shield', 'ZoltanShield', 'ShipHull', 'ShipRooms', 'ShipDoors']
+        # Order, in which elements shall be drawn [Background is not mentioned explicitly but comes first]. ShipRoomsBaked contains all rooms and doors drawn onto one surface
+        self.orderDrawingPlayerShip = ['Shield', 'ZoltanShield', 'ShipHull', 'ShipRoomsBaked']
+        self.orderDrawingEnemyShip = ['Shield', 'ZoltanShield', 'ShipHull', 'ShipRoomsBaked']
+        
+        # Create the scene with the layers in drawing order. The enemy ship is drawn into the enemy box and therefore only needs the box layers
+        self.scene = drawScene.drawScene(['Background'] + ['Player' + field for field in self.orderDrawingPlayerShip] + ['EnemyBox', 'EnemyShip', 'EnergyUi', 'Pause'])
+        
+        # Dirty rect tracking, the first frame is always drawn completely
+        self.fullRedraw = True
+        self.drawnShieldSprites = {'Player': None, 'Enemy': None}
+        self.drawnPause = 0
+        
+        # Cached enemy box with the enemy ship drawn onto, rebuilt when the enemy ship changes
+        self.enemyBoxComposite = None
+        self.enemyBoxCompositeShip = None
+        
+        # Profiling is disabled until the gameplay loop sets its profiler
+        self.frameProfiler = frameProfiler.frameProfiler(list(), 1, enabled = False)
         
         # Select an initial background
         self.selectBackgroundImage()
         
+        # Register the ships. Rooms and doors are drawn through the baked layer
+        self.bakedShipLayers = {'Player': bakedShipLayer.bakedShipLayer(self.activePlayerShip), 'Enemy': None}
+        
+        self.scene.registerShip(self.activePlayerShip, 'Player', self.orderDrawingPlayerShip)
+        self.scene.register('PlayerShipRoomsBaked', self.bakedShipLayers['Player'].sprite)
+        self.drawnShieldSprites['Player'] = self.activePlayerShip.activeSprites['Shields']['Sprite'] if self.activePlayerShip.activeSprites['Shields'] is not None else None
+        
+        self.setActiveEnemyShip(activeEnemyShip)
+        
         # Set the energy management ui
         self.energyManagementUi = energyManagementUi.energyManagementUi(self.parameters, self.spritesAll, self.activePlayerShip)
         
@@ -129,188 +179,290 @@ class updateScreen(object):
         
         # Remove first if present
         if 'currentBackground' in dir(self):
+            self.scene.unregister(self.currentBackground)
             del self.currentBackground
         
         # Add a new background picture        
         self.currentBackground = self.allBackgroundImages.getRandomBackgroundImage()
+        self.scene.register('Background', self.currentBackground)
+        
+        # The whole screen changes
+        self.requestFullRedraw()
+    
+    
+    ###
+    # Set or remove the enemy ship
+    def setActiveEnemyShip(self, activeEnemyShip: [None, enemyShip.enemyShip]) -> None:
+        logger.debug('{} the active enemy ship'.format('Remove' if activeEnemyShip is None else 'Set'))
+        
+        ###
+        # Remove the old enemy box
+        self.scene.clearLayer('EnemyBox')
+        self.scene.clearLayer('EnemyShip')
+        
+        self.enemyBoxComposite = None
+        self.enemyBoxCompositeShip = None
+        
+        
+        # The sprite groups of the previous enemy ship can be freed
+        if (self.activeEnemyShip is not None) and (self.activeEnemyShip is not activeEnemyShip):
+            self.activeEnemyShip.releaseShipSprites()
+        
+        
+        ###
+        # Add the new enemy box with the cached enemy ship drawn onto
+        self.activeEnemyShip = activeEnemyShip
+        
+        if self.activeEnemyShip is not None:
+            self.bakedShipLayers['Enemy'] = bakedShipLayer.bakedShipLayer(self.activeEnemyShip)
+            
+            self.scene.register('EnemyBox', self.spritesAll['EnemyUi'].boxSprites[self.activeEnemyShip.enemyBoxType])
+            self.updateEnemyBoxComposite()
+            
+            self.drawnShieldSprites['Enemy'] = self.activeEnemyShip.activeSprites['Shields']['Sprite'] if self.activeEnemyShip.activeSprites['Shields'] is not None else None
+        else:
+            self.bakedShipLayers['Enemy'] = None
+            self.drawnShieldSprites['Enemy'] = None
+        
+        
+        ###
+        # The whole screen changes
+        self.requestFullRedraw()
+    
+    
+    ###
+    # Redraw the complete screen with the next frame
+    def requestFullRedraw(self) -> None:
+        self.fullRedraw = True
         
         
     ###
     # Function to select the current sprites and to draw them onto the screen
     def drawScreen(self, redrawEnergyUi: bool = False) -> None:
         ###
-        # Get the collection of sprites to be drawn
-        drawSpriteGroup = self.getUpdateSpriteCollection(redrawEnergyUi)
+        # Collect the changed screen regions. This also updates the energy ui if necessary and resets all draw flags
+        dirtyRects = self.collectDirtyRects(redrawEnergyUi)
+        self.frameProfiler.lap('SceneCollection')
         
         
         ###
-        # Draw onto the screen
-        if len(drawSpriteGroup):
-            pygame.display.update(drawSpriteGroup.draw(self.screen))
+        # Draw everything if requested, otherwise only the dirty regions if there are any
+        updatedRects = list()
+        if self.fullRedraw or not self.parameters['General']['DirtyRectRendering']:
+            self.fullRedraw = False
+            
+            ##
+            # The player ship sprites might have been moved
+            self.bakedShipLayers['Player'].rebuildIfMoved()
+            
+            ##
+            # Draw the whole scene onto the screen
+            if len(self.scene):
+                updatedRects = self.scene.draw(self.screen)
+        
+        elif len(dirtyRects):
+            updatedRects = self.drawDirtyRects(dirtyRects)
+        
+        self.frameProfiler.lap('Drawing')
         
         
         ###
-        # Delete the collection object not to have lingering sprite objects accumulating in the background
-        drawSpriteGroup.empty()
-        del drawSpriteGroup
+        # Only push the changed regions to the display
+        if len(updatedRects):
+            pygame.display.update(updatedRects)
+        
+        self.frameProfiler.lap('DisplayUpdate')
     
     
     ###
-    # Function to collect all the active sprites and add them to an OrderedUpdate-Collection
-    def getUpdateSpriteCollection(self, redrawEnergyUi: bool = False) -> pygame.sprite.OrderedUpdates:
-#        logger.debug('Collect all active sprites for drawing')
+    # Redraw only the given regions of the screen
+    def drawDirtyRects(self, dirtyRects: List) -> List:
+        ###
+        # Merge overlapping regions not to draw the same pixels multiple times
+        dirtyRects = mergeRects(dirtyRects)
+        
         
         ###
-        # Initialize the output object
-        drawSpriteGroup = pygame.sprite.OrderedUpdates()
-        
-        
-#        ###
-#        # Add the background image
-#        if newImage:
-#            # Set the background
-        drawSpriteGroup.add(self.currentBackground)
-#        else:
-#            # Detect which sprites have to be drawn
-#            drawSelection = dict()
-#            
-#            ###
-#            # Go through the active sprites. If they should be drawn, check for them what has to be redrawn
-            
-            
-            
+        # Get the sprites in drawing order, the background comes first and restores the regions
+        drawSprites = self.scene.sprites()
+        
         
         ###
-        # Go through all the various sprites which have to be drawn for the player ship
-        for field in self.orderDrawingPlayerShip:
-            ##
-            # Handle the various options
-            
-            # Shields
-            if field == 'Shield':
-                if self.activePlayerShip.activeSprites['Shields'] is not None:  # Shield is present
-                    drawSpriteGroup.add(self.activePlayerShip.activeSprites['Shields']['Sprite'])
-                
-            # Hull
-            elif field == 'ShipHull':
-                drawSpriteGroup.add(self.activePlayerShip.shipSprites['Base'])
-            
-            # Rooms
-            elif field == 'ShipRooms':
-                for roomKey in self.activePlayerShip.activeSprites['Rooms'].keys():
-                    drawSpriteGroup.add(self.activePlayerShip.activeSprites['Rooms'][roomKey]['Sprite'])
+        # Redraw every sprite overlapping a dirty region, clipped to that region
+        for dirtyRect in dirtyRects:
+            self.screen.set_clip(dirtyRect)
             
-            # Doors
-            elif field == 'ShipDoors':
-                for doorKey in self.activePlayerShip.activeSprites['Doors'].keys():
-                    drawSpriteGroup.add(self.activePlayerShip.activeSprites['Doors'][doorKey]['Sprite'])
-
-
+            for sprite in drawSprites:
+                if sprite.rect.colliderect(dirtyRect):
+                    self.screen.blit(sprite.image, sprite.rect)
+        
+        self.screen.set_clip(None)
+        
+        
         ###
-        # Go through all the various sprites which have to be drawn for the player ship
-        if self.activeEnemyShip is not None:
-            ###
-            # At first, add the battle box UI
-            # Then blit all images onto the box mask so the outer parts all become invisible
-            # In the end, add the mask with all images blitted onto to the collection
-            
-            
-            ###
-            # Add the outer overlay
-            drawSpriteGroup.add(self.spritesAll['EnemyUi'].boxSprites[self.activeEnemyShip.enemyBoxType])
-            
+        # Return the regions which have to be pushed to the display
+        return(dirtyRects)
+    
+    
+    ###
+    # Collect the rects of all elements which have changed since the last drawn frame
+    def collectDirtyRects(self, redrawEnergyUi: bool = False) -> List:
+        ###
+        # Initialize the list
+        dirtyRects = list()
+        
+        
+        ###
+        # Go through the ships
+        for shipSelector, ship in [('Player', self.activePlayerShip), ('Enemy', self.activeEnemyShip)]:
+            if ship is None:
+                continue
             
-            ###
-            # Create the inner box to be drawn onto
-            enemyBoxMaskToBeDrawnOnto = copySprite(self.spritesAll['EnemyUi'].boxSprites[self.activeEnemyShip.enemyBoxType + 'MaskDraw'])
+            ##
+            # Rooms and doors with a set draw flag
+            shipRects = list()
+            for field in ['Rooms', 'Doors']:
+                for activeSprite in ship.activeSprites[field].values():
+                    if activeSprite['Draw']:
+                        shipRects.append(activeSprite['Sprite'].rect.copy())
+                        activeSprite['Draw'] = False
             
+            # Redraw these regions in the baked ship
+            if len(shipRects):
+                self.bakedShipLayers[shipSelector].patch(mergeRects(shipRects))
             
-            ###
-            # Go through all the various sprites which have to be drawn for the enemy ship
-            enemyBoxRectTopleft = np.array(enemyBoxMaskToBeDrawnOnto.rect.topleft)
-            for field in self.orderDrawingEnemyShip:
-                ##
-                # Handle the various options
+            ##
+            # Shields: Redraw the old and the new shield sprite if the shield changed
+            currentShieldSprite = ship.activeSprites['Shields']['Sprite'] if ship.activeSprites['Shields'] is not None else None
+            if (currentShieldSprite is not self.drawnShieldSprites[shipSelector]) or ((ship.activeSprites['Shields'] is not None) and ship.activeSprites['Shields']['Draw']):
+                for shieldSprite in [self.drawnShieldSprites[shipSelector], currentShieldSprite]:
+                    if shieldSprite is not None:
+                        shipRects.append(shieldSprite.rect.copy())
                 
-                # Shields
-                if field == 'Shield':
-                    if self.activeEnemyShip.activeSprites['Shields'] is not None:  # Shield is present
-                        enemyBoxMaskToBeDrawnOnto.image.blit(self.activeEnemyShip.activeSprites['Shields']['Sprite'].image, np.array(self.activeEnemyShip.activeSprites['Shields']['Sprite'].rect.topleft) - enemyBoxRectTopleft)
+                if ship.activeSprites['Shields'] is not None:
+                    ship.activeSprites['Shields']['Draw'] = False
                 
-                # Hull
-                elif field == 'ShipHull':
-                    enemyBoxMaskToBeDrawnOnto.image.blit(self.activeEnemyShip.shipSprites['Base'].image, np.array(self.activeEnemyShip.shipSprites['Base'].rect.topleft) - enemyBoxRectTopleft)
+                # The player shield is part of the scene, the enemy shield is drawn into the enemy box
+                if ship.playerShip:
+                    self.scene.swap('PlayerShield', self.drawnShieldSprites[shipSelector], currentShieldSprite)
                 
-                # Rooms
-                elif field == 'ShipRooms':
-                    for roomKey in self.activeEnemyShip.activeSprites['Rooms'].keys():
-                        enemyBoxMaskToBeDrawnOnto.image.blit(self.activeEnemyShip.activeSprites['Rooms'][roomKey]['Sprite'].image, np.array(self.activeEnemyShip.activeSprites['Rooms'][roomKey]['Sprite'].rect.topleft) - enemyBoxRectTopleft)
-
-                # Doors
-                elif field == 'ShipDoors':
-                    for doorKey in self.activeEnemyShip.activeSprites['Doors'].keys():
-                        enemyBoxMaskToBeDrawnOnto.image.blit(self.activeEnemyShip.activeSprites['Doors'][doorKey]['Sprite'].image, np.array(self.activeEnemyShip.activeSprites['Doors'][doorKey]['Sprite'].rect.topleft) - enemyBoxRectTopleft)
-                    
-            
-            ###
-            # Postprocessing
+                self.drawnShieldSprites[shipSelector] = currentShieldSprite
             
             ##
-            # Convert to per-pixel alpha
-            enemyBoxMaskToBeDrawnOnto.image = enemyBoxMaskToBeDrawnOnto.image.convert_alpha()
-            
-            ##
-            # Apply mask
-            enemyBoxMaskToBeDrawnOnto.image.blit(self.spritesAll['EnemyUi'].boxSprites[self.activeEnemyShip.enemyBoxType + 'Mask'].image, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+            # The enemy ship is only visible inside the enemy box
+            if not ship.playerShip:
+                enemyBoxRect = self.spritesAll['EnemyUi'].boxSprites[ship.enemyBoxType + 'MaskDraw'].rect
+                shipRects = [rect.clip(enemyBoxRect) for rect in shipRects]
+                
+                # Patch the changed regions into the cached enemy box
+                if len(shipRects):
+                    self.updateEnemyBoxComposite(shipRects)
             
-            ##
-            # Add to the collection of sprites to be drawn
-            drawSpriteGroup.add(enemyBoxMaskToBeDrawnOnto)
+            dirtyRects += shipRects
         
         
         ###
-        # Add the energy ui elements
+        # Energy ui: Redraw the regions of the old and the new ui sprites
         if redrawEnergyUi:
+            dirtyRects += [sprite.rect.copy() for sprite in self.energyManagementUi.uiSprites]
+            self.scene.clearLayer('EnergyUi')
+            
             self.energyManagementUi.updateScreenSprites(self.screen.get_rect(), redrawEnergyUi)
             
-        for sprite in self.energyManagementUi.uiSprites:
-            drawSpriteGroup.add(sprite)
+            dirtyRects += [sprite.rect.copy() for sprite in self.energyManagementUi.uiSprites]
+            self.scene.register('EnergyUi', self.energyManagementUi.uiSprites)
+        
+        
+        ###
+        # Pause elements
+        if self.pause != self.drawnPause:
+            for pause in [self.drawnPause, self.pause]:
+                if pause:
+                    dirtyRects.append(self.sprites['Pause']['GeneralPause' + str(pause)].rect.copy())
             
+            self.scene.swap('Pause', self.sprites['Pause']['GeneralPause' + str(self.drawnPause)] if self.drawnPause else None, self.sprites['Pause']['GeneralPause' + str(self.pause)] if self.pause else None)
+            self.drawnPause = self.pause
+        
         
         ###
-        # Add pause if necessary
-        if self.pause:
-            drawSpriteGroup.add(self.sprites['Pause']['GeneralPause' + str(self.pause)])
+        # Return the collected rects
+        return(dirtyRects)
+    
+    
+    ###
+    # Rebuild the cached enemy box completely or only patch the given regions (in screen coordinates)
+    def updateEnemyBoxComposite(self, dirtyRects: [None, List] = None) -> None:
+        ###
+        # Reference the box sprites
+        boxDrawSprite = self.spritesAll['EnemyUi'].boxSprites[self.activeEnemyShip.enemyBoxType + 'MaskDraw']
+        boxMaskSprite = self.spritesAll['EnemyUi'].boxSprites[self.activeEnemyShip.enemyBoxType + 'Mask']
+        
+        boxRectTopleft = np.array(boxDrawSprite.rect.topleft)
         
         
         ###
-        # Return the collected sprites
-        return(drawSpriteGroup)
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-    
\ No newline at end of file
+        # Complete rebuild if there is no box for the active enemy ship yet or if no regions are specified
+        if (dirtyRects is None) or (self.enemyBoxComposite is None) or (self.enemyBoxCompositeShip is not self.activeEnemyShip):
+            ##
+            # Create the inner box to be drawn onto and replace the old one in the scene
+            oldEnemyBoxComposite = self.enemyBoxComposite
+            
+            self.enemyBoxComposite = copySprite(boxDrawSprite)
+            self.enemyBoxCompositeShip = self.activeEnemyShip
+            
+            self.scene.swap('EnemyShip', oldEnemyBoxComposite, self.enemyBoxComposite)
+            
+            ##
+            # Draw the enemy ship, convert to per-pixel alpha and apply the mask so the outer parts all become invisible
+            self.drawEnemyShipOnto(self.enemyBoxComposite.image, boxRectTopleft)
+            
+            self.enemyBoxComposite.image = self.enemyBoxComposite.image.convert_alpha()
+            self.enemyBoxComposite.image.blit(boxMaskSprite.image, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+        
+        
+        ###
+        # Otherwise only redraw the changed regions
+        else:
+            for dirtyRect in dirtyRects:
+                ##
+                # Region relative to the box
+                boxRect = dirtyRect.move(-boxRectTopleft[0], -boxRectTopleft[1]).clip(self.enemyBoxComposite.rect.move(-boxRectTopleft[0], -boxRectTopleft[1]))
+                if not (boxRect.w and boxRect.h):
+                    continue
+                
+                ##
+                # Restore the empty box in the region, then draw the ship and apply the mask only there
+                copySurfaceRegion(self.enemyBoxComposite.image, boxDrawSprite.image, boxRect)
+                
+                self.enemyBoxComposite.image.set_clip(boxRect)
+                self.drawEnemyShipOnto(self.enemyBoxComposite.image, boxRectTopleft, dirtyRect)
+                self.enemyBoxComposite.image.blit(boxMaskSprite.image, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+                self.enemyBoxComposite.image.set_clip(None)
+    
+    
+    ###
+    # Draw all enemy ship elements in the drawing order onto a surface. If a rect is given, only the overlapping elements are drawn
+    def drawEnemyShipOnto(self, surface: pygame.Surface, surfaceTopleft: np.ndarray, onlyRect: [None, pygame.Rect] = None) -> None:
+        ###
+        # Collect the sprites in drawing order
+        enemySprites = list()
+        for field in self.orderDrawingEnemyShip:
+            # Shields
+            if field == 'Shield':
+                if self.activeEnemyShip.activeSprites['Shields'] is not None:  # Shield is present
+                    enemySprites.append(self.activeEnemyShip.activeSprites['Shields']['Sprite'])
+            
+            # Hull
+            elif field == 'ShipHull':
+                enemySprites.append(self.activeEnemyShip.shipSprites['Base'])
+            
+            # Rooms and doors
+            elif field == 'ShipRoomsBaked':
+                enemySprites.append(self.bakedShipLayers['Enemy'].sprite)
+        
+        
+        ###
+        # Blit them onto the surface
+        for sprite in enemySprites:
+            if (onlyRect is None) or sprite.rect.colliderect(onlyRect):
+                surface.blit(sprite.image, np.array(sprite.rect.topleft) - surfaceTopleft)
@@ -0,0 +1,216 @@
+###
+#
+# Define a class which decodes the images of the game on worker threads
+#
+###
+
+
+###
+# Load packages
+
+# Logging
+import logging
+
+# Typing
+from typing import Any, Callable, Dict, List
+
+# OS
+import os
+
+# Worker threads
+import concurrent.futures
+
+# Manifest file
+import json
+
+# Pygame
+import pygame
+
+
+###
+# Import ressources
+
+# Access to ftl.dat or the unpacked resources
+import src.classes.setup.resource_provider as resourceProvider
+
+
+###
+# Setup logging
+logger = logging.getLogger(__name__)
+
+
+###
+# Define the asset pipeline class
+class assetPipeline(object):
+    """
+    
+    Decodes images on a pool of worker threads, decoding a png in pygame releases the global interpreter lock. The files are read through the resource provider, so they come from ftl.dat if it is available. Everything depending on the display (convert_alpha, derived images) stays on the main thread at the call sites.
+    Images have to be requested before they are needed, so they are decoded while the main thread creates the sprites of earlier images. The sprite objects don't know their images in advance, so the images loaded by every sprite object are stored in a manifest and requested all at once on the next start.
+    A progress callback(decoded [int], requested [int]) is called on the main thread whenever the pipeline hands out or waits for an image, e.g. to draw a loading screen.
+    
+    Init:
+        - parameters [Dict]: All parameters
+        - progressCallback [None, Callable]: Function called with the number of decoded and requested images
+    
+    Fields:
+        - workers [int]: Number of worker threads, parameters['General']['AssetPipelineWorkers'] or the number of cores
+        - executor [None, concurrent.futures.ThreadPoolExecutor]: Worker threads, started on the first request
+        - imageLoad [Callable]: Function decoding an image file, pygame.image.load at the creation of the pipeline
+        - resources [resourceProvider]: Provider of the resource files
+        - pendingImages [Dict]: Requested images which were not handed out yet as future by path
+        - imagesRequested [int]: Number of requested images, including images decoded on the main thread
+        - imagesDecoded [int]: Number of handed out images
+        - progressCallback [None, Callable]: Function called with the number of decoded and requested images
+        - manifestFile [None, str]: File of the manifest, parameters['General']['AssetManifestFile']. No manifest is used if None
+        - manifest [Dict]: Paths of the images loaded by every sprite object by name
+    
+    Methods:
+        - requestImages(paths [List]): Start decoding the images on the worker threads
+        - requestManifest(name [str]): Start decoding all images the sprite object name loaded on the last start
+        - getImage(path [str]): Returns the decoded image at path, waiting for it if it was requested. Images which were not requested are decoded on the main thread
+        - load(name [str], createAssets [Callable]): Returns createAssets(), images loaded with pygame.image.load inside are taken from the pipeline and recorded in the manifest as name
+        - saveManifest(): Write the manifest
+        - discardPending(): Drop all requested images which were not handed out
+    
+    Auxiliary methods (called internally):
+        - decodeImage(path [str]): Returns the decoded image at path, called on the worker threads
+        - reportProgress(): Call the progress callback
+    
+    """
+    
+    
+    ###
+    # Initialization
+    def __init__(self, parameters: Dict, progressCallback: [None, Callable] = None) -> None:
+        self.workers = parameters['General']['AssetPipelineWorkers'] or os.cpu_count() or 1
+        self.executor = None
+        self.imageLoad = pygame.image.load
+        self.resources = resourceProvider.getResourceProvider(parameters)
+        
+        self.pendingImages = dict()
+        self.imagesRequested = 0
+        self.imagesDecoded = 0
+        self.progressCallback = progressCallback
+        
+        
+        ##
+        # Images of the sprite objects on the last start
+        self.manifestFile = parameters['General']['AssetManifestFile']
+        self.manifest = dict()
+        
+        if (self.manifestFile is not None) and os.path.isfile(self.manifestFile):
+            try:
+                with open(self.manifestFile, 'r') as manifestFile:
+                    self.manifest = json.load(manifestFile)
+            except (OSError, ValueError) as exception:
+                logger.warning('Asset manifest {file} could not be read: {exception}'.format(file = self.manifestFile, exception = exception))
+    
+    
+    ###
+    # Start decoding images
+    def requestImages(self, paths: List) -> None:
+        if self.executor is None:
+            logger.debug('Start {} asset pipeline workers'.format(self.workers))
+            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers = self.workers, thread_name_prefix = 'AssetPipeline')
+        
+        for path in paths:
+            if path not in self.pendingImages:
+                self.pendingImages[path] = self.executor.submit(self.decodeImage, path)
+                self.imagesRequested += 1
+    
+    
+    def requestManifest(self, name: str) -> None:
+        # Files which were removed since the last start are not requested
+        self.requestImages([path for path in self.manifest.get(name, list()) if self.resources.exists(path)])
+    
+    
+    ###
+    # Decode an image, pygame.image.load may be replaced while the pipeline serves the loaders so the function at the creation is used
+    def decodeImage(self, path: str) -> pygame.Surface:
+        return(self.resources.loadImage(path, self.imageLoad))
+    
+    
+    ###
+    # Decoded image
+    def getImage(self, path: str) -> pygame.Surface:
+        if path not in self.pendingImages:
+            self.imagesRequested += 1
+            image = self.decodeImage(path)
+        else:
+            future = self.pendingImages.pop(path)
+            
+            # Keep the loading screen going while waiting
+            while not future.done():
+                concurrent.futures.wait([future], timeout = 0.05)
+                self.reportProgress()
+            
+            image = future.result()
+        
+        self.imagesDecoded += 1
+        self.reportProgress()
+        
+        return(image)
+    
+    
+    ###
+    # Progress of the decoding
+    def reportProgress(self) -> None:
+        if self.progressCallback is not None:
+            decoded = self.imagesDecoded + sum(future.done() for future in self.pendingImages.values())
+            self.progressCallback(decoded, self.imagesRequested)
+    
+    
+    ###
+    # Create assets with the images from the pipeline
+    def load(self, name: str, createAssets: Callable) -> Any:
+        loadedPaths = list()
+        imageLoad = pygame.image.load
+        
+        def pipelineImageLoad(file, *args, **kwargs):
+            if not isinstance(file, (str, os.PathLike)) or args or kwargs:
+                return(imageLoad(file, *args, **kwargs))
+            
+            loadedPaths.append(os.fspath(file))
+            return(self.getImage(os.fspath(file)))
+        
+        pygame.image.load = pipelineImageLoad
+        try:
+            assets = createAssets()
+        finally:
+            pygame.image.load = imageLoad
+        
+        # Nothing is loaded if the assets were read from the sprite cache, the last manifest stays valid
+        if loadedPaths:
+            self.manifest[name] = loadedPaths
+        
+        return(assets)
+    
+    
+    ###
+    # Store the manifest for the next start
+    def saveManifest(self) -> None:
+        if self.manifestFile is None:
+            return
+        
+        try:
+            os.makedirs(os.path.dirname(self.manifestFile) or '.', exist_ok = True)
+            
+            with open(self.manifestFile + '.tmp', 'w') as manifestFile:
+                json.dump(self.manifest, manifestFile, indent = 1)
+            
+            os.replace(self.manifestFile + '.tmp', self.manifestFile)
+        except OSError as exception:
+            logger.warning('Asset manifest {file} could not be written: {exception}'.format(file = self.manifestFile, exception = exception))
+    
+    
+    ###
+    # Drop images which are not needed anymore
+    def discardPending(self) -> None:
+        if self.pendingImages:
+            logger.debug('Discard {} requested images which were not used'.format(len(self.pendingImages)))
+        
+        for future in self.pendingImages.values():
+            future.cancel()
+        
+        self.imagesRequested -= len(self.pendingImages)
+        self.pendingImages = dict()
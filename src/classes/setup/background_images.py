@@ -14,6 +14,12 @@ import logging
 # Typing
 from typing import Dict
 
+# Least recently used cache
+import collections
+
+# Worker thread
+import concurrent.futures
+
 # OS
 import os
 
@@ -24,6 +30,13 @@ import numpy as np
 import pygame
 
 
+###
+# Import ressources
+
+# Access to ftl.dat or the unpacked resources
+import src.classes.setup.resource_provider as resourceProvider
+
+
 ###
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -34,7 +47,9 @@ logger = logging.getLogger(__name__)
 class backgroundImages(object):
     """
     
-    Object that reads in all available background pictures and returns one if requested.
+    Object that indexes all available background pictures and returns one if requested.
+    Only the paths are read on initialization. A picture is decoded and scaled when it is selected, converted to the display format and kept in a small least recently used cache, so the memory does not grow with the number of pictures.
+    The next random selection is drawn in advance and its picture is decoded and scaled on a worker thread, so it is ready when the next background is selected.
     The picture will be scaled if set so in parameters['General']['BackgroundScalePictures'].
     If no images are found, a black screen will be returned.
     
@@ -42,13 +57,26 @@ class backgroundImages(object):
         - parameters[Dict]: Dictionary containing all parameters
     
     Fields:
-        - allPictures[List]: List of all imported background images
-        - nBackgroundPictures[int]: Number of imported background images
+        - parameters [Dict]: Dictionary containing all parameters
+        - picturePaths [List]: Paths of all available background pictures
+        - nBackgroundPictures [int]: Number of available background pictures
+        - cachedPictures [collections.OrderedDict]: Pictures in the display format by selection, the least recently used first
+        - cacheSize [int]: Maximum number of cached pictures, parameters['General']['BackgroundImageCacheSize']
+        - pendingPictures [Dict]: Pictures decoded on the worker thread as future by selection
+        - nextSelection [None, int]: Selection drawn in advance for the next random image
+        - executor [None, concurrent.futures.ThreadPoolExecutor]: Worker thread, started on the first prefetch
+        - resources [resourceProvider]: Provider of the picture files
+        - imageLoad [Callable]: Function decoding a picture, pygame.image.load at the creation of the object
         
     Methods:
-        - loadAllPictures(parameters [dict]): Loads and scales if necessary all available images into this object
-        - getBackgroundImage(selection [int]): Returns a background sprite to be used in the plotting step. The variable selection is in the range [0, #loadedPictures), the picture in the list entry corresponding to selection will be returned
-        - getRandomBackgroundImage(): Returns a random background sprite to be used in the plotting step               - 
+        - indexAllPictures(): Collect the paths of all available pictures
+        - getBackgroundImage(selection [int]): Returns a background sprite to be used in the plotting step. The variable selection is in the range [0, nBackgroundPictures), the picture in the list entry corresponding to selection will be returned
+        - getRandomBackgroundImage(): Returns a random background sprite to be used in the plotting step
+        - prefetchPicture(selection [int]): Start decoding and scaling a picture on the worker thread
+    
+    Auxiliary methods (called internally):
+        - loadPicture(selection [int]): Returns the decoded and scaled picture, called on the worker thread
+        - getPicture(selection [int]): Returns the picture in the display format from the cache, loading it if necessary
     
     """
     
@@ -58,36 +86,91 @@ class backgroundImages(object):
     def __init__(self, parameters: Dict):
         logger.debug('Initialize the object holding all the background images')
         
-        # Load all pictures
-        self.loadAllPictures(parameters)
+        self.parameters = parameters
+        self.resources = resourceProvider.getResourceProvider(parameters)
+        # The asset pipeline replaces pygame.image.load while it loads the sprites, the worker thread keeps using the original function
+        self.imageLoad = pygame.image.load
+        
+        # Pictures in use
+        self.cachedPictures = collections.OrderedDict()
+        self.cacheSize = max(1, parameters['General']['BackgroundImageCacheSize'])
+        self.pendingPictures = dict()
+        self.nextSelection = None
+        self.executor = None
+        
+        # Find all pictures
+        self.indexAllPictures()
 
 
     ###
-    # Load all pictures
-    def loadAllPictures(self, parameters):
-        logger.debug('Load all the background images')
-        self.allPictures = list()
+    # Index all pictures
+    def indexAllPictures(self):
+        logger.debug('Index all the background images')
         
         # Go through all specified folders
-        picturesLoaded = False
-        for pathFolder in parameters['General']['PathFoldersBackgroundPictures']:
+        self.picturePaths = list()
+        for pathFolder in self.parameters['General']['PathFoldersBackgroundPictures']:
             for picture in os.listdir(pathFolder):
-                if any([True if pictureFormat in picture else False for pictureFormat in parameters['General']['BackgroundPictureFormats']]):
-                    self.allPictures.append(pygame.image.load('{folder}/{picture}'.format(folder = pathFolder, picture = picture)))
-                    
-                    if not picturesLoaded:
-                        picturesLoaded = True
-                        
-                    if parameters['General']['BackgroundScalePictures']:
-                        self.allPictures[-1] = pygame.transform.scale(self.allPictures[-1], (parameters['General']['DisplayWidth'], parameters['General']['DisplayHeight']))
-
-        # Create a black image if no image was loaded
-        if not picturesLoaded:
-           self.allPictures.append(pygame.Surface((parameters['General']['DisplayWidth'], parameters['General']['DisplayHeight'])))
-           self.allPictures[-1].fill(parameters['Colors']['black'])
-          
-        # Store the number of available pictures
-        self.nBackgroundPictures = len(self.allPictures)
+                if any([True if pictureFormat in picture else False for pictureFormat in self.parameters['General']['BackgroundPictureFormats']]):
+                    self.picturePaths.append('{folder}/{picture}'.format(folder = pathFolder, picture = picture))
+        
+        # Store the number of available pictures, the black image is used if no picture was found
+        self.nBackgroundPictures = max(1, len(self.picturePaths))
+    
+    
+    ###
+    # Decode and scale a picture, called on the worker thread
+    def loadPicture(self, selection: int) -> pygame.Surface:
+        # Create a black image if no image was found
+        if not self.picturePaths:
+            picture = pygame.Surface((self.parameters['General']['DisplayWidth'], self.parameters['General']['DisplayHeight']))
+            picture.fill(self.parameters['Colors']['Black'])
+            
+            return(picture)
+        
+        picture = self.resources.loadImage(self.picturePaths[selection], self.imageLoad)
+        
+        if self.parameters['General']['BackgroundScalePictures']:
+            picture = pygame.transform.scale(picture, (self.parameters['General']['DisplayWidth'], self.parameters['General']['DisplayHeight']))
+        
+        return(picture)
+    
+    
+    ###
+    # Start loading a picture in the background
+    def prefetchPicture(self, selection: int) -> None:
+        if (selection in self.cachedPictures) or (selection in self.pendingPictures):
+            return
+        
+        if self.executor is None:
+            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers = 1, thread_name_prefix = 'BackgroundImages')
+        
+        logger.debug('Prefetch background image {}'.format(selection))
+        self.pendingPictures[selection] = self.executor.submit(self.loadPicture, selection)
+    
+    
+    ###
+    # Picture in the display format
+    def getPicture(self, selection: int) -> pygame.Surface:
+        if selection in self.cachedPictures:
+            self.cachedPictures.move_to_end(selection)
+            return(self.cachedPictures[selection])
+        
+        if selection in self.pendingPictures:
+            picture = self.pendingPictures.pop(selection).result()
+        else:
+            picture = self.loadPicture(selection)
+        
+        # The conversion needs the display and is done on the main thread, so the blits of the background don't convert the pixels every frame
+        if pygame.display.get_surface() is not None:
+            picture = picture.convert()
+        
+        self.cachedPictures[selection] = picture
+        
+        while len(self.cachedPictures) > self.cacheSize:
+            self.cachedPictures.popitem(last = False)
+        
+        return(picture)
     
     
     ###
@@ -98,7 +181,7 @@ class backgroundImages(object):
         
         # Create sprite
         backgroundPicture = pygame.sprite.Sprite()
-        backgroundPicture.image = self.allPictures[selection]
+        backgroundPicture.image = self.getPicture(selection)
         backgroundPicture.rect = backgroundPicture.image.get_rect()
         
         # Return sprite
@@ -110,16 +193,17 @@ class backgroundImages(object):
     def getRandomBackgroundImage(self) -> pygame.sprite.Sprite:
         logger.debug('Select a random background image')
         
-        # Get a random selection
-        selection = np.random.choice(self.nBackgroundPictures)
+        # Get a random selection, drawn in advance by the last call
+        if self.nextSelection is None:
+            selection = np.random.choice(self.nBackgroundPictures)
+        else:
+            selection = self.nextSelection
+        
+        backgroundPicture = self.getBackgroundImage(selection)
+        
+        # Prepare the picture for the next call
+        self.nextSelection = np.random.choice(self.nBackgroundPictures)
+        self.prefetchPicture(self.nextSelection)
         
         # Return a random image
-        return(self.getBackgroundImage(selection))
-
-
-
-
-
-
-
-
+        return(backgroundPicture)
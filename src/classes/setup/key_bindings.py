@@ -71,6 +71,7 @@ class getKeyBindings(object):
         self.keyBindings['Mouse']['RightClick'] = pygame.BUTTON_RIGHT
         
         self.keyBindings['Keyboard']['Space'] = pygame.K_SPACE
+        self.keyBindings['Keyboard']['F12'] = pygame.K_F12     # Write the frame profiler trace
         
         
         # Initialize the other values
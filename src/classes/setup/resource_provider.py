@@ -0,0 +1,335 @@
+###
+#
+# Define classes which serve the FTL resources either directly from ftl.dat or from the unpacked folder
+#
+###
+
+
+###
+# Load packages
+
+# Logging
+import logging
+
+# Typing
+from typing import Callable, Dict, Tuple
+
+# OS
+import os
+
+# Reading the archive
+import mmap
+import struct
+import zlib
+import io
+
+# Hashing
+import hashlib
+
+# Pygame
+import pygame
+
+
+###
+# Setup logging
+logger = logging.getLogger(__name__)
+
+
+###
+# Archive formats
+#
+# FTL 1.6 and later (PKG): Big endian header (signature, header size, entry size, number of entries, size of the path region), followed by the entries and the path region
+# Entries: hash of the path, offset of the path in the path region with the flags in the highest byte, offset and size of the data, unpacked size of the data
+pkgSignature = b'PKG\n'
+pkgHeaderStruct = struct.Struct('>4sHHII')
+pkgEntryStruct = struct.Struct('>IIIII')
+pkgFlagDeflated = 1 << 24
+pkgPathOffsetMask = 0x00FFFFFF
+
+# FTL 1.5 and earlier: Little endian number of index slots followed by the offset of every entry (0 for unused slots)
+# Entries: size of the data, size of the path, path, data
+datIndexSizeStruct = struct.Struct('<I')
+datEntryHeaderStruct = struct.Struct('<II')
+
+
+###
+# Providers which were opened already, shared by all loaders
+openedProviders = dict()
+
+
+###
+# Define the archive class
+class datArchive(object):
+    """
+    
+    Resource archive ftl.dat read through a memory map. The file table is parsed once into an index on opening, entries are served as memoryview slices of the memory map without reading or copying the file. Compressed entries of the PKG format are decompressed on request.
+    Both the PKG format of FTL 1.6 and later and the older format of FTL 1.5 are supported. Inner paths use forward slashes, e.g. img/ship/kestral_base.png.
+    
+    Init:
+        - filePath [str]: Path of ftl.dat
+    
+    Fields:
+        - filePath [str]: Path of ftl.dat
+        - archiveFile [file]: Open archive
+        - data [mmap.mmap]: Memory map of the whole archive
+        - dataView [memoryview]: View of the memory map the entries are sliced from
+        - archiveFormat [str]: 'PKG' or 'DAT'
+        - entries [Dict]: Offset, size, unpacked size and compression of every entry by inner path
+    
+    Methods:
+        - contains(innerPath [str]): Returns whether the archive has an entry for the inner path
+        - getEntry(innerPath [str]): Returns the data of an entry, a memoryview into the archive if it is not compressed
+        - loadImage(innerPath [str], imageLoad [Callable]): Returns the image decoded from an entry
+        - close(): Release the memory map and close the file
+    
+    Auxiliary methods (called internally):
+        - readPkgIndex(): Parse the file table of the PKG format
+        - readDatIndex(): Parse the file table of the old format
+    
+    """
+    
+    
+    ###
+    # Initialization
+    def __init__(self, filePath: str) -> None:
+        logger.info('Open the resource archive {}'.format(filePath))
+        
+        self.filePath = filePath
+        self.archiveFile = open(self.filePath, 'rb')
+        self.data = mmap.mmap(self.archiveFile.fileno(), 0, access = mmap.ACCESS_READ)
+        self.dataView = memoryview(self.data)
+        
+        
+        ###
+        # Index of all entries
+        self.entries = dict()
+        
+        if self.data[:len(pkgSignature)] == pkgSignature:
+            self.archiveFormat = 'PKG'
+            self.readPkgIndex()
+        else:
+            self.archiveFormat = 'DAT'
+            self.readDatIndex()
+        
+        logger.debug('Indexed {entries} entries of the {archiveFormat} archive {filePath}'.format(entries = len(self.entries), archiveFormat = self.archiveFormat, filePath = self.filePath))
+    
+    
+    ###
+    # File table of the PKG format
+    def readPkgIndex(self) -> None:
+        _, headerSize, entrySize, entryCount, pathRegionSize = pkgHeaderStruct.unpack_from(self.data, 0)
+        
+        pathRegionStart = headerSize + entrySize * entryCount
+        pathRegion = self.data[pathRegionStart:pathRegionStart + pathRegionSize]
+        
+        for entry in range(entryCount):
+            _, pathOffsetAndFlags, dataOffset, dataSize, unpackedSize = pkgEntryStruct.unpack_from(self.data, headerSize + entry * entrySize)
+            
+            pathOffset = pathOffsetAndFlags & pkgPathOffsetMask
+            innerPath = pathRegion[pathOffset:pathRegion.index(b'\0', pathOffset)].decode('ascii')
+            
+            self.entries[innerPath] = (dataOffset, dataSize, unpackedSize, bool(pathOffsetAndFlags & pkgFlagDeflated))
+    
+    
+    ###
+    # File table of the old format
+    def readDatIndex(self) -> None:
+        indexSize, = datIndexSizeStruct.unpack_from(self.data, 0)
+        
+        for entryOffset in struct.unpack_from('<{}I'.format(indexSize), self.data, datIndexSizeStruct.size):
+            # Unused slot
+            if entryOffset == 0:
+                continue
+            
+            dataSize, pathSize = datEntryHeaderStruct.unpack_from(self.data, entryOffset)
+            
+            pathStart = entryOffset + datEntryHeaderStruct.size
+            innerPath = self.data[pathStart:pathStart + pathSize].decode('ascii')
+            
+            self.entries[innerPath] = (pathStart + pathSize, dataSize, dataSize, False)
+    
+    
+    ###
+    # Access the entries
+    def contains(self, innerPath: str) -> bool:
+        return(innerPath in self.entries)
+    
+    
+    def getEntry(self, innerPath: str) -> [memoryview, bytes]:
+        dataOffset, dataSize, unpackedSize, deflated = self.entries[innerPath]
+        
+        if deflated:
+            return(zlib.decompress(self.dataView[dataOffset:dataOffset + dataSize], bufsize = unpackedSize))
+        
+        return(self.dataView[dataOffset:dataOffset + dataSize])
+    
+    
+    def loadImage(self, innerPath: str, imageLoad: Callable) -> pygame.Surface:
+        # The name hint selects the image format
+        return(imageLoad(io.BytesIO(self.getEntry(innerPath)), innerPath))
+    
+    
+    ###
+    # Close the archive
+    def close(self) -> None:
+        self.dataView.release()
+        self.data.close()
+        self.archiveFile.close()
+
+
+###
+# Define the unpacked folder class
+class unpackedFolder(object):
+    """
+    
+    Resources unpacked from ftl.dat into a folder, e.g. with the Slipstream mod manager.
+    
+    Init:
+        - folder [str]: Folder of the unpacked resources
+    
+    Fields:
+        - folder [str]: Folder of the unpacked resources
+    
+    Methods:
+        - contains(innerPath [str]): Returns whether the folder has a file for the inner path
+        - getEntry(innerPath [str]): Returns the content of the file
+        - loadImage(innerPath [str], imageLoad [Callable]): Returns the image decoded from the file
+    
+    """
+    
+    
+    ###
+    # Initialization
+    def __init__(self, folder: str) -> None:
+        self.folder = folder
+    
+    
+    ###
+    # Access the files
+    def contains(self, innerPath: str) -> bool:
+        return(os.path.isfile(os.path.join(self.folder, innerPath)))
+    
+    
+    def getEntry(self, innerPath: str) -> bytes:
+        with open(os.path.join(self.folder, innerPath), 'rb') as resourceFile:
+            return(resourceFile.read())
+    
+    
+    def loadImage(self, innerPath: str, imageLoad: Callable) -> pygame.Surface:
+        return(imageLoad(os.path.join(self.folder, innerPath)))
+
+
+###
+# Define the resource provider class
+class resourceProvider(object):
+    """
+    
+    Serves the files below parameters['General']['PathFolderResources'] (the paths used by all loaders) from the first provider having them: the archive parameters['General']['PathFtlDat'] if it exists, then the unpacked folder.
+    Paths outside the resource folder (e.g. the background pictures) and resources no provider has are read from disk as given.
+    Use getResourceProvider to get the provider shared by all loaders, so the archive is only opened and indexed once.
+    
+    Init:
+        - parameters [Dict]: All parameters
+    
+    Fields:
+        - resourceFolder [str]: Folder prefix of the resource paths, parameters['General']['PathFolderResources']
+        - providers [List]: Providers in the order they are asked (datArchive, unpackedFolder)
+    
+    Methods:
+        - getInnerPath(path [str]): Returns the path inside the resources or None if the path is outside the resource folder
+        - exists(path [str]): Returns whether the file at path exists in a provider or on disk
+        - getEntry(path [str]): Returns the content of the file at path
+        - loadImage(path [str], imageLoad [Callable]): Returns the image at path decoded with imageLoad (pygame.image.load)
+        - hashFile(path [str]): Returns the sha1 hash of the content of the file at path, None if it does not exist
+    
+    Auxiliary methods (called internally):
+        - findProvider(path [str]): Returns the provider having the file and the inner path, None as provider if no provider has it
+    
+    """
+    
+    
+    ###
+    # Initialization
+    def __init__(self, parameters: Dict) -> None:
+        self.resourceFolder = os.path.normpath(parameters['General']['PathFolderResources'])
+        
+        self.providers = list()
+        
+        if parameters['General']['PathFtlDat'] and os.path.isfile(parameters['General']['PathFtlDat']):
+            self.providers.append(datArchive(parameters['General']['PathFtlDat']))
+        
+        self.providers.append(unpackedFolder(parameters['General']['PathFolderResources']))
+    
+    
+    ###
+    # Map the paths of the loaders to the resources
+    def getInnerPath(self, path: str) -> [None, str]:
+        relativePath = os.path.relpath(os.path.normpath(path), self.resourceFolder)
+        
+        if relativePath.startswith(os.pardir):
+            return(None)
+        
+        return(relativePath.replace(os.sep, '/'))
+    
+    
+    def findProvider(self, path: str) -> Tuple:
+        innerPath = self.getInnerPath(path)
+        
+        if innerPath is not None:
+            for provider in self.providers:
+                if provider.contains(innerPath):
+                    return(provider, innerPath)
+        
+        return(None, innerPath)
+    
+    
+    ###
+    # Content of the resources
+    def exists(self, path: str) -> bool:
+        return((self.findProvider(path)[0] is not None) or os.path.isfile(path))
+    
+    
+    def getEntry(self, path: str) -> [memoryview, bytes]:
+        provider, innerPath = self.findProvider(path)
+        
+        if provider is None:
+            with open(path, 'rb') as resourceFile:
+                return(resourceFile.read())
+        
+        return(provider.getEntry(innerPath))
+    
+    
+    def loadImage(self, path: str, imageLoad: Callable) -> pygame.Surface:
+        provider, innerPath = self.findProvider(path)
+        
+        if provider is None:
+            return(imageLoad(path))
+        
+        return(provider.loadImage(innerPath, imageLoad))
+    
+    
+    def hashFile(self, path: str) -> [None, str]:
+        provider, innerPath = self.findProvider(path)
+        
+        if provider is None:
+            if not os.path.isfile(path):
+                return(None)
+            
+            with open(path, 'rb') as resourceFile:
+                return(hashlib.sha1(resourceFile.read()).hexdigest())
+        
+        return(hashlib.sha1(provider.getEntry(innerPath)).hexdigest())
+
+
+###
+# Functions
+
+##
+# Provider shared by all loaders
+def getResourceProvider(parameters: Dict) -> resourceProvider:
+    key = (parameters['General']['PathFtlDat'], parameters['General']['PathFolderResources'])
+    
+    if key not in openedProviders:
+        openedProviders[key] = resourceProvider(parameters)
+    
+    return(openedProviders[key])
@@ -0,0 +1,440 @@
+###
+#
+# Define a class which stores the loaded and derived sprites on disk, so later starts don't have to decode and derive them again
+#
+###
+
+
+###
+# Load packages
+
+# Logging
+import logging
+
+# Typing
+from typing import Any, Callable, Dict, List, Tuple
+
+# OS
+import os
+import sys
+import types
+
+# Hashing and storing
+import hashlib
+import pickle
+import mmap
+import io
+
+# Timing
+import time
+
+# Arrays
+import numpy as np
+
+# Pygame
+import pygame
+
+
+###
+# Import ressources
+
+# Access to ftl.dat or the unpacked resources
+import src.classes.setup.resource_provider as resourceProvider
+
+
+###
+# Setup logging
+logger = logging.getLogger(__name__)
+
+
+###
+# Version of the cache files, increase if the file layout changes
+spriteCacheVersion = 1
+
+# Conversion of surfaces to raw pixel data (tostring for pygame versions before 2.1.3)
+surfaceToBytes = getattr(pygame.image, 'tobytes', None) or pygame.image.tostring
+
+
+###
+# Define the sprite cache class
+class spriteCache(object):
+    """
+    
+    Cache for the sprite objects (e.g. the player ship sprites) on disk. Every sprite object is stored with all its derived images (shield levels, Zoltan shields, flipped weapons, ...) in the cache folder as two files:
+        - {name}.bin: Raw RGBA pixel data of all images, read back through a memory map
+        - {name}.index: Pickled sprite object with references into the pixel data instead of the images, the hash of the parameters and the content hashes of all source files
+    An entry is only used if the parameters are unchanged and all source files (the loaded images, the module defining the sprite object and the project modules it uses, see getCodeFiles) have the same content as when it was written. Otherwise the sprite object is created again and the entry is replaced.
+    Images are converted to the display format when they are read, so the display has to be set up first.
+    
+    Init:
+        - parameters [Dict]: All parameters
+    
+    Fields:
+        - enabled [bool]: Whether the cache is used, parameters['General']['SpriteCache']
+        - folder [str]: Folder of the cache files
+        - parametersHash [str]: Hash of all parameters
+        - resources [resourceProvider]: Provider of the resource files, the source files are hashed by their content in ftl.dat or the unpacked folder
+        - validatedEntries [Dict]: Modification time of the index of the entries checked by isValid by name, the next read of such an entry doesn't hash the source files again
+        - hits [int]: Number of sprite objects read from the cache
+        - misses [int]: Number of sprite objects which had to be created
+    
+    Methods:
+        - get(name [str], createSprites [Callable], sourceFiles [None, List]): Returns the sprite object stored as name, creates it with createSprites() and stores it if there is no valid entry. Files read without pygame.image.load (e.g. images decoded in advance) have to be given as sourceFiles
+    
+        - isValid(name [str]): Returns whether there is a valid entry for name, e.g. to decide whether its images have to be loaded. The validation is reused by the next get
+    
+    Auxiliary methods (called internally):
+        - readIndex(name [str]): Returns the index of the entry or None if there is no valid entry
+        - read(name [str]): Returns the stored sprite object or None if there is no valid entry
+        - write(name [str], sprites [Any], sourceFiles [List]): Store the sprite object
+        - createAndRecordSources(createSprites [Callable]): Create the sprite object and record all loaded image files
+    
+    """
+    
+    
+    ###
+    # Initialization
+    def __init__(self, parameters: Dict) -> None:
+        logger.debug('Initialize the sprite cache')
+        
+        self.enabled = parameters['General']['SpriteCache']
+        self.folder = parameters['General']['SpriteCacheFolder']
+        self.parametersHash = hashObject(parameters)
+        self.resources = resourceProvider.getResourceProvider(parameters)
+        self.validatedEntries = dict()
+        
+        self.hits = 0
+        self.misses = 0
+    
+    
+    ###
+    # Sprite object from the cache or newly created
+    def get(self, name: str, createSprites: Callable, sourceFiles: [None, List] = None) -> Any:
+        if not self.enabled:
+            return(createSprites())
+        
+        ##
+        # Stored entry
+        startTime = time.perf_counter()
+        
+        try:
+            sprites = self.read(name)
+        except Exception as exception:
+            logger.warning('Sprite cache entry {name} could not be read, it is created again: {exception}'.format(name = name, exception = exception))
+            sprites = None
+        
+        if sprites is not None:
+            self.hits += 1
+            logger.info('Read the {name} sprites from the cache in {time:.0f} ms'.format(name = name, time = 1000 * (time.perf_counter() - startTime)))
+            return(sprites)
+        
+        
+        ##
+        # Create and store
+        self.misses += 1
+        
+        sprites, recordedFiles = self.createAndRecordSources(createSprites)
+        
+        try:
+            self.write(name, sprites, list(sourceFiles or list()) + recordedFiles)
+        except OSError as exception:
+            logger.warning('Sprite cache entry {name} could not be written: {exception}'.format(name = name, exception = exception))
+        
+        logger.info('Created the {name} sprites in {time:.0f} ms'.format(name = name, time = 1000 * (time.perf_counter() - startTime)))
+        
+        return(sprites)
+    
+    
+    ###
+    # Create the sprite object and record the loaded images
+    def createAndRecordSources(self, createSprites: Callable) -> Tuple:
+        sourceFiles = list()
+        imageLoad = pygame.image.load
+        
+        def recordingImageLoad(file, *args, **kwargs):
+            if isinstance(file, (str, os.PathLike)):
+                sourceFiles.append(os.fspath(file))
+            
+            return(imageLoad(file, *args, **kwargs))
+        
+        pygame.image.load = recordingImageLoad
+        try:
+            sprites = createSprites()
+        finally:
+            pygame.image.load = imageLoad
+        
+        # Changes of the code deriving the images invalidate the entry as well: the modules of the sprite object and of the object owning createSprites with the project modules they use, and the module of createSprites itself
+        sourceFiles += getCodeFiles(type(sprites).__module__)
+        
+        if hasattr(createSprites, '__self__'):
+            sourceFiles += getCodeFiles(type(createSprites.__self__).__module__)
+        
+        codeFile = getattr(sys.modules.get(getattr(createSprites, '__module__', None)), '__file__', None)
+        if codeFile is not None:
+            sourceFiles.append(codeFile)
+        
+        return(sprites, sourceFiles)
+    
+    
+    ###
+    # Check an entry
+    def isValid(self, name: str) -> bool:
+        if not self.enabled:
+            return(False)
+        
+        try:
+            if self.readIndex(name) is None:
+                return(False)
+            
+            # Remember the index file which was checked, so get doesn't hash all source files again
+            self.validatedEntries[name] = os.stat(os.path.join(self.folder, name + '.index')).st_mtime_ns
+        except Exception:
+            return(False)
+        
+        return(True)
+    
+    
+    def readIndex(self, name: str) -> [None, Dict]:
+        indexPath = os.path.join(self.folder, name + '.index')
+        dataPath = os.path.join(self.folder, name + '.bin')
+        
+        if not (os.path.isfile(indexPath) and os.path.isfile(dataPath)):
+            logger.debug('No sprite cache entry {}'.format(name))
+            return(None)
+        
+        with open(indexPath, 'rb') as indexFile:
+            index = pickle.load(indexFile)
+            indexTime = os.fstat(indexFile.fileno()).st_mtime_ns
+        
+        # The entry was validated by isValid and not replaced since
+        if self.validatedEntries.pop(name, None) == indexTime:
+            return(index)
+        
+        
+        ##
+        # Check whether the entry is still valid
+        if (index['Version'] != spriteCacheVersion) or (index['ParametersHash'] != self.parametersHash):
+            logger.debug('Sprite cache entry {} was written with different parameters'.format(name))
+            return(None)
+        
+        for sourceFile, sourceHash in index['SourceFiles']:
+            if self.resources.hashFile(sourceFile) != sourceHash:
+                logger.debug('Sprite cache entry {name} is outdated, {sourceFile} changed'.format(name = name, sourceFile = sourceFile))
+                return(None)
+        
+        return(index)
+    
+    
+    ###
+    # Read an entry
+    def read(self, name: str) -> Any:
+        index = self.readIndex(name)
+        if index is None:
+            return(None)
+        
+        
+        ##
+        # Restore the sprite object with the images read from the memory mapped pixel data
+        with open(os.path.join(self.folder, name + '.bin'), 'rb') as dataFile:
+            if not os.fstat(dataFile.fileno()).st_size:
+                return(surfaceUnpickler(io.BytesIO(index['Sprites']), memoryview(b'')).load())
+            
+            with mmap.mmap(dataFile.fileno(), 0, access = mmap.ACCESS_READ) as data:
+                dataView = memoryview(data)
+                try:
+                    sprites = surfaceUnpickler(io.BytesIO(index['Sprites']), dataView).load()
+                finally:
+                    dataView.release()
+        
+        return(sprites)
+    
+    
+    ###
+    # Write an entry
+    def write(self, name: str, sprites: Any, sourceFiles: List) -> None:
+        os.makedirs(self.folder, exist_ok = True)
+        
+        indexPath = os.path.join(self.folder, name + '.index')
+        dataPath = os.path.join(self.folder, name + '.bin')
+        
+        ##
+        # Pixel data and the sprite object referencing it
+        spritesPickled = io.BytesIO()
+        with open(dataPath + '.tmp', 'wb') as dataFile:
+            surfacePickler(spritesPickled, dataFile).dump(sprites)
+        
+        index = dict()
+        index['Version'] = spriteCacheVersion
+        index['ParametersHash'] = self.parametersHash
+        index['SourceFiles'] = [(sourceFile, self.resources.hashFile(sourceFile)) for sourceFile in dict.fromkeys(sourceFiles)]
+        index['Sprites'] = spritesPickled.getvalue()
+        
+        with open(indexPath + '.tmp', 'wb') as indexFile:
+            pickle.dump(index, indexFile, protocol = pickle.HIGHEST_PROTOCOL)
+        
+        # Replace both files only after they are complete
+        os.replace(dataPath + '.tmp', dataPath)
+        os.replace(indexPath + '.tmp', indexPath)
+        
+        logger.debug('Stored the {name} sprites in the cache'.format(name = name))
+
+
+###
+# Pickler which writes the images and masks as raw pixel data to a separate file
+class surfacePickler(pickle.Pickler):
+    """
+    
+    Pickles an object, all pygame surfaces and masks in it are written as raw RGBA pixel data to dataFile and replaced by their position, size and settings. Surfaces referenced several times are written once.
+    
+    """
+    
+    def __init__(self, file: io.BytesIO, dataFile: io.BufferedWriter) -> None:
+        super().__init__(file, protocol = pickle.HIGHEST_PROTOCOL)
+        
+        self.dataFile = dataFile
+        self.writtenSurfaces = dict()
+    
+    
+    def persistent_id(self, obj: Any) -> [None, Tuple]:
+        if isinstance(obj, pygame.Surface):
+            if id(obj) not in self.writtenSurfaces:
+                surfaceAlpha = bool(obj.get_flags() & pygame.SRCALPHA)
+                self.writtenSurfaces[id(obj)] = ('Surface', self.writeData(surfaceToBytes(obj, 'RGBA')), obj.get_size(), surfaceAlpha, obj.get_colorkey(), obj.get_alpha())
+            
+            return(self.writtenSurfaces[id(obj)])
+        
+        elif isinstance(obj, pygame.mask.Mask):
+            maskSurface = obj.to_surface(setcolor = (255, 255, 255, 255), unsetcolor = (0, 0, 0, 255))
+            return(('Mask', self.writeData(surfaceToBytes(maskSurface, 'RGBA')), obj.get_size()))
+        
+        return(None)
+    
+    
+    def writeData(self, data: bytes) -> int:
+        offset = self.dataFile.tell()
+        self.dataFile.write(data)
+        
+        return(offset)
+
+
+###
+# Unpickler which reads the images and masks from the raw pixel data
+class surfaceUnpickler(pickle.Unpickler):
+    """
+    
+    Restores an object pickled by surfacePickler. The surfaces are created from the pixel data and converted to the display format, so they don't reference the pixel data afterwards.
+    
+    """
+    
+    def __init__(self, file: io.BytesIO, data: memoryview) -> None:
+        super().__init__(file)
+        
+        self.data = data
+        self.convert = pygame.display.get_surface() is not None
+        self.readSurfaces = dict()
+    
+    
+    def persistent_load(self, pid: Tuple) -> Any:
+        if pid[0] == 'Surface':
+            _, offset, size, surfaceAlpha, colorkey, alpha = pid
+            
+            # The same surface is referenced several times
+            if offset in self.readSurfaces:
+                return(self.readSurfaces[offset])
+            
+            surfaceData = pygame.image.frombuffer(self.data[offset:offset + 4 * size[0] * size[1]], size, 'RGBA')
+            
+            if not self.convert:
+                surface = surfaceData.copy() if surfaceAlpha else surfaceData.convert(24)
+            elif surfaceAlpha:
+                surface = surfaceData.convert_alpha()
+            else:
+                surface = surfaceData.convert()
+            
+            del surfaceData
+            
+            if colorkey is not None:
+                surface.set_colorkey(colorkey)
+            if (alpha is not None) and not surfaceAlpha:
+                surface.set_alpha(alpha)
+            
+            self.readSurfaces[offset] = surface
+            return(surface)
+        
+        elif pid[0] == 'Mask':
+            _, offset, size = pid
+            
+            maskSurface = pygame.image.frombuffer(self.data[offset:offset + 4 * size[0] * size[1]], size, 'RGBA')
+            mask = pygame.mask.from_threshold(maskSurface, (255, 255, 255, 255), (1, 1, 1, 255))
+            del maskSurface
+            
+            return(mask)
+        
+        raise pickle.UnpicklingError('Unknown reference {} in the sprite cache'.format(pid[0]))
+
+
+###
+# Functions
+
+##
+# Hash of nested parameters
+def hashObject(obj: Any, hasher: [None, Any] = None) -> [None, str]:
+    """
+    
+    Hash of nested dictionaries, lists and arrays. Dictionaries are hashed independent of their order, arrays by their full content.
+    Returns the hex digest if no hasher is given, otherwise the hasher is updated.
+    
+    """
+    
+    returnDigest = hasher is None
+    if returnDigest:
+        hasher = hashlib.sha1()
+    
+    if isinstance(obj, dict):
+        hasher.update(b'{')
+        for key in sorted(obj.keys(), key = repr):
+            hasher.update(repr(key).encode())
+            hashObject(obj[key], hasher)
+        hasher.update(b'}')
+    
+    elif isinstance(obj, (list, tuple)):
+        hasher.update(b'[')
+        for value in obj:
+            hashObject(value, hasher)
+        hasher.update(b']')
+    
+    elif isinstance(obj, np.ndarray):
+        hasher.update('{dtype}{shape}'.format(dtype = obj.dtype, shape = obj.shape).encode())
+        hasher.update(np.ascontiguousarray(obj).tobytes())
+    
+    else:
+        hasher.update(repr(obj).encode())
+    
+    if returnDigest:
+        return(hasher.hexdigest())
+
+
+##
+# Code files of a module
+def getCodeFiles(moduleName: [None, str]) -> List:
+    """
+    
+    Returns the file of the module and the files of all modules of the same package (e.g. src) it imports or imports from, e.g. src/misc/helperfunctions.py for copySprite.
+    Used as source files of the sprite cache entries, so changes of the code deriving the images invalidate the entries. Modules imported indirectly are not included.
+    
+    """
+    
+    module = sys.modules.get(moduleName)
+    if getattr(module, '__file__', None) is None:
+        return(list())
+    
+    codeFiles = [module.__file__]
+    
+    package = module.__name__.split('.')[0] + '.'
+    for value in list(vars(module).values()):
+        usedModule = value if isinstance(value, types.ModuleType) else sys.modules.get(getattr(value, '__module__', None))
+        
+        if (usedModule is not None) and usedModule.__name__.startswith(package) and (getattr(usedModule, '__file__', None) is not None):
+            codeFiles.append(usedModule.__file__)
+    
+    return(list(dict.fromkeys(codeFiles)))
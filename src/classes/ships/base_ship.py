@@ -33,9 +33,15 @@ import src.classes.elements.rooms as rooms
 # Doors
 import src.classes.elements.doors as doors
 
+# State arrays of rooms and doors
+import src.classes.ships.ship_state as shipState
+
 # Helperfunctions
 from src.misc.helperfunctions import copySprite
 
+# Clickable elements
+import src.misc.hit_test_registry as hitTestRegistry
+
 
 
 
@@ -91,16 +97,29 @@ class baseShip(object):
         
         - roomConnections [np.matrix]: Matrix of dimension nDoors[unique room connections] x 2 with rooms connected by doors by rows. The rooms are indicated by the roomKeys, space is denoted with 0. The matrix is ordered by columns
         - roomConnections [np.matrix, None]: Matrix of rooms connected by open doors, specified the same way like roomConnections. None if all doors are closed
+        - doorConnections [Dict]: Dictionary which lists for each doorKey the connected rooms as ordered tuple (smaller roomKey first)
+        - doorsOpen [Dict]: Dictionary with the open state of every door as used for the connectivity
+        - openConnectionCounts [Dict]: Number of open doors for every pair of connected rooms (ordered tuple as key). Pairs without open doors are not present
+        
+        - state [shipState]: State of all rooms and doors as struct of arrays. The rooms and doors read and write their state fields (e.g. oxygen, status, currentPosition) from it
+        - oxygenLevels [np.array]: Oxygen of all rooms in the order of presentRooms, row of the state arrays
+        - oxygenChanged [bool]: True if the last call of updateOxygen changed the oxygen levels
+        - oxygenRoomIndex [Dict]: Mapping roomKey:index into oxygenLevels
+        - oxygenConnections [np.array]: Indices into oxygenLevels of the rooms connected by open doors, one column per direction (2 x 2*nOpenConnections). Rebuilt when the doors change
+        - oxygenSpaceConnections [np.array]: Vector with 1 for every room with an open door to space, 0 otherwise
+        - oxygenSpaceOpen [bool]: True if any room has an open door to space
+        - oxygenBreaches [np.array]: Vector with the number of hull breaches of every room, ordered like oxygenLevels, row of the state arrays
+        - breachedRooms [set]: Set of all roomKeys with hull breaches
         
         - doorRooms [Dict]: Dictionary which lists for each doorKey the connected rooms in a tuple
         - roomDoors [Dict]: Dictionary which lists for each roomKey the connected doors in a tuple
         - spaceDoors [set]: Set of all doorKeys which are connected to space
         
-        - doorRectMatrix [np.matrix]: Matrix of all door rects in pixels on the screen. Every door is a row of the matrix
-        - doorKeysForRects [np.array]: Vector of all doorKeys in the order they appear in the doorRectMatrix
-        - doorRectForSelection[np.matrix]: Matrix of all door rects with the inverted lowerright point appended for quicker comparisons later on
+        - hitTargets [hitTestRegistry]: Clickable elements of the ship (group 'Doors' by doorKey, 'Rooms' by roomKey, 'Systems' by system for the player ship) to find the clicked element
         
         - currentMaxShieldStrength [int]: Current max shield strength based on current power
+        - shieldCollision [Dict, None]: Hit geometry of the shield sprites relative to their topleft corner (see createShieldCollision), None if the ship has no shield sprites
+        - spritesAcquired [bool]: Whether the ship uses sprite groups of the ship sprite object, they have to be released with releaseShipSprites
     
     Fields to be provided by the derived class:
         - parameters [Dict]: Reference to all parameters
@@ -111,23 +130,37 @@ class baseShip(object):
         
         - playerShip [bool]: Logical to differentiate between the player and the enemy ship
         - battle [bool]: Logical to indicate whether the ship is in battle or not
+        - headless [bool]: Logical to indicate that the ship is only simulated. Rooms and doors are created without images
 
     Methods:
         - shipSetup(): After all the fields are set, this function constructs the initial state of the ship
         - expandLayout(): Zero-pad the ship layout to add empty space around the ship. 
         - setupSystemLevels(): Create the system and reactor dictionaries which contain the present systems and the reactor informations
         - loadShipAndShieldsSprites(): Load all the relevant ship sprites (Base, Gib, Shields, Zoltanshields, Cloak)
+        - releaseShipSprites(): Release the sprite groups of the ship in the ship sprite object once the ship is no longer on screen, so they can be freed
         - createRoomInformation(): Set the room informations from the provided parameters. Creates the dictionaries shipRooms with the room coordinates and shipFields with the field information inside the rooms
         - createRoomObjects(): Create and store room objects for all the rooms on the ship
         - createDoorObjects(): Create and store door objects for all the doors on the ship
+        - createShipState(): Create the state arrays of all rooms and doors and hand them to the room and door objects
         - updateRoomConnectivityAll(): Create or update the matrix of room connections by doors
-        - updateRoomConnectivityOpenDoors(): Create or update the matrix of room connected by open doors
+        - updateRoomConnectivityOpenDoors(): Create or update the matrix of room connected by open doors, checks all doors
+        - updateDoorConnectivity(doorKeys [List]): Update the room connectivity for the doors whose position changed. Only does work for doors which were opened or closed
+        - setOpenRoomConnections(): Create the matrix of rooms connected by open doors and the oxygen connections from the open connection counts
+        - updateOxygenConnections(): Create or update the open connections used for the oxygen exchange from the matrix of open room connections
         - updateDoorRoomkeys(): Create or update dictionaries connecting rooms with doors and vice versa. Also sets the field spaceDoors
-        - updateDoorRects(): Create or update the rects for the doors needed for the door animation control
+        - updateDoorRects(): Create or update the rects for the doors needed for the door animation control. Also registers the doors and rooms in hitTargets
         - setCurrentMaxShieldSprite(): Set maximal shield strength sprite based on the current power to shields
+        - getShieldEllipse(): Returns the shield ellipse on the screen as center x, center y, semi-axis x, semi-axis y in pixels. Ships without shield sprites get an ellipse enclosing all rooms with a margin
+        - isInsideShields(position [np.array]): Check whether a point on the screen is covered by the shields
         - updateRoom(roomKey [int]): Update the activeSprite field for the given room
         - updateDoor(doorKey [str]): Update the activeSprite field for the given door
+        - updateDoors(doorKeys [List]): Update the activeSprite fields for several doors, every neighboring room and door is only updated once
         - updateOxygen(dt [int]): Update the oxygen in the rooms with a time step of dt given in milliseconds
+        - damageToRoom(roomKey [int], damageSystem [int], damageHull [int]): Apply hull damage and damage the system in the room. Power above the remaining system capacity is returned
+        - addBreach(roomKey [int]): Add a hull breach to the room, the room loses oxygen until it is repaired
+        - addFire(roomKey [int]): Add a fire to the room
+        - getStateSnapshot(): Returns a copy of the state of all rooms and doors
+        - restoreState(snapshot [np.array]): Set the state of all rooms and doors from a snapshot and update everything derived from it
         
     Auxiliary methods (called internally):
         - setDeltaRectBattleAndIdle(): Set the delta in pixels between idle and battle
@@ -215,6 +248,10 @@ class baseShip(object):
                 
         # Create the doors
         self.createDoorObjects()
+        
+        # Keep the state of all rooms and doors in arrays
+        self.createShipState()
+        
         self.updateRoomConnectivityAll()
         self.updateRoomConnectivityOpenDoors()
         
@@ -225,7 +262,8 @@ class baseShip(object):
         # Connect rooms and corresponding doors
         self.updateDoorRoomkeys()
         
-        # Set the door rects for animation control
+        # Set the door rects for animation control and the clickable elements
+        self.hitTargets = hitTestRegistry.hitTestRegistry(self.parameters['General']['HitTestCellSize'], self.parameters['General']['HitTestPriorities'])
         self.updateDoorRects()
         
         
@@ -401,6 +439,12 @@ class baseShip(object):
         else:
             spriteDictionary = 'EnemyShip'
         
+        ##
+        # Load the sprite groups of the ship if no other ship uses them yet
+        if not self.spritesAcquired:
+            self.spritesAll[spriteDictionary].acquireShip(self.ship, self.variant)
+            self.spritesAcquired = True
+        
         ##
         # Initialize the dictionary containing the ship sprites
         self.shipSprites = dict()
@@ -427,6 +471,9 @@ class baseShip(object):
             self.shipSprites['ZoltanShield'] = copySprite(self.spritesAll[spriteDictionary].loadedSprites[self.ship]['ZoltanShield'])
             self.rectIdle(self.shipSprites['ZoltanShield'].rect)
             self.rectShields(self.shipSprites['ZoltanShield'].rect)
+            
+            # Hit geometry
+            self.shieldCollision = self.spritesAll[spriteDictionary].loadedSprites[self.ship]['ShieldCollision']
                 
         else:
             for level in range(0, self.parameters['General']['ShieldMaxLevel']):
@@ -444,9 +491,24 @@ class baseShip(object):
             self.rectIdle(self.shipSprites['ZoltanShield'].rect)
             self.rectShields(self.shipSprites['ZoltanShield'].rect)
             
+            # Hit geometry of the stretched shields
+            self.shieldCollision = self.spritesAll[spriteDictionary].getShieldCollision(self.shipSprites['Shield1'].rect.size)
+            
         # Cloak
         self.shipSprites['Cloak'] = copySprite(self.spritesAll[spriteDictionary].loadedSprites[self.ship]['Cloak'])
         self.rectIdle(self.shipSprites['Cloak'].rect)
+    
+    
+    ###
+    # Release the sprite groups of the ship, the ship keeps its own copies in shipSprites
+    def releaseShipSprites(self) -> None:
+        if not self.spritesAcquired:
+            return
+        
+        logger.debug('Release the ship sprites for {ship}-{variant}'.format(ship = self.ship, variant = self.variant))
+        
+        self.spritesAll['PlayerShip' if self.playerShip else 'EnemyShip'].releaseShip(self.ship, self.variant)
+        self.spritesAcquired = False
 
 
     ###
@@ -601,7 +663,7 @@ class baseShip(object):
                 system = None
             
             # Create room object
-            self.rooms[roomIndex] = rooms.room(roomIndex, self.parameters, self.spritesAll, self.doorMatrixHorizontal, self.doorMatrixVertical, self.clonebayOrientation, self.playerShip, consoleOrientationEnemyShip, relevantSystemInformation, system)
+            self.rooms[roomIndex] = rooms.room(roomIndex, self.parameters, self.spritesAll, self.doorMatrixHorizontal, self.doorMatrixVertical, self.clonebayOrientation, self.playerShip, consoleOrientationEnemyShip, relevantSystemInformation, system, headless = self.headless)
             
             
             ##
@@ -646,7 +708,7 @@ class baseShip(object):
                     canvCoord = self.shiftRoomCoord + np.array(((j + 1) * self.parameters['General']['RoomHeightPixel'], i * self.parameters['General']['RoomHeightPixel']))
                     
                     # Create the door objects                        
-                    self.doors[doorKey] = doors.door(doorKey, vertical, self.parameters, field1, field2, field1Roomkey, field2Roomkey, doorLevel, canvCoord)
+                    self.doors[doorKey] = doors.door(doorKey, vertical, self.parameters, field1, field2, field1Roomkey, field2Roomkey, doorLevel, canvCoord, headless = self.headless)
 
                     
                     ##
@@ -673,7 +735,7 @@ class baseShip(object):
                     canvCoord = self.shiftRoomCoord + np.array([j * self.parameters['General']['RoomHeightPixel'], (i + 1) * self.parameters['General']['RoomHeightPixel']])
         
                     # Create the door objects
-                    self.doors[doorKey] = doors.door(doorKey, vertical, self.parameters, field1, field2, field1Roomkey, field2Roomkey, doorLevel, canvCoord)
+                    self.doors[doorKey] = doors.door(doorKey, vertical, self.parameters, field1, field2, field1Roomkey, field2Roomkey, doorLevel, canvCoord, headless = self.headless)
 
 
                     ##
@@ -687,32 +749,129 @@ class baseShip(object):
         self.presentDoors = np.unique(list(self.doors.keys()))
 
 
+    ###
+    # Function to create the state arrays of the rooms and doors
+    def createShipState(self) -> None:
+        logger.debug('Create the state arrays of the rooms and doors')
+        
+        self.state = shipState.shipState(self.presentRooms, self.presentDoors)
+        
+        # The objects keep their current values but read and write them from the state arrays from now on
+        for roomKey, index in self.state.roomIndex.items():
+            self.rooms[roomKey].shareState(self.state, index)
+        
+        for doorKey, index in self.state.doorIndex.items():
+            self.doors[doorKey].shareState(self.state, index)
+        
+        
+        ##
+        # Oxygen and breaches of all rooms
+        self.oxygenLevels = self.state.roomOxygen
+        self.oxygenRoomIndex = self.state.roomIndex
+        self.oxygenChanged = False
+        
+        self.oxygenBreaches = self.state.roomBreaches
+        self.breachedRooms = set()
+
+
     ###
     # Function to create/update an array of all avaiable room connections
     def updateRoomConnectivityAll(self) -> None:
         logger.debug('Update room connectivity')
         
-        roomConnections = list()
+        self.doorConnections = dict()
         for door in self.doors.keys():
-            roomConnections.append([min(self.doors[door].field1Roomkey, self.doors[door].field2Roomkey), max(self.doors[door].field1Roomkey, self.doors[door].field2Roomkey)])
+            self.doorConnections[door] = (min(self.doors[door].field1Roomkey, self.doors[door].field2Roomkey), max(self.doors[door].field1Roomkey, self.doors[door].field2Roomkey))
         
-        self.roomConnections = np.unique([tuple(row) for row in roomConnections], axis = 0)
+        self.roomConnections = np.unique([connection for connection in self.doorConnections.values()], axis = 0)
         
 
     ###
     # Function to create/update an array of all open room connections
     def updateRoomConnectivityOpenDoors(self) -> None:
         logger.debug('Update open room connectivity')
-
-        roomConnectionsOpen = list()
+        
+        ##
+        # Count the open doors for every pair of rooms
+        self.doorsOpen = dict()
+        self.openConnectionCounts = dict()
         for door in self.doors.keys():
-            if self.doors[door].currentPosition:
-                roomConnectionsOpen.append([min(self.doors[door].field1Roomkey, self.doors[door].field2Roomkey), max(self.doors[door].field1Roomkey, self.doors[door].field2Roomkey)])
+            self.doorsOpen[door] = bool(self.doors[door].currentPosition)
+            
+            if self.doorsOpen[door]:
+                self.openConnectionCounts[self.doorConnections[door]] = self.openConnectionCounts.get(self.doorConnections[door], 0) + 1
+        
+        self.setOpenRoomConnections()
+
+
+    ###
+    # Function to update the connectivity if doors changed
+    def updateDoorConnectivity(self, doorKeys: list) -> None:
+        connectionsChanged = False
+        for doorKey in doorKeys:
+            doorOpen = bool(self.doors[doorKey].currentPosition)
+            
+            # Nothing changes while the door moves between open positions
+            if doorOpen == self.doorsOpen[doorKey]:
+                continue
+            
+            self.doorsOpen[doorKey] = doorOpen
+            
+            ##
+            # Count the door, the connections only change if the first door between two rooms is opened or the last one is closed
+            connection = self.doorConnections[doorKey]
+            if doorOpen:
+                self.openConnectionCounts[connection] = self.openConnectionCounts.get(connection, 0) + 1
+                
+                if self.openConnectionCounts[connection] == 1:
+                    connectionsChanged = True
+            
+            else:
+                self.openConnectionCounts[connection] -= 1
+                
+                if not self.openConnectionCounts[connection]:
+                    del self.openConnectionCounts[connection]
+                    connectionsChanged = True
         
-        if len(roomConnectionsOpen):
-            self.roomConnectionsOpen = np.unique([tuple(row) for row in roomConnectionsOpen], axis = 0)
+        ##
+        # Rebuild the derived fields once for all doors
+        if connectionsChanged:
+            self.setOpenRoomConnections()
+
+
+    ###
+    # Function to set all the fields derived from the open connections
+    def setOpenRoomConnections(self) -> None:
+        ##
+        # Matrix of the open connections, ordered like np.unique would order it
+        if len(self.openConnectionCounts):
+            self.roomConnectionsOpen = np.array(sorted(self.openConnectionCounts.keys()))
         else:
-            self.roomConnectionsOpen = None    
+            self.roomConnectionsOpen = None
+        
+        self.updateOxygenConnections()
+
+
+    ###
+    # Function to convert the open room connections into indices of the oxygen vector
+    def updateOxygenConnections(self) -> None:
+        self.oxygenSpaceConnections = np.zeros(len(self.presentRooms))
+        
+        connectionsFrom = list()
+        connectionsTo = list()
+        if self.roomConnectionsOpen is not None:
+            for roomKey1, roomKey2 in self.roomConnectionsOpen:
+                # Rows are ordered, so space is always the first room
+                if roomKey1 == 0:
+                    self.oxygenSpaceConnections[self.oxygenRoomIndex[roomKey2]] = 1
+                
+                # Oxygen flows in both directions
+                else:
+                    connectionsFrom += [self.oxygenRoomIndex[roomKey1], self.oxygenRoomIndex[roomKey2]]
+                    connectionsTo += [self.oxygenRoomIndex[roomKey2], self.oxygenRoomIndex[roomKey1]]
+        
+        self.oxygenConnections = np.array([connectionsFrom, connectionsTo], dtype = int)
+        self.oxygenSpaceOpen = bool(self.oxygenSpaceConnections.any())
 
 
     ###
@@ -744,22 +903,15 @@ class baseShip(object):
     def updateDoorRects(self) -> None:
         logger.debug('Update door rects for animation control')
         
-        # Get the rects as x, y, w, h
-        doorRectList = list()
-        doorKeyListForRect = list()
+        ##
+        # Register the doors and rooms as clickable elements
+        self.hitTargets.removeGroup('Doors')
         for doorKey in self.doors.keys():
-            doorRectList.append(list(self.doors[doorKey].currentSprite.rect))
-            doorKeyListForRect.append(doorKey)
+            self.hitTargets.addRect('Doors', doorKey, self.doors[doorKey].currentSprite.rect)
         
-        # Save the fields
-        self.doorRectMatrix = np.array(doorRectList)
-        self.doorKeysForRects = np.array(doorKeyListForRect)
-        
-        # Change the rects to the format for the mouse checks 
-        self.doorRectForSelection = copy.deepcopy(self.doorRectMatrix)
-        
-        self.doorRectForSelection[:,2] = -(self.doorRectForSelection[:,0] + self.doorRectForSelection[:,2] - 1)
-        self.doorRectForSelection[:,3] = -(self.doorRectForSelection[:,1] + self.doorRectForSelection[:,3] - 1)        
+        self.hitTargets.removeGroup('Rooms')
+        for roomKey in self.presentRooms:
+            self.hitTargets.addRect('Rooms', roomKey, self.rooms[roomKey].rect)
 
 
 
@@ -788,6 +940,36 @@ class baseShip(object):
             self.activeSprites['Shields'] = None
 
 
+    ###
+    # Shield ellipse on the screen
+    def getShieldEllipse(self) -> np.ndarray:
+        if self.shieldCollision is not None:
+            return(self.shieldCollision['Ellipse'] + np.array([self.shipSprites['Shield1'].rect.x, self.shipSprites['Shield1'].rect.y, 0, 0]))
+        
+        ##
+        # Without shield sprites the ellipse is put around the rooms
+        roomsRect = self.rooms[self.presentRooms[0]].rect.unionall([self.rooms[roomKey].rect for roomKey in self.presentRooms[1:]])
+        margin = self.parameters['General']['ShieldEllipseMarginPixels']
+        
+        # The smallest ellipse of the same aspect ratio enclosing the rect has sqrt(2) times its half sides as semi-axes
+        return(np.array([roomsRect.centerx, roomsRect.centery, roomsRect.w / np.sqrt(2) + margin, roomsRect.h / np.sqrt(2) + margin], dtype = float))
+    
+    
+    ###
+    # Check a point against the shields, constant time lookup in the mask of the shield sprites
+    def isInsideShields(self, position: np.ndarray) -> bool:
+        if self.shieldCollision is None:
+            ellipse = self.getShieldEllipse()
+            return(bool(((position[0] - ellipse[0]) / ellipse[2])**2 + ((position[1] - ellipse[1]) / ellipse[3])**2 <= 1))
+        
+        x, y = int(position[0]) - self.shipSprites['Shield1'].rect.x, int(position[1]) - self.shipSprites['Shield1'].rect.y
+        width, height = self.shieldCollision['Mask'].get_size()
+        if not ((0 <= x < width) and (0 <= y < height)):
+            return(False)
+        
+        return(bool(self.shieldCollision['Mask'].get_at((x, y))))
+
+
     ###
     # Update a room do be drawn
     def updateRoom(self, roomKey: int) -> None:
@@ -821,55 +1003,77 @@ class baseShip(object):
 
 
     ###
-    # Function to update the oxygen in the rooms, dt is the time update step in milliseconds
-    def updateOxygen(self, dt: int) -> None:
-        allRoomKeys = list(self.presentRooms)
+    # Update several doors to be drawn
+    def updateDoors(self, doorKeys: list) -> None:
+        ##
+        # Collect the changed doors, their rooms and all doors of those rooms, otherwise those doors will be overdrawn
+        updateRoomKeys = set()
+        updateDoorKeys = set(doorKeys)
+        for doorKey in doorKeys:
+            for roomKey in self.doorRooms[doorKey]:
+                if roomKey: # Don't update space
+                    updateRoomKeys.add(roomKey)
+                    updateDoorKeys.update(self.roomDoors[roomKey])
         
-        # Get list of old oxygen values, list of rooms with space
-        oxygenOld = dict()
-        oxygenRoomConnected = dict()
         
-        for roomKey in allRoomKeys:
-            oxygenOld[roomKey] = self.rooms[roomKey].oxygen
-            
-            if self.roomConnectionsOpen is not None:
-                selectionRooms = self.roomConnectionsOpen[np.any(self.roomConnectionsOpen == roomKey, axis = 1),]
-                if selectionRooms.shape[0]:
-                    oxygenRoomConnected[roomKey] = list(selectionRooms[selectionRooms != roomKey])
-                
-                else:
-                    oxygenRoomConnected[roomKey] = list()
-            else:
-                oxygenRoomConnected[roomKey] = list()
+        ##
+        # Update every element once
+        for roomKey in updateRoomKeys:
+            self.activeSprites['Rooms'][roomKey]['Sprite'] = self.rooms[roomKey].currentSprite
+            self.activeSprites['Rooms'][roomKey]['Draw'] = True
         
-        # Create new list of oxygen values
+        for doorKey in updateDoorKeys:
+            self.activeSprites['Doors'][doorKey]['Sprite'] = self.doors[doorKey].currentSprite
+            self.activeSprites['Doors'][doorKey]['Draw'] = True
+
+
+    ###
+    # Function to update the oxygen in the rooms, dt is the time update step in milliseconds
+    def updateOxygen(self, dt: int) -> None:
+        # Refill by the oxygen system and general loss
         if 'Oxygen' in self.systems.keys():
             oxygenLevel = self.systems['Oxygen']['PowerCurrent']
         else:
             oxygenLevel = 0
-            
-        oxygenNew = dict()
-        for roomKey in allRoomKeys:
-            newValue = oxygenOld[roomKey] + (oxygenLevel * self.parameters['General']['OxygenLevel1'] - self.parameters['General']['OxygenLossGeneral']) * dt / 1000
-            
-            for roomKeyAdjacent in oxygenRoomConnected[roomKey]:
-                if roomKeyAdjacent:
-                    newValue += min(max((oxygenOld[roomKeyAdjacent] - oxygenOld[roomKey]) * 15, -30), 30) * self.parameters['General']['OxygenEquilibriumSpeed'] * dt / 1000
-                else:   # Space door
-                    newValue -= self.parameters['General']['OxygenLossSpace'] * dt / 1000
-            
-            # Limits
-            newValue = max(min(newValue, 100), 0)
-            
-            oxygenNew[roomKey] = newValue
         
-        # Set the new values and check if the room needs to be redrawn
-        for roomKey in allRoomKeys:
-            self.rooms[roomKey].oxygen = oxygenNew[roomKey]
+        oxygenRate = oxygenLevel * self.parameters['General']['OxygenLevel1'] - self.parameters['General']['OxygenLossGeneral']
+        
+        # Nothing changes while all rooms are full, refilled and closed to space, or while all rooms are empty and not refilled
+        self.oxygenChanged = False
+        
+        if (oxygenRate >= 0) and not self.oxygenSpaceOpen and not self.breachedRooms and (self.oxygenLevels.min() >= 100):
+            return
+        
+        if (oxygenRate <= 0) and (self.oxygenLevels.max() <= 0):
+            return
+        
+        self.oxygenChanged = True
+        
+        oxygenOld = self.oxygenLevels.copy()
+        oxygenNew = oxygenOld + oxygenRate * dt / 1000
+        
+        # Exchange between rooms connected by open doors, summed up for every room
+        if self.oxygenConnections.shape[1]:
+            oxygenFlow = np.clip((oxygenOld[self.oxygenConnections[1]] - oxygenOld[self.oxygenConnections[0]]) * 15, -30, 30) * self.parameters['General']['OxygenEquilibriumSpeed'] * dt / 1000
+            oxygenNew += np.bincount(self.oxygenConnections[0], weights = oxygenFlow, minlength = oxygenNew.shape[0])
+        
+        # Loss through open doors to space and hull breaches
+        oxygenNew -= self.oxygenSpaceConnections * self.parameters['General']['OxygenLossSpace'] * dt / 1000
+        
+        if self.breachedRooms:
+            oxygenNew -= self.oxygenBreaches * self.parameters['General']['OxygenLossBreach'] * dt / 1000
+        
+        # Limits
+        np.clip(oxygenNew, 0, 100, out = oxygenNew)
+        
+        # Set the new values (in place, the vector is shared with the rooms) and redraw the rooms whose oxygen sprite changes
+        self.oxygenLevels[:] = oxygenNew
+        
+        for index in np.nonzero((oxygenOld // 5) != (oxygenNew // 5))[0]:
+            roomKey = self.presentRooms[index]
             
-            if (oxygenOld[roomKey] // 5) != (oxygenNew[roomKey] // 5):  # If the room needs to be updated
-                self.rooms[roomKey].selectSprite()
-                self.updateRoom(roomKey)  
+            self.rooms[roomKey].selectSprite()
+            self.updateRoom(roomKey)
 
 
     ###
@@ -888,7 +1092,88 @@ class baseShip(object):
         ###
         # Apply system damage if applicable
         if roomKey in self.roomsWithSystems:
-            raise NotImplementedError
+            system = self.systemsPresentRoomMapping[roomKey]
+            
+            # A system can't be damaged more than its maximum power
+            self.systems[system]['Damaged'] = min(self.systems[system]['Damaged'] + damageSystem, self.systems[system]['PowerMax'])
+            self.systems[system]['Destroyed'] = bool(self.systems[system]['Damaged'] >= self.systems[system]['PowerMax'])
+            
+            ##
+            # Remove the power which exceeds the undamaged capacity
+            powerToBeRemoved = max(self.systems[system]['PowerCurrent'] - (self.systems[system]['PowerMax'] - self.systems[system]['Damaged']), 0)
+            if powerToBeRemoved:
+                # Subsystems don't draw reactor power, so only main systems return it. The backup battery gets its power back first
+                if system in self.parameters['General']['MainSystems']:
+                    powerToBackupBattery = min(self.systems[system]['PowerBackup'], powerToBeRemoved)
+                    powerToReactor = powerToBeRemoved - powerToBackupBattery
+                    
+                    self.systems[system]['PowerBackup'] -= powerToBackupBattery
+                    
+                    # Add the power to the reactor
+                    self.reactor['PowerAvailable'] += powerToReactor
+                    self.reactor['BackupPowerAvailable'] += powerToBackupBattery
+                
+                # Substract the power from the system
+                self.systems[system]['PowerCurrent'] -= powerToBeRemoved
+            
+            ##
+            # Show the damage in the room
+            if self.systems[system]['Destroyed']:
+                self.rooms[roomKey].status = 2
+            elif self.systems[system]['Damaged']:
+                self.rooms[roomKey].status = 1
+            
+            self.rooms[roomKey].selectSprite()
+            self.updateRoom(roomKey)
+            
+            # Fewer shield layers
+            if system == 'Shields':
+                self.setCurrentMaxShieldSprite()
+    
+    
+    ###
+    # Add a hull breach to a room
+    def addBreach(self, roomKey: int) -> None:
+        logger.info('Hull breach in room {roomKey} of the {ship}'.format(roomKey = str(roomKey), ship = 'player ship' if self.playerShip else 'enemy ship'))
+        
+        self.oxygenBreaches[self.oxygenRoomIndex[roomKey]] += 1
+        self.breachedRooms.add(roomKey)
+    
+    
+    ###
+    # Add a fire to a room
+    def addFire(self, roomKey: int) -> None:
+        logger.info('Fire in room {roomKey} of the {ship}'.format(roomKey = str(roomKey), ship = 'player ship' if self.playerShip else 'enemy ship'))
+        
+        self.state.roomFires[self.state.roomIndex[roomKey]] += 1
+    
+    
+    ###
+    # Copy of the state of all rooms and doors
+    def getStateSnapshot(self) -> np.ndarray:
+        return(self.state.snapshot())
+    
+    
+    ###
+    # Set the state of all rooms and doors from a snapshot
+    def restoreState(self, snapshot: np.ndarray) -> None:
+        logger.debug('Restore the state of the rooms and doors')
+        
+        self.state.restore(snapshot)
+        
+        ##
+        # Update everything derived from the state
+        self.breachedRooms = set(self.presentRooms[np.nonzero(self.oxygenBreaches)[0]])
+        self.updateRoomConnectivityOpenDoors()
+        
+        for room in self.rooms.values():
+            room.selectSprite()
+        
+        for door in self.doors.values():
+            door.selectSprite()
+        
+        for roomKey in self.rooms.keys():
+            self.updateRoom(roomKey)
     
     
     ###
@@ -52,6 +52,7 @@ class enemyShip(baseShip.baseShip):
         
         - playerShip: Logical to differentiate between the player and the enemy ship
         - battle: Logical to indicate whether the ship is in battle or not
+        - headless: Logical to indicate whether the ship is only simulated without images
     
     """
 
@@ -71,6 +72,9 @@ class enemyShip(baseShip.baseShip):
         self.ship = ship
         self.variant = variant
         
+        # The sprites of the ship are acquired during the setup
+        self.spritesAcquired = False
+        
         # Box selection
         self.enemyBoxType = enemyBoxType
         
@@ -85,6 +89,9 @@ class enemyShip(baseShip.baseShip):
         # Battle position
         self.battle = True
         
+        # Displayed ship
+        self.headless = False
+        
         # Ship hostile or not
         self.hostile = hostile
 
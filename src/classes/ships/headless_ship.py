@@ -0,0 +1,117 @@
+###
+#
+# Define a class for ships which are only simulated, based on the class for all ships
+#
+###
+
+
+###
+# Load packages
+
+# Logging
+import logging
+
+# Typing
+from typing import Dict
+
+# Pygame
+import pygame
+
+
+###
+# Load ressources
+import src.classes.ships.base_ship as baseShip
+
+
+###
+# Setup logging
+logger = logging.getLogger(__name__)
+
+
+###
+# Define the class for the headless ship
+class headlessShip(baseShip.baseShip):
+    """
+    
+    Class for a ship which is constructed from the parameters alone, without any loaded sprites or a display.
+    Systems, reactor, rooms, doors and oxygen behave like on the displayed ships, but no images are loaded, selected or drawn.
+    As for the other ships, variables can still be set after initialization. After this, the ship will be finally constructed using the inherited shipSetup() method.
+    
+    Initialization:
+        - parameters [Dict]: All loaded parameters
+        - ship [str]: Selected ship
+        - variant [str]: Selected ship variant
+        - playerShip [bool]: Whether the ship is taken from the player or the enemy ship parameters
+    
+    
+    Fields:
+        - parameters: Reference to all parameters
+        - spritesAll: Always None
+        
+        - ship: Ship selection
+        - variant: Ship variant selection
+        
+        - playerShip: Logical to differentiate between the player and the enemy ship
+        - battle: Logical to indicate whether the ship is in battle or not, always True
+        - headless: Logical to indicate whether the ship is only simulated without images, always True
+    
+    """
+    
+    
+    ###
+    # Initialization
+    def __init__(self, parameters: Dict, ship: str = 'Kestrel', variant: str = 'A', playerShip: bool = True) -> None:
+        logger.debug('Initialize the headless {} ship object'.format('player' if playerShip else 'enemy'))
+        
+        ###
+        # Save parameters, there are no sprites
+        self.parameters = parameters
+        self.spritesAll = None
+        
+        ###
+        # Ship selection
+        self.ship = ship
+        self.variant = variant
+        
+        # The sprites of the ship are acquired during the setup
+        self.spritesAcquired = False
+        
+        ###
+        # Distinct player and enemy ship
+        self.playerShip = playerShip
+        
+        ###
+        # Simulated ships are always in battle and never displayed
+        self.battle = True
+        self.headless = True
+    
+    
+    ###
+    # Only an empty base sprite is needed as origin of the room coordinates
+    def loadShipAndShieldsSprites(self) -> None:
+        logger.debug('Set the empty ship sprite for the headless ship {ship}-{variant}'.format(ship = self.ship, variant = self.variant))
+        
+        self.shipSprites = dict()
+        
+        self.shipSprites['Base'] = pygame.sprite.Sprite()
+        self.shipSprites['Base'].rect = pygame.Rect(0, 0, 0, 0)
+        
+        # The shields are put around the rooms
+        self.shieldCollision = None
+    
+    
+    ###
+    # Doors can't be clicked
+    def updateDoorRects(self) -> None:
+        pass
+    
+    
+    ###
+    # Only the shield strength is needed
+    def setCurrentMaxShieldSprite(self) -> None:
+        if 'Shields' in self.systemsPresent:
+            self.currentMaxShieldStrength = self.systems['Shields']['PowerCurrent'] // 2
+        else:
+            self.currentMaxShieldStrength = 0
+        
+        self.activeSprites['Shields'] = None
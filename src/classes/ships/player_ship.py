@@ -55,6 +55,7 @@ class playerShip(baseShip.baseShip):
         
         - playerShip: Logical to differentiate between the player and the enemy ship
         - battle: Logical to indicate whether the ship is in battle or not
+        - headless: Logical to indicate whether the ship is only simulated without images
     
     """
     
@@ -74,6 +75,9 @@ class playerShip(baseShip.baseShip):
         self.ship = ship
         self.variant = variant
         
+        # The sprites of the ship are acquired during the setup
+        self.spritesAcquired = False
+        
         ###
         # Distinct player and enemy ship
         self.playerShip = True
@@ -81,6 +85,9 @@ class playerShip(baseShip.baseShip):
         ###
         # Initialize as not in battle
         self.battle = False
+        
+        # Displayed ship
+        self.headless = False
                 
         
     ###
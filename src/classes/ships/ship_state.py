@@ -0,0 +1,112 @@
+###
+#
+# Define a class which keeps the state of all rooms and doors of a ship in arrays
+#
+###
+
+
+###
+# Load packages
+
+# Logging
+import logging
+
+# Typing
+from typing import Dict
+
+# Arrays and matrices
+import numpy as np
+
+
+###
+# Setup logging
+logger = logging.getLogger(__name__)
+
+
+###
+# Attributes kept for every room and every door, in the order of the rows of the arrays
+roomAttributes = ['Oxygen', 'Status', 'Visible', 'Hacked', 'Breaches', 'Fires']
+doorAttributes = ['Position', 'Level', 'Hacked', 'Bashed']
+
+
+###
+# Define the ship state class
+class shipState(object):
+    """
+    
+    State of the rooms and doors of a ship as struct of arrays. Rooms and doors get dense indices in the order of the given keys, every attribute is a contiguous row of the room or door array.
+    Both arrays are views into a single vector, so a snapshot of the whole state is one array copy. All values are stored as floats, integer and logical attributes are converted by the room and door objects reading them.
+    The room and door objects keep reading and writing their attributes (e.g. room.oxygen, door.currentPosition) from here, so they stay the dictionary views of the state used by the rest of the code.
+    
+    Init:
+        - roomKeys [np.array]: Keys of the rooms in the order of their indices
+        - doorKeys [np.array]: Keys of the doors in the order of their indices
+    
+    Fields:
+        - roomKeys [np.array]: Keys of the rooms in the order of their indices
+        - doorKeys [np.array]: Keys of the doors in the order of their indices
+        - roomIndex [Dict]: Mapping roomKey:index
+        - doorIndex [Dict]: Mapping doorKey:index
+        - data [np.array]: Vector holding all values
+        - rooms [np.array]: Room values, one row per attribute in roomAttributes (view into data)
+        - doors [np.array]: Door values, one row per attribute in doorAttributes (view into data)
+        - roomOxygen, roomStatus, roomVisible, roomHacked, roomBreaches, roomFires [np.array]: Rows of the room array
+        - doorPosition, doorLevel, doorHacked, doorBashed [np.array]: Rows of the door array
+    
+    Methods:
+        - snapshot(): Returns a copy of all values
+        - restore(snapshot [np.array]): Set all values from a snapshot
+        - getRoomValues(attribute [str]): Returns the values of a room attribute as dictionary roomKey:value
+        - getDoorValues(attribute [str]): Returns the values of a door attribute as dictionary doorKey:value
+    
+    """
+    
+    
+    ###
+    # Initialization
+    def __init__(self, roomKeys: np.ndarray, doorKeys: np.ndarray) -> None:
+        self.roomKeys = np.array(roomKeys)
+        self.doorKeys = np.array(doorKeys)
+        
+        self.roomIndex = {roomKey: index for index, roomKey in enumerate(self.roomKeys)}
+        self.doorIndex = {doorKey: index for index, doorKey in enumerate(self.doorKeys)}
+        
+        
+        ###
+        # One vector for everything, the room and door arrays are views into it
+        roomValues = len(roomAttributes) * len(self.roomKeys)
+        doorValues = len(doorAttributes) * len(self.doorKeys)
+        
+        self.data = np.zeros(roomValues + doorValues)
+        self.rooms = self.data[:roomValues].reshape(len(roomAttributes), len(self.roomKeys))
+        self.doors = self.data[roomValues:].reshape(len(doorAttributes), len(self.doorKeys))
+        
+        
+        ##
+        # Rows of the attributes
+        self.roomOxygen, self.roomStatus, self.roomVisible, self.roomHacked, self.roomBreaches, self.roomFires = self.rooms
+        self.doorPosition, self.doorLevel, self.doorHacked, self.doorBashed = self.doors
+    
+    
+    ###
+    # Copy of the whole state
+    def snapshot(self) -> np.ndarray:
+        return(self.data.copy())
+    
+    
+    ###
+    # Set the whole state, in place so all views stay valid
+    def restore(self, snapshot: np.ndarray) -> None:
+        self.data[:] = snapshot
+    
+    
+    ###
+    # Attribute values as dictionaries
+    def getRoomValues(self, attribute: str) -> Dict:
+        values = self.rooms[roomAttributes.index(attribute)]
+        return({roomKey: values[index] for roomKey, index in self.roomIndex.items()})
+    
+    
+    def getDoorValues(self, attribute: str) -> Dict:
+        values = self.doors[doorAttributes.index(attribute)]
+        return({doorKey: values[index] for doorKey, index in self.doorIndex.items()})
@@ -12,7 +12,7 @@
 import logging
 
 # Typing
-from typing import Dict
+from typing import Dict, List, Tuple
 
 # Arrays
 import numpy as np
@@ -23,7 +23,10 @@ import pygame
 
 ###
 # Import ressources
-from src.misc.helperfunctions import copySprite
+from src.misc.helperfunctions import copySprite, createShieldCollision, scaleShieldCollision
+
+# Loading of the sprites per ship
+import src.classes.sprites.ship_sprite_registry as shipSpriteRegistry
 
 
 ###
@@ -33,98 +36,134 @@ logger = logging.getLogger(__name__)
 
 ###
 # Define the class for the enemy ship images
-class enemyShipSprites(object):
+class enemyShipSprites(shipSpriteRegistry.shipSpriteRegistry):
     """
     
     Load the sprites specific to the enemy ships. These include shields (also Zoltan-shields), cloak, hull, gib-sprites.
+    All enemy ships share one shield image which is stretched per ship. The shields are loaded at once and kept, the cloak, hull and gibs are loaded per ship as sprite group {ship} when a ship using them is set up (see shipSpriteRegistry).
+    The hit geometry of the shields (see createShieldCollision) is created once and scaled to the stretched sizes on request.
     
     Init:
         - parameters [Dict]: Dictionary containing all parameters
+        - spriteCache [None, spriteCache]: Sprite cache used for the shields and the sprite groups
+        - assets [None, assetPipeline]: Asset pipeline decoding the images, a new one is created if None
     
     Fields:
-        - loadedSprites [Dict]: Dictionary containing all the loaded sprites with initial rect fields (-> not shifted)
+        - loadedSprites [Dict]: Dictionary containing the shields and the loaded sprite groups with initial rect fields (-> not shifted)
+        - shieldCollisions [Dict]: Hit geometry of the shields by stretched size
+        - cacheName [str]: Name of the sprite object in the sprite cache
     
     Methods:
-        - loadEnemyShipSprites(parameters [Dict]): Imports all the enemy ship sprites and stores them in the dictionary self.loadedSprites
+        - createShieldSprites(): Returns the shield sprites shared by all enemy ships
+        - getSpriteGroups(ship [str], variant [str]): Returns the keys of the sprite groups used by the ship
+        - getImagePaths(key [str]): Returns the paths of all images of a sprite group
+        - createSpriteGroup(key [str]): Load the images of a sprite group
+        - getShieldCollision(size [Tuple]): Returns the hit geometry of the shields stretched to the given size
     
     """
 
 
     ###
     # Initialization
-    def __init__(self, parameters: Dict) -> None:
+    def __init__(self, parameters: Dict, spriteCache = None, assets = None) -> None:
         logger.debug('Initialize the object holding all the enemy ship images')
         
-        ###
-        # Initialize dictionary
-        self.loadedSprites = dict()
+        super().__init__(parameters, spriteCache, assets)
+        
+        self.cacheName = 'EnemyShip'
+        self.shieldCollisions = dict()
         
         ###
-        # Load sprites for the player ships
-        self.loadEnemyShipSprites(parameters)
+        # Load the shields, the ships are loaded on demand
+        if spriteCache is None:
+            self.loadedSprites.update(self.createShieldSprites())
+        else:
+            self.loadedSprites.update(spriteCache.get('EnemyShip_Shields', self.createShieldSprites, [parameters['EnemyShip']['ShieldPath']]))
 
 
     ###
-    # Funtion to read in all the sprites as defined in the parameters parameters['EnemyShip']
-    def loadEnemyShipSprites(self, parameters: Dict) -> None:
-        logger.debug('Import the enemy ship sprites')
-        
+    # Sprite groups of a ship, enemy ships have no variant specific sprites
+    def getSpriteGroups(self, ship: str, variant: str) -> List:
+        return([ship])
+    
+    
+    ###
+    # Images of a sprite group
+    def getImagePaths(self, key: str) -> List:
         ##
         # ALways the same picture format
         pictureFormat = 'png'
         
+        spritePaths = [self.parameters['EnemyShip'][key]['BaseSprite']] + list(self.parameters['EnemyShip'][key]['GibSprites'])
+        
+        return([self.parameters['EnemyShip'][key]['Cloak']] + ['{basepath}_{spritepath}.{pictureFormat}'.format(basepath = self.parameters['EnemyShip'][key]['Basepath'], spritepath = spritepath, pictureFormat = pictureFormat) for spritepath in spritePaths])
+    
+    
+    ###
+    # Funtion to read in the sprites of a ship as defined in the parameters parameters['EnemyShip']
+    def createSpriteGroup(self, key: str) -> Dict:
+        logger.debug('Import the enemy ship sprites {}'.format(key))
+        
+        sprites = dict()
+        imagePaths = self.getImagePaths(key)
+        
+        # Load cloaking
+        sprites['Cloak'] = pygame.sprite.Sprite()
+        sprites['Cloak'].image = self.loadImage(imagePaths[0])
+        sprites['Cloak'].rect = sprites['Cloak'].image.get_rect()
+        
+        # Load base sprite
+        sprites['Base'] = pygame.sprite.Sprite()
+        sprites['Base'].image = self.loadImage(imagePaths[1])
+        sprites['Base'].rect = sprites['Base'].image.get_rect()
+        
+        # Load gib sprites
+        sprites['Gib'] = list()
+        for gibPath in imagePaths[2:]:
+            sprites['Gib'].append(pygame.sprite.Sprite())
+            sprites['Gib'][-1].image = self.loadImage(gibPath)
+            sprites['Gib'][-1].rect = sprites['Gib'][-1].image.get_rect()
+        
+        return(sprites)
+    
+    
+    ###
+    # Funtion to read in the shields shared by all enemy ships
+    def createShieldSprites(self) -> Dict:
+        logger.debug('Import the enemy ship shields')
+        
+        sprites = dict()
+        
         # Load shields
-        self.loadedSprites['Shields'] = pygame.sprite.Sprite()
-        self.loadedSprites['Shields'].image = pygame.image.load(parameters['EnemyShip']['ShieldPath']).convert_alpha()
-        self.loadedSprites['Shields'].rect = self.loadedSprites['Shields'].image.get_rect()
+        sprites['Shields'] = pygame.sprite.Sprite()
+        sprites['Shields'].image = self.loadImage(self.parameters['EnemyShip']['ShieldPath'])
+        sprites['Shields'].rect = sprites['Shields'].image.get_rect()
+        
         
-        ##
-        # Go through all the avaiable ships
-        for ship in parameters['EnemyShip']['ShipsAvailable']:
-            self.loadedSprites[ship] = dict()
-            
-            # Load cloaking
-            self.loadedSprites[ship]['Cloak'] = pygame.sprite.Sprite()
-            self.loadedSprites[ship]['Cloak'].image = pygame.image.load(parameters['EnemyShip'][ship]['Cloak']).convert_alpha()
-            self.loadedSprites[ship]['Cloak'].rect = self.loadedSprites[ship]['Cloak'].image.get_rect()
-            
-            # Load base sprite
-            self.loadedSprites[ship]['Base'] = pygame.sprite.Sprite()
-            self.loadedSprites[ship]['Base'].image = pygame.image.load('{basepath}_{baseSprite}.{pictureFormat}'.format(basepath = parameters['EnemyShip'][ship]['Basepath'], baseSprite = parameters['EnemyShip'][ship]['BaseSprite'], pictureFormat = pictureFormat)).convert_alpha()
-            self.loadedSprites[ship]['Base'].rect = self.loadedSprites[ship]['Base'].image.get_rect()
-            
-            # Load gib sprites
-            self.loadedSprites[ship]['Gib'] = list()
-            for gibStr in parameters['EnemyShip'][ship]['GibSprites']:
-                self.loadedSprites[ship]['Gib'].append(pygame.sprite.Sprite())
-                self.loadedSprites[ship]['Gib'][-1].image = pygame.image.load('{basepath}_{gibStr}.{pictureFormat}'.format(basepath = parameters['EnemyShip'][ship]['Basepath'], gibStr = gibStr, pictureFormat = pictureFormat)).convert_alpha()
-                self.loadedSprites[ship]['Gib'][-1].rect = self.loadedSprites[ship]['Gib'][-1].image.get_rect()
-            
-            
         ##
         # Create the different shield levels as well as Zoltan shields
-        self.loadedSprites['ShieldsLevel' + str(parameters['General']['ShieldMaxLevel'])] = copySprite(self.loadedSprites['Shields'])
+        sprites['ShieldsLevel' + str(self.parameters['General']['ShieldMaxLevel'])] = copySprite(sprites['Shields'])
 
         # For the alpha-multiplication
-        alphaImg = pygame.Surface(self.loadedSprites['ShieldsLevel' + str(parameters['General']['ShieldMaxLevel'])].rect.size, pygame.SRCALPHA)
-        alphaImg.fill((255, 255, 255, parameters['General']['ShieldMultAlpha']))
+        alphaImg = pygame.Surface(sprites['ShieldsLevel' + str(self.parameters['General']['ShieldMaxLevel'])].rect.size, pygame.SRCALPHA)
+        alphaImg.fill((255, 255, 255, self.parameters['General']['ShieldMultAlpha']))
 
-        for level in reversed(range(1, parameters['General']['ShieldMaxLevel'])):
-            self.loadedSprites['ShieldsLevel' + str(level)] = pygame.sprite.Sprite()
+        for level in reversed(range(1, self.parameters['General']['ShieldMaxLevel'])):
+            sprites['ShieldsLevel' + str(level)] = pygame.sprite.Sprite()
             
             # Sprites aufhellen
-            self.loadedSprites['ShieldsLevel' + str(level)].image = self.loadedSprites['ShieldsLevel' + str(level + 1)].image.copy()
-            self.loadedSprites['ShieldsLevel' + str(level)].image.blit(alphaImg, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+            sprites['ShieldsLevel' + str(level)].image = sprites['ShieldsLevel' + str(level + 1)].image.copy()
+            sprites['ShieldsLevel' + str(level)].image.blit(alphaImg, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
             
-            self.loadedSprites['ShieldsLevel' + str(level)].rect = self.loadedSprites['ShieldsLevel' + str(parameters['General']['ShieldMaxLevel'])].rect
+            sprites['ShieldsLevel' + str(level)].rect = sprites['ShieldsLevel' + str(self.parameters['General']['ShieldMaxLevel'])].rect
 
         # Generate the Zoltan shield
-        self.loadedSprites['ZoltanShield'] = pygame.sprite.Sprite()
-        self.loadedSprites['ZoltanShield'].image = self.loadedSprites['ShieldsLevel' + str(parameters['General']['ShieldMaxLevel'])].image.copy()
-        self.loadedSprites['ZoltanShield'].rect = self.loadedSprites['ShieldsLevel' + str(parameters['General']['ShieldMaxLevel'])].rect
+        sprites['ZoltanShield'] = pygame.sprite.Sprite()
+        sprites['ZoltanShield'].image = sprites['ShieldsLevel' + str(self.parameters['General']['ShieldMaxLevel'])].image.copy()
+        sprites['ZoltanShield'].rect = sprites['ShieldsLevel' + str(self.parameters['General']['ShieldMaxLevel'])].rect
 
         # Swap blue and green and adapt the colors
-        pixelImage = pygame.surfarray.pixels3d(self.loadedSprites['ZoltanShield'].image)
+        pixelImage = pygame.surfarray.pixels3d(sprites['ZoltanShield'].image)
         blueOld = pixelImage[:,:,2].copy()
         greenOld = pixelImage[:,:,1].copy()
         pixelImage[:,:,0] = np.round(pixelImage[:,:,0] / 1.1).astype(int)
@@ -132,6 +171,24 @@ class enemyShipSprites(object):
         pixelImage[:,:,2] = np.round(greenOld / 1.8).astype(int)
         
         del pixelImage
+        
+        
+        ##
+        # Hit geometry of the shields
+        sprites['ShieldCollision'] = createShieldCollision(sprites['Shields'].image)
+        
+        return(sprites)
+    
+    
+    ###
+    # Hit geometry of the stretched shields, shared by all ships with the same shield size
+    def getShieldCollision(self, size: Tuple) -> Dict:
+        size = tuple(int(value) for value in size)
+        
+        if size not in self.shieldCollisions:
+            self.shieldCollisions[size] = scaleShieldCollision(self.loadedSprites['ShieldCollision'], size)
+        
+        return(self.shieldCollisions[size])
 
 
 
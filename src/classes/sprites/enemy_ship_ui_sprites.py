@@ -12,7 +12,7 @@
 import logging
 
 # Typing
-from typing import Dict
+from typing import Dict, List
 
 # Pygame
 import pygame
@@ -95,7 +95,18 @@ class enemyShipUiSprites(object):
     # Function to return the rect information
     def rectFromBattleBox(self, box: str) -> pygame.Rect:
         return(self.boxSprites[box].rect)
-        
 
 
+###
+# Functions
 
+##
+# Paths of all images loaded by enemyShipUiSprites
+def getImagePaths(parameters: Dict) -> List:
+    """
+    
+    Returns the paths of all images loaded by enemyShipUiSprites, so they can be requested from the asset pipeline before the sprites are created.
+    
+    """
+    
+    return(['{basepath}{image}.png'.format(basepath = parameters['EnemyShipUi']['Box']['Basepath'], image = parameters['EnemyShipUi']['Box'][image]) for image in ['BoxEnemy', 'BoxEnemyMask', 'BoxBoss', 'BoxBossMask']])
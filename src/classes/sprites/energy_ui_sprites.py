@@ -12,7 +12,7 @@
 import logging
 
 # Typing
-from typing import Dict
+from typing import Dict, List
 
 # Pygame
 import pygame
@@ -304,53 +304,18 @@ class energyUiSprites(object):
         self.bars['ShortBackup'].image.set_colorkey(parameters['Colors']['White'])
         self.bars['ShortBackup'].image = self.bars['ShortBackup'].image.convert_alpha()
         self.bars['ShortBackup'].rect = self.bars['ShortBackup'].image.get_rect()
-        
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
 
 
+###
+# Functions
 
+##
+# Paths of all images loaded by energyUiSprites
+def getImagePaths(parameters: Dict) -> List:
+    """
+    
+    Returns the paths of all images loaded by energyUiSprites, so they can be requested from the asset pipeline before the sprites are created.
+    
+    """
+    
+    return(['{basepath}{wires}.png'.format(basepath = parameters['EnergyManagementUi']['Wires']['Basepath'], wires = parameters['EnergyManagementUi']['Wires'][fig]) for fig in ['shortPath', 'shortEndPath', 'widePath', 'wideEndPath', 'UnderWeapons3', 'UnderWeapons4', 'ReactorFull']])
@@ -12,7 +12,7 @@
 import logging
 
 # Typing
-from typing import Dict
+from typing import Dict, List
 
 # Pygame
 import pygame
@@ -220,20 +220,47 @@ class generalShipSprites(object):
             del bildPixel
 
 
+###
+# Functions
 
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+##
+# Paths of all images loaded by generalShipSprites
+def getImagePaths(parameters: Dict) -> List:
+    """
+    
+    Returns the paths of all images loaded by generalShipSprites, so they can be requested from the asset pipeline before the sprites are created.
+    
+    """
+    
+    imagePaths = list()
+    
+    ##
+    # Rooms
+    roomPaths = parameters['GeneralShipSprites']['RoomSprites']['Paths']
+    for system in roomPaths.keys():
+        if system == 'Basepath':    # Not a system
+            continue
+        
+        if system == 'CrewTeleporter':
+            spritePaths = [roomPaths[system]['Room']]
+        elif system == 'Clonebay':
+            spritePaths = list(roomPaths[system]['Room'])
+        else:
+            spritePaths = list(roomPaths[system]['Room4']) + list(roomPaths[system]['Room2'])
+        
+        imagePaths += ['{basepath}{spritePath}'.format(basepath = roomPaths['Basepath'], spritePath = spritePath) for spritePath in spritePaths]
+    
+    ##
+    # Symbols
+    symbolSprites = parameters['GeneralShipSprites']['SymbolSprites']
+    for system in symbolSprites['Paths'].keys():
+        for spriteName in symbolSprites['SpriteSuffix'].keys():
+            imagePaths.append('{basepath}{spritePrefix}{system}{spriteSuffix}.png'.format(basepath = symbolSprites['Basepath'], spritePrefix = symbolSprites['SpritePrefix'], system = symbolSprites['Paths'][system], spriteSuffix = symbolSprites['SpriteSuffix'][spriteName]))
+    
+    ##
+    # Consoles
+    consoleSprites = parameters['GeneralShipSprites']['ConsoleSprites']
+    imagePaths.append('{basepath}{console}'.format(basepath = consoleSprites['Basepath'], console = consoleSprites['Console']))
+    imagePaths += ['{basepath}{console}'.format(basepath = consoleSprites['Basepath'], console = console) for console in list(consoleSprites['ConsoleSystems'].values()) + list(consoleSprites['ConsolePilot'].values())]
+    
+    return(imagePaths)
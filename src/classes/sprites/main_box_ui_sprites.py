@@ -12,7 +12,7 @@
 import logging
 
 # Typing
-from typing import Dict
+from typing import Dict, List
 
 ## Arrays
 #import numpy as np
@@ -74,28 +74,18 @@ class mainBoxUiSprites(object):
             self.loadedSprites[spriteName] = pygame.sprite.Sprite()
             self.loadedSprites[spriteName].image = pygame.image.load('{base}{path}{pictureFormat}'.format(base = parameters['MainBoxUi']['Pause']['Basepath'], path = parameters['MainBoxUi']['Pause'][spriteName], pictureFormat = pictureFormat)).convert_alpha()
             self.loadedSprites[spriteName].rect = self.loadedSprites[spriteName].image.get_rect()
-                    
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
 
 
+###
+# Functions
 
+##
+# Paths of all images loaded by mainBoxUiSprites
+def getImagePaths(parameters: Dict) -> List:
+    """
+    
+    Returns the paths of all images loaded by mainBoxUiSprites, so they can be requested from the asset pipeline before the sprites are created.
+    
+    """
+    
+    return(['{base}{path}.png'.format(base = parameters['MainBoxUi']['Pause']['Basepath'], path = parameters['MainBoxUi']['Pause'][spriteName]) for spriteName in ['GeneralPause1', 'GeneralPause2']])
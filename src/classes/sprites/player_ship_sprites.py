@@ -12,7 +12,7 @@
 import logging
 
 # Typing
-from typing import Dict
+from typing import Dict, List
 
 # Arrays
 import numpy as np
@@ -23,7 +23,10 @@ import pygame
 
 ###
 # Import ressources
-from src.misc.helperfunctions import copySprite
+from src.misc.helperfunctions import copySprite, createShieldCollision
+
+# Loading of the sprites per ship
+import src.classes.sprites.ship_sprite_registry as shipSpriteRegistry
 
 
 ###
@@ -33,118 +36,149 @@ logger = logging.getLogger(__name__)
 
 ###
 # Define the class for the player ship images
-class playerShipSprites(object):
+class playerShipSprites(shipSpriteRegistry.shipSpriteRegistry):
     """
     
     Load the sprites specific to the player ships. These include shields (also Zoltan-shields), cloak, hull, gib-sprites.
+    The sprites are loaded per ship when a ship using them is set up (see shipSpriteRegistry). The sprite group {ship} holds the shields and the cloak shared by all variants, the sprite group {ship}{variant} the hull and the gibs of a variant.
+    The hit geometry of the shields (see createShieldCollision) is created once per ship and stored as ShieldCollision, all shield levels share the same shape.
     
     Init:
         - parameters [Dict]: Dictionary containing all parameters
+        - spriteCache [None, spriteCache]: Sprite cache used for the sprite groups
+        - assets [None, assetPipeline]: Asset pipeline decoding the images, a new one is created if None
     
     Fields:
-        - loadedSprites [Dict]: Dictionary containing all the loaded sprites with initial rect fields (-> not shifted)
+        - loadedSprites [Dict]: Dictionary containing the loaded sprite groups with initial rect fields (-> not shifted)
+        - spriteGroups [Dict]: Ship and variant (None for the sprite group shared by all variants) of every sprite group by key
+        - cacheName [str]: Name of the sprite object in the sprite cache
     
     Methods:
-        - loadPlayerShipSprites(parameters [Dict]): Imports all the player ship sprites and stores them in the dictionary self.loadedSprites
+        - getSpriteGroups(ship [str], variant [str]): Returns the keys of the sprite groups used by the ship
+        - getImagePaths(key [str]): Returns the paths of all images of a sprite group
+        - createSpriteGroup(key [str]): Load the images of a sprite group and create the derived sprites
     
     """
     
     ###
     # Initialization
-    def __init__(self, parameters: Dict) -> None:
+    def __init__(self, parameters: Dict, spriteCache = None, assets = None) -> None:
         logger.debug('Initialize the object holding all the player ship images')
         
-        ###
-        # Initalize dictionary for the loaded sprites
-        self.loadedSprites = dict()
+        super().__init__(parameters, spriteCache, assets)
+        
+        self.cacheName = 'PlayerShip'
         
         ###
-        # Load sprites for the player ships
-        self.loadPlayerShipSprites(parameters)
+        # Sprite groups of all available ships, nothing is loaded yet
+        self.spriteGroups = dict()
+        for ship in parameters['PlayerShip']['ShipsAvailable']:
+            self.spriteGroups[ship] = (ship, None)
+            
+            for variant in parameters['PlayerShip'][ship]['Variants']:
+                self.spriteGroups[ship + variant] = (ship, variant)
     
     
     ###
-    # Funtion to read in all the sprites as defined in the parameters parameters['PlayerShip']
-    def loadPlayerShipSprites(self, parameters: Dict) -> None:
-        logger.debug('Import the player ship sprites')
+    # Sprite groups of a ship
+    def getSpriteGroups(self, ship: str, variant: str) -> List:
+        return([ship, ship + variant])
+    
+    
+    ###
+    # Images of a sprite group
+    def getImagePaths(self, key: str) -> List:
+        ship, variant = self.spriteGroups[key]
         
         ###
         # The image format is always png
         pictureFormat = 'png'
-
-        for ship in parameters['PlayerShip']['ShipsAvailable']:
-            ###
-            # Initialize dictionary
-            self.loadedSprites[ship] = dict()
-            
-            ###
-            # Load sprites present for all variants
-            
-            # Load shields
-            self.loadedSprites[ship]['Shields'] = pygame.sprite.Sprite()
-            self.loadedSprites[ship]['Shields'].image = pygame.image.load('{basepath}_{shieldspath}.{pictureFormat}'.format(basepath = parameters['PlayerShip'][ship]['Basepath'], shieldspath = parameters['PlayerShip'][ship]['Shields'], pictureFormat = pictureFormat)).convert_alpha()
-            self.loadedSprites[ship]['Shields'].rect = self.loadedSprites[ship]['Shields'].image.get_rect()
-            
-            # Load cloaking
-            self.loadedSprites[ship]['Cloak'] = pygame.sprite.Sprite()
-            self.loadedSprites[ship]['Cloak'].image = pygame.image.load('{basepath}_{cloakpath}.{pictureFormat}'.format(basepath = parameters['PlayerShip'][ship]['Basepath'], cloakpath = parameters['PlayerShip'][ship]['Cloak'], pictureFormat = pictureFormat)).convert_alpha()
-            self.loadedSprites[ship]['Cloak'].rect = self.loadedSprites[ship]['Cloak'].image.get_rect()
-            
-            ###
-            # Load variant specific sprites
-            for variant in parameters['PlayerShip'][ship]['Variants']:
-                # Load sprites for any specific variant
-                self.loadedSprites[ship + variant] = dict()
-                
-                # Load base sprite
-                self.loadedSprites[ship + variant]['Base'] = pygame.sprite.Sprite()
-                self.loadedSprites[ship + variant]['Base'].image = pygame.image.load('{basepath}_{basesprite}.{pictureFormat}'.format(basepath = parameters['PlayerShip'][ship]['Basepath'], basesprite = parameters['PlayerShip'][ship + variant]['BaseSprite'], pictureFormat = pictureFormat)).convert_alpha()
-                self.loadedSprites[ship + variant]['Base'].rect = self.loadedSprites[ship + variant]['Base'].image.get_rect()
-                
-                # Load gib sprites
-                self.loadedSprites[ship + variant]['Gib'] = list()
-                for gibStr in parameters['PlayerShip'][ship + variant]['GibSprites']:
-                    self.loadedSprites[ship + variant]['Gib'].append(pygame.sprite.Sprite())
-                    self.loadedSprites[ship + variant]['Gib'][-1].image = pygame.image.load('{basepath}_{gibStr}.{pictureFormat}'.format(basepath = parameters['PlayerShip'][ship]['Basepath'], gibStr = gibStr, pictureFormat = pictureFormat)).convert_alpha()
-                    self.loadedSprites[ship + variant]['Gib'][-1].rect = self.loadedSprites[ship + variant]['Gib'][-1].image.get_rect()
-            
-            
-            ##
-            # Create the different shield levels as well as Zoltan shields
-            self.loadedSprites[ship]['ShieldsLevel' + str(parameters['General']['ShieldMaxLevel'])] = copySprite(self.loadedSprites[ship]['Shields'])
-
-            # For the alpha-multiplication
-            alphaImg = pygame.Surface(self.loadedSprites[ship]['ShieldsLevel' + str(parameters['General']['ShieldMaxLevel'])].rect.size, pygame.SRCALPHA)
-            alphaImg.fill((255, 255, 255, parameters['General']['ShieldMultAlpha']))
-
-            for level in reversed(range(1, parameters['General']['ShieldMaxLevel'])):
-                self.loadedSprites[ship]['ShieldsLevel' + str(level)] = pygame.sprite.Sprite()
-                
-                # Sprites aufhellen
-                self.loadedSprites[ship]['ShieldsLevel' + str(level)].image = self.loadedSprites[ship]['ShieldsLevel' + str(level + 1)].image.copy()
-                self.loadedSprites[ship]['ShieldsLevel' + str(level)].image.blit(alphaImg, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-                
-                self.loadedSprites[ship]['ShieldsLevel' + str(level)].rect = self.loadedSprites[ship]['ShieldsLevel' + str(parameters['General']['ShieldMaxLevel'])].rect
+        
+        if variant is None:
+            return(['{basepath}_{spritepath}.{pictureFormat}'.format(basepath = self.parameters['PlayerShip'][ship]['Basepath'], spritepath = self.parameters['PlayerShip'][ship][sprite], pictureFormat = pictureFormat) for sprite in ['Shields', 'Cloak']])
+        
+        spritePaths = [self.parameters['PlayerShip'][ship + variant]['BaseSprite']] + list(self.parameters['PlayerShip'][ship + variant]['GibSprites'])
+        return(['{basepath}_{spritepath}.{pictureFormat}'.format(basepath = self.parameters['PlayerShip'][ship]['Basepath'], spritepath = spritepath, pictureFormat = pictureFormat) for spritepath in spritePaths])
     
-            # Generate the Zoltan shield
-            self.loadedSprites[ship]['ZoltanShield'] = pygame.sprite.Sprite()
-            self.loadedSprites[ship]['ZoltanShield'].image = self.loadedSprites[ship]['ShieldsLevel' + str(parameters['General']['ShieldMaxLevel'])].image.copy()
-            self.loadedSprites[ship]['ZoltanShield'].rect = self.loadedSprites[ship]['ShieldsLevel' + str(parameters['General']['ShieldMaxLevel'])].rect
-
-            # Swap blue and green and adapt the colors
-            pixelImage = pygame.surfarray.pixels3d(self.loadedSprites[ship]['ZoltanShield'].image)
-            blueOld = pixelImage[:,:,2].copy()
-            greenOld = pixelImage[:,:,1].copy()
-            pixelImage[:,:,0] = np.round(pixelImage[:,:,0] / 1.1).astype(int)
-            pixelImage[:,:,1] = np.round(blueOld / 1.1).astype(int)
-            pixelImage[:,:,2] = np.round(greenOld / 1.8).astype(int)
-            
-            # Delete numpy-array
-            del pixelImage
-
-
-
     
+    ###
+    # Funtion to read in the sprites of a sprite group as defined in the parameters parameters['PlayerShip']
+    def createSpriteGroup(self, key: str) -> Dict:
+        logger.debug('Import the player ship sprites {}'.format(key))
+        
+        ###
+        # Initialize dictionary
+        sprites = dict()
+        imagePaths = self.getImagePaths(key)
+        
+        ###
+        # Load variant specific sprites
+        if self.spriteGroups[key][1] is not None:
+            # Load base sprite
+            sprites['Base'] = pygame.sprite.Sprite()
+            sprites['Base'].image = self.loadImage(imagePaths[0])
+            sprites['Base'].rect = sprites['Base'].image.get_rect()
+            
+            # Load gib sprites
+            sprites['Gib'] = list()
+            for gibPath in imagePaths[1:]:
+                sprites['Gib'].append(pygame.sprite.Sprite())
+                sprites['Gib'][-1].image = self.loadImage(gibPath)
+                sprites['Gib'][-1].rect = sprites['Gib'][-1].image.get_rect()
+            
+            return(sprites)
+        
+        
+        ###
+        # Load sprites present for all variants
+        
+        # Load shields
+        sprites['Shields'] = pygame.sprite.Sprite()
+        sprites['Shields'].image = self.loadImage(imagePaths[0])
+        sprites['Shields'].rect = sprites['Shields'].image.get_rect()
+        
+        # Load cloaking
+        sprites['Cloak'] = pygame.sprite.Sprite()
+        sprites['Cloak'].image = self.loadImage(imagePaths[1])
+        sprites['Cloak'].rect = sprites['Cloak'].image.get_rect()
+        
+        
+        ##
+        # Create the different shield levels as well as Zoltan shields
+        sprites['ShieldsLevel' + str(self.parameters['General']['ShieldMaxLevel'])] = copySprite(sprites['Shields'])
 
+        # For the alpha-multiplication
+        alphaImg = pygame.Surface(sprites['ShieldsLevel' + str(self.parameters['General']['ShieldMaxLevel'])].rect.size, pygame.SRCALPHA)
+        alphaImg.fill((255, 255, 255, self.parameters['General']['ShieldMultAlpha']))
 
-
+        for level in reversed(range(1, self.parameters['General']['ShieldMaxLevel'])):
+            sprites['ShieldsLevel' + str(level)] = pygame.sprite.Sprite()
+            
+            # Sprites aufhellen
+            sprites['ShieldsLevel' + str(level)].image = sprites['ShieldsLevel' + str(level + 1)].image.copy()
+            sprites['ShieldsLevel' + str(level)].image.blit(alphaImg, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+            
+            sprites['ShieldsLevel' + str(level)].rect = sprites['ShieldsLevel' + str(self.parameters['General']['ShieldMaxLevel'])].rect
+
+        # Generate the Zoltan shield
+        sprites['ZoltanShield'] = pygame.sprite.Sprite()
+        sprites['ZoltanShield'].image = sprites['ShieldsLevel' + str(self.parameters['General']['ShieldMaxLevel'])].image.copy()
+        sprites['ZoltanShield'].rect = sprites['ShieldsLevel' + str(self.parameters['General']['ShieldMaxLevel'])].rect
+
+        # Swap blue and green and adapt the colors
+        pixelImage = pygame.surfarray.pixels3d(sprites['ZoltanShield'].image)
+        blueOld = pixelImage[:,:,2].copy()
+        greenOld = pixelImage[:,:,1].copy()
+        pixelImage[:,:,0] = np.round(pixelImage[:,:,0] / 1.1).astype(int)
+        pixelImage[:,:,1] = np.round(blueOld / 1.1).astype(int)
+        pixelImage[:,:,2] = np.round(greenOld / 1.8).astype(int)
+        
+        # Delete numpy-array
+        del pixelImage
+        
+        
+        ##
+        # Hit geometry of the shields
+        sprites['ShieldCollision'] = createShieldCollision(sprites['Shields'].image)
+        
+        return(sprites)
@@ -0,0 +1,155 @@
+###
+#
+# Define a base class which loads the sprites of single ships on demand and frees them again when no ship uses them
+#
+###
+
+
+###
+# Load packages
+
+# Logging
+import logging
+
+# Typing
+from typing import Dict, List
+
+# Pygame
+import pygame
+
+
+###
+# Import ressources
+
+# Decoding of the images on worker threads
+import src.classes.setup.asset_pipeline as assetPipeline
+
+# Code files of the derived classes
+import src.classes.setup.sprite_cache as spriteCacheModule
+
+
+###
+# Setup logging
+logger = logging.getLogger(__name__)
+
+
+###
+# Define the ship sprite registry class
+class shipSpriteRegistry(object):
+    """
+    
+    Base class for the sprite objects of the ships. The sprites of a ship are split into sprite groups (e.g. the shields of a ship and the hull of a ship variant) which are stored in loadedSprites under their key.
+    A group is loaded when the first ship using it is set up (acquireShip) and freed when the last ship using it is released (releaseShip), so only the sprites of ships on screen are kept.
+    The images of a group are decoded together by the asset pipeline. The images of ships which are likely needed next can be decoded in advance (prefetchShips). The conversion to the display format is always done on the main thread when the group is loaded.
+    Loaded groups are stored in the sprite cache under '{cacheName}_{key}' if a cache is given, their images are only decoded if the cache has no valid entry.
+    
+    Fields:
+        - parameters [Dict]: Dictionary containing all parameters
+        - spriteCache [None, spriteCache]: Sprite cache used for the sprite groups
+        - loadedSprites [Dict]: Dictionary containing all the loaded sprite groups with initial rect fields (-> not shifted)
+        - referenceCounts [Dict]: Number of ships using each loaded sprite group
+        - evictUnused [bool]: Whether sprite groups are freed when no ship uses them, parameters['General']['ShipSpritesEvictUnused']
+        - assets [assetPipeline]: Asset pipeline decoding the images
+    
+    Fields to be provided by the derived class:
+        - cacheName [str]: Name of the sprite object in the sprite cache
+    
+    Methods:
+        - acquireShip(ship [str], variant [str]): Load the sprite groups of the ship if necessary and count the ship as using them
+        - releaseShip(ship [str], variant [str]): Count the ship as no longer using its sprite groups, unused groups are freed
+        - prefetchShips(ships [List]): Decode the images of the given (ship, variant) tuples on the worker threads of the asset pipeline
+        - isLoaded(ship [str], variant [str]): Returns whether all sprite groups of the ship are loaded
+    
+    Methods to be provided by the derived class:
+        - getSpriteGroups(ship [str], variant [str]): Returns the keys of the sprite groups used by the ship
+        - getImagePaths(key [str]): Returns the paths of all images of a sprite group
+        - createSpriteGroup(key [str]): Returns the sprites of a sprite group, images are loaded with loadImage
+    
+    Auxiliary methods (called internally):
+        - loadSpriteGroup(key [str]): Create the sprite group or read it from the sprite cache
+        - getCacheName(key [str]): Returns the name of a sprite group in the sprite cache
+        - loadImage(path [str]): Returns the image at path from the asset pipeline converted to the display format
+    
+    """
+    
+    
+    ###
+    # Initialization
+    def __init__(self, parameters: Dict, spriteCache = None, assets: [None, assetPipeline.assetPipeline] = None) -> None:
+        self.parameters = parameters
+        self.spriteCache = spriteCache
+        self.assets = assets if assets is not None else assetPipeline.assetPipeline(parameters)
+        
+        self.loadedSprites = dict()
+        self.referenceCounts = dict()
+        self.evictUnused = parameters['General']['ShipSpritesEvictUnused']
+    
+    
+    ###
+    # Ships using the sprite groups
+    def acquireShip(self, ship: str, variant: str) -> None:
+        for key in self.getSpriteGroups(ship, variant):
+            if key not in self.loadedSprites:
+                self.loadSpriteGroup(key)
+            
+            self.referenceCounts[key] = self.referenceCounts.get(key, 0) + 1
+    
+    
+    def releaseShip(self, ship: str, variant: str) -> None:
+        for key in self.getSpriteGroups(ship, variant):
+            if self.referenceCounts.get(key, 0) == 0:
+                logger.warning('Sprite group {} was released more often than it was acquired'.format(key))
+                continue
+            
+            self.referenceCounts[key] -= 1
+            
+            if (self.referenceCounts[key] == 0) and self.evictUnused:
+                logger.debug('Free the unused sprite group {}'.format(key))
+                
+                del self.referenceCounts[key]
+                del self.loadedSprites[key]
+    
+    
+    def isLoaded(self, ship: str, variant: str) -> bool:
+        return(all(key in self.loadedSprites for key in self.getSpriteGroups(ship, variant)))
+    
+    
+    ###
+    # Load a sprite group
+    def loadSpriteGroup(self, key: str) -> None:
+        logger.debug('Load the sprite group {}'.format(key))
+        
+        if self.spriteCache is None:
+            self.assets.requestImages(self.getImagePaths(key))
+            self.loadedSprites[key] = self.createSpriteGroup(key)
+        else:
+            if not self.spriteCache.isValid(self.getCacheName(key)):
+                self.assets.requestImages(self.getImagePaths(key))
+            
+            # The sprite groups are created by the derived class, so changes of its module and the modules it uses have to invalidate the entries
+            sourceFiles = list(self.getImagePaths(key)) + spriteCacheModule.getCodeFiles(type(self).__module__)
+            
+            self.loadedSprites[key] = self.spriteCache.get(self.getCacheName(key), lambda: self.createSpriteGroup(key), sourceFiles)
+    
+    
+    def getCacheName(self, key: str) -> str:
+        return('{cacheName}_{key}'.format(cacheName = self.cacheName, key = key))
+    
+    
+    ###
+    # Load an image, the decoding is done by the asset pipeline
+    def loadImage(self, path: str) -> pygame.Surface:
+        return(self.assets.getImage(path).convert_alpha())
+    
+    
+    ###
+    # Decode the images of ships needed soon in the background
+    def prefetchShips(self, ships: List) -> None:
+        for ship, variant in ships:
+            for key in self.getSpriteGroups(ship, variant):
+                if (key in self.loadedSprites) or ((self.spriteCache is not None) and self.spriteCache.isValid(self.getCacheName(key))):
+                    continue
+                
+                logger.debug('Prefetch the sprite group {}'.format(key))
+                
+                self.assets.requestImages(self.getImagePaths(key))
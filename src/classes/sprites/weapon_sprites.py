@@ -12,7 +12,7 @@
 import logging
 
 # Typing
-from typing import Dict
+from typing import Dict, List
 
 # Pygame
 import pygame
@@ -164,7 +164,23 @@ class weaponSprites(object):
             del projectileSpriteSheet
 
 
+###
+# Functions
+
+##
+# Paths of all images loaded by weaponSprites
+def getImagePaths(parameters: Dict) -> List:
+    """
+    
+    Returns the paths of all images loaded by weaponSprites (weapon and projectile sprite sheets of all lasers), so they can be requested from the asset pipeline before the sprites are created.
+    
+    """
     
+    imagePaths = list()
     
+    for weapon in parameters['Weapons']:
+        if (weapon not in ['BasePath']) and (parameters['Weapons'][weapon]['Type'] == 'Laser'):
+            for spriteSheet in ['WeaponSprites', 'ProjectileSprites']:
+                imagePaths.append('{basepath}{spriteSheet}.png'.format(basepath = parameters['Weapons']['BasePath'], spriteSheet = parameters['Weapons'][weapon][spriteSheet]))
     
-    
\ No newline at end of file
+    return(imagePaths)
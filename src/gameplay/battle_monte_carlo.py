@@ -0,0 +1,277 @@
+###
+#
+# Functions to run many seeded headless battles on a process pool and aggregate their outcomes
+#
+###
+
+
+###
+# Load packages
+
+# Logging
+import logging
+
+# Typing
+from typing import Dict, List
+
+# Parallel execution
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+# Arrays and matrices
+import numpy as np
+
+
+###
+# Load ressources
+
+# Headless battles
+import src.gameplay.headless_simulation as headlessSimulation
+
+
+###
+# Setup logging
+logger = logging.getLogger(__name__)
+
+
+###
+# Settings of a battle, every key missing in the battle settings is taken from here
+#
+# PlayerShip/EnemyShip: Ship and variant
+# PlayerWeapons/EnemyWeapons: Weapon names, None takes the WeaponInitial of the ship parameters (if there are any)
+# PowerWeapons: Power the weapons in their order at the start of the battle as far as the reactor and the weapon system allow
+# WeaponOverrides: Changed weapon parameters, weapon name:{parameter name:value}
+# MaxDurationSeconds: Battles without a destroyed ship are stopped after this time
+# TimeStep: Simulation time step in milliseconds, None takes the SimulationTimeStep of the general parameters
+defaultBattleSettings = dict()
+defaultBattleSettings['PlayerShip'] = ('Kestrel', 'A')
+defaultBattleSettings['EnemyShip'] = ('RebelFighter', '')
+defaultBattleSettings['PlayerWeapons'] = None
+defaultBattleSettings['EnemyWeapons'] = None
+defaultBattleSettings['PowerWeapons'] = True
+defaultBattleSettings['WeaponOverrides'] = dict()
+defaultBattleSettings['MaxDurationSeconds'] = 300
+defaultBattleSettings['TimeStep'] = None
+
+
+###
+# Parameters of the worker process. Set once per worker by initializeWorker, so they are not sent along with every battle
+workerParameters = None
+
+
+###
+# Functions
+
+##
+# Initialization of a worker process
+def initializeWorker(parameters: Dict) -> None:
+    """
+    
+    Keep the parameters for all battles run by the worker. The workers only log errors, warnings of thousands of battles would flood the output.
+    
+    """
+    
+    global workerParameters
+    workerParameters = parameters
+    
+    logging.disable(logging.WARNING)
+
+
+##
+# Parameters with changed weapon parameters
+def applyWeaponOverrides(parameters: Dict, weaponOverrides: Dict) -> Dict:
+    """
+    
+    Returns the parameters with the weapon parameters replaced by weaponOverrides (weapon name:{parameter name:value}).
+    Only the changed weapons are copied, all other parameters are shared with the given parameters and must not be changed.
+    
+    """
+    
+    if not weaponOverrides:
+        return(parameters)
+    
+    parametersBattle = dict(parameters)
+    parametersBattle['Weapons'] = dict(parameters['Weapons'])
+    
+    for weaponName, overrides in weaponOverrides.items():
+        parametersBattle['Weapons'][weaponName] = dict(parameters['Weapons'][weaponName])
+        parametersBattle['Weapons'][weaponName].update(overrides)
+    
+    return(parametersBattle)
+
+
+##
+# Run a single battle
+def simulateBattle(battleSettings: Dict, seed: int, parameters: [None, Dict] = None) -> Dict:
+    """
+    
+    Run a single seeded battle with the given settings (see defaultBattleSettings) until a ship is destroyed or MaxDurationSeconds are reached.
+    Uses the parameters of the worker if no parameters are given. Returns the outcome of the battle:
+        - Seed [int]: Seed of the battle
+        - Winner [None, str]: 'Player', 'Enemy', 'Draw' or None if no ship was destroyed
+        - TimeSeconds [float]: Duration of the battle
+        - HullRemaining [Dict]: Hull points of both ships at the end
+        - OxygenMinimum [Dict]: Lowest oxygen level in any room of both ships
+        - Statistics [Dict]: Shots fired, blocked and hit, fires and breaches of both ships
+    
+    """
+    
+    settings = dict(defaultBattleSettings)
+    settings.update(battleSettings)
+    
+    if parameters is None:
+        parameters = workerParameters
+    
+    parameters = applyWeaponOverrides(parameters, settings['WeaponOverrides'])
+    
+    
+    ###
+    # Setup the battle
+    battle = headlessSimulation.headlessBattle(parameters, tuple(settings['PlayerShip']), tuple(settings['EnemyShip']), settings['TimeStep'], seed)
+    
+    for shipKey, playerShip in (('Player', True), ('Enemy', False)):
+        weaponNames = settings[shipKey + 'Weapons']
+        if weaponNames is None:
+            ship = battle.getShip(playerShip)
+            weaponNames = parameters[ship.parameterShipSelector][ship.ship + ship.variant].get('WeaponInitial', list())
+        
+        for weaponName in weaponNames:
+            battle.addWeapon(playerShip, weaponName)
+        
+        if settings['PowerWeapons']:
+            for weaponName in weaponNames:
+                battle.addSystemPower(playerShip, 'WeaponControl')
+    
+    
+    ###
+    # Run it
+    battle.run(settings['MaxDurationSeconds'] * 1000)
+    
+    outcome = dict()
+    outcome['Seed'] = seed
+    outcome['Winner'] = battle.getWinner()
+    outcome['TimeSeconds'] = battle.time / 1000
+    outcome['HullRemaining'] = {shipKey: int(ship.hullPoints) for shipKey, ship in battle.ships.items()}
+    outcome['OxygenMinimum'] = {shipKey: statistics['OxygenMinimum'] for shipKey, statistics in battle.statistics.items()}
+    outcome['Statistics'] = battle.statistics
+    
+    return(outcome)
+
+
+##
+# Run battles on a process pool
+def runBattleTasks(parameters: Dict, tasks: List, maxWorkers: [None, int] = None) -> List:
+    """
+    
+    Run the battles given as list of (battleSettings, seed) on a process pool. The parameters are handed to every worker once on startup.
+    Returns the outcomes in the order of the tasks.
+    
+    """
+    
+    workers = maxWorkers if maxWorkers is not None else (os.cpu_count() or 1)
+    
+    logger.info('Run {battles} battles on {workers} processes'.format(battles = len(tasks), workers = workers))
+    
+    # Several battles per task keep the communication overhead low while still balancing the load
+    chunkSize = max(1, len(tasks) // (4 * workers))
+    
+    with ProcessPoolExecutor(max_workers = workers, initializer = initializeWorker, initargs = (parameters,)) as executor:
+        outcomes = list(executor.map(simulateBattle, [task[0] for task in tasks], [task[1] for task in tasks], chunksize = chunkSize))
+    
+    return(outcomes)
+
+
+##
+# Run the same battle for several seeds
+def runBattles(parameters: Dict, battleSettings: Dict, seeds: List, maxWorkers: [None, int] = None) -> List:
+    """
+    
+    Run the battle with the given settings once per seed on a process pool. Returns the outcomes in the order of the seeds.
+    
+    """
+    
+    return(runBattleTasks(parameters, [(battleSettings, seed) for seed in seeds], maxWorkers))
+
+
+##
+# Sweep a weapon parameter
+def sweepWeaponParameter(parameters: Dict, battleSettings: Dict, weaponName: str, parameterName: str, values: List, seeds: List, maxWorkers: [None, int] = None) -> Dict:
+    """
+    
+    Run the battle once per seed for every value of the weapon parameter, all on the same process pool. Returns the aggregated outcomes per value.
+    
+    """
+    
+    ###
+    # Battle settings per value
+    tasks = list()
+    for value in values:
+        weaponOverrides = {weapon: dict(overrides) for weapon, overrides in battleSettings.get('WeaponOverrides', dict()).items()}
+        weaponOverrides.setdefault(weaponName, dict())[parameterName] = value
+        
+        settings = dict(battleSettings)
+        settings['WeaponOverrides'] = weaponOverrides
+        
+        tasks += [(settings, seed) for seed in seeds]
+    
+    
+    ###
+    # Run and aggregate per value
+    outcomes = runBattleTasks(parameters, tasks, maxWorkers)
+    
+    results = dict()
+    for i, value in enumerate(values):
+        results[value] = aggregateOutcomes(outcomes[i * len(seeds):(i + 1) * len(seeds)])
+    
+    return(results)
+
+
+##
+# Statistics over many battles
+def aggregateOutcomes(outcomes: List) -> Dict:
+    """
+    
+    Aggregate the outcomes of many battles:
+        - Battles [int]: Number of battles
+        - Winner [Dict]: Share of the battles won by 'Player' and 'Enemy', ended in a 'Draw' or stopped with 'None' destroyed
+        - TimeToKillSeconds [Dict]: Mean, P10, P50 and P90 of the battle duration over the battles with a destroyed ship (None if there are none)
+        - HullRemaining [Dict]: Mean and minimum of the remaining hull points of both ships
+        - OxygenMinimum [Dict]: Mean and minimum of the lowest oxygen level of both ships
+    
+    """
+    
+    results = dict()
+    results['Battles'] = len(outcomes)
+    
+    ###
+    # Winners
+    winners = [str(outcome['Winner']) for outcome in outcomes]
+    results['Winner'] = {winner: winners.count(winner) / max(len(outcomes), 1) for winner in ['Player', 'Enemy', 'Draw', 'None']}
+    
+    
+    ###
+    # Time to kill
+    timesToKill = np.array([outcome['TimeSeconds'] for outcome in outcomes if outcome['Winner'] is not None])
+    if timesToKill.shape[0]:
+        results['TimeToKillSeconds'] = {'Mean': float(np.mean(timesToKill))}
+        for percentile in [10, 50, 90]:
+            results['TimeToKillSeconds']['P' + str(percentile)] = float(np.percentile(timesToKill, percentile))
+    else:
+        results['TimeToKillSeconds'] = None
+    
+    
+    ###
+    # Hull and oxygen of both ships
+    for statistic in ['HullRemaining', 'OxygenMinimum']:
+        results[statistic] = dict()
+        for shipKey in ['Player', 'Enemy']:
+            values = np.array([outcome[statistic][shipKey] for outcome in outcomes], dtype = float)
+            results[statistic][shipKey] = {'Mean': float(np.mean(values)), 'Min': float(np.min(values))} if values.shape[0] else None
+    
+    return(results)
+
+
+##
+# Seeds for a number of battles
+def createSeeds(battles: int, baseSeed: int = 0) -> List:
+    return(list(range(baseSeed, baseSeed + battles)))
@@ -20,8 +20,8 @@ import pygame
 # Arrays and matrices
 import numpy as np
 
-# Garbage collection
-import gc
+# Time stamps for the trace files
+import time
 
 
 ###
@@ -37,8 +37,14 @@ import src.classes.ships.enemy_ship as enemyShip
 # Screen update
 import src.classes.screen.update_screen as updateScreen
 
-# Helper functions
-import src.misc.check_clicks_and_collisions as checkClicksAndCollisions
+# Animations
+import src.classes.animations.animation_scheduler as animationScheduler
+
+# Frame profiling
+import src.misc.frame_profiler as frameProfiler
+
+# Input recording and replay
+import src.misc.input_recording as inputRecording
 
 
 ###
@@ -51,13 +57,20 @@ logger = logging.getLogger(__name__)
 
 ##
 # Main gameplay loop when idle or in battle (as opposed to e.g. the main menu or when there are textboxes)
-def mainGameplayLoop(activeScreenUpdate: updateScreen.updateScreen, parameters: Dict, keyBindings: inputKeyBindings.getKeyBindings, activePlayerShip: playerShip.playerShip, activeEnemyShip: [None, enemyShip.enemyShip], animationsPlayerShip: Dict):
+def mainGameplayLoop(activeScreenUpdate: updateScreen.updateScreen, parameters: Dict, keyBindings: inputKeyBindings.getKeyBindings, activePlayerShip: playerShip.playerShip, activeEnemyShip: [None, enemyShip.enemyShip], animationsPlayerShip: Dict, inputRecorder: [None, inputRecording.inputRecorder] = None, inputReplay: [None, inputRecording.inputReplay] = None):
     """
     
     Main gameplay loop which handles the player and enemy ship if present.
+    The simulation (door animations, oxygen) runs with the fixed time step parameters['General']['SimulationTimeStep'], independent of the framerate. The elapsed time is collected in an accumulator and as many steps as fit are run before a frame is drawn.
+    If the simulation falls behind, up to parameters['General']['MaxSimulationStepsPerFrame'] steps are run per frame and up to parameters['General']['MaxSkippedRenderFrames'] frames in a row are not drawn to catch up. Any remaining backlog is dropped.
+    The frame limiter sleeps instead of busy waiting.
+    If parameters['General']['FrameProfiler'] is set, the time of every phase of the loop is recorded. The rolling percentiles are logged together with the framerate and the recorded frames are written as Chrome trace file on pressing F12.
+    
+    If an inputRecorder is given, all input events are recorded together with the simulation tick they were processed at.
+    If an inputReplay is given, the recorded events are used instead of the event queue. The replay does not wait for the framerate and runs one simulation step per frame, so it runs as fast as possible and the simulation is the same as in the recorded session.
     
     Returns:
-        - 0 if stopped correctly
+        - 0 if stopped correctly or the end of the replay was reached
         - 1 if exited by pressing the exit-button on the screen
     
     
@@ -73,6 +86,17 @@ def mainGameplayLoop(activeScreenUpdate: updateScreen.updateScreen, parameters:
     ##
     # Initialize indicators
     pause = False
+    redrawEnergyUi = False
+    
+    ##
+    # Fixed time step simulation
+    simulationTimeStep = parameters['General']['SimulationTimeStep']
+    simulationAccumulator = 0   # Elapsed time in milliseconds which has not yet been simulated
+    simulationTick = 0          # Number of simulation steps run
+    skippedRenderFrames = 0
+    
+    if (inputReplay is not None) and (inputReplay.simulationTimeStep != simulationTimeStep):
+        logger.warning('Replay was recorded with a simulation time step of {recorded} ms instead of {current} ms, the simulation will differ'.format(recorded = inputReplay.simulationTimeStep, current = simulationTimeStep))
 
     ##
     # Loop counter and timer for the output of the framerate
@@ -85,19 +109,43 @@ def mainGameplayLoop(activeScreenUpdate: updateScreen.updateScreen, parameters:
     for field in ['Doors', 'AddSystemPower', 'RemoveSystemPower']:
         animationTracking[field] = list()
     
+    ##
+    # Only the running animations are advanced by the scheduler
+    animations = animationScheduler.animationScheduler()
+    
+    ##
+    # Profiler for the phases of the loop, the screen update reports the drawing phases
+    profiler = frameProfiler.frameProfiler(['Wait', 'Events', 'Clicks', 'Power', 'Doors', 'Oxygen', 'SceneCollection', 'Drawing', 'DisplayUpdate'], parameters['General']['FrameProfilerBufferSize'], parameters['General']['FrameProfiler'])
+    activeScreenUpdate.frameProfiler = profiler
+    
     
     ###
     # Main loop
     while running:        
+        profiler.startFrame()
+        
         ###
-        # Wait for the time to the next frame according to the framerate to elapse
-        if parameters['General']['MaxFramerate']:
-            clock.tick_busy_loop(parameters['General']['MaxFramerate'])
+        # Wait for the time to the next frame according to the framerate to elapse. The clock sleeps, so the waiting does not use the cpu
+        if parameters['General']['MaxFramerate'] and (inputReplay is None):
+            clock.tick(parameters['General']['MaxFramerate'])
         else:
-            clock.tick_busy_loop()
+            clock.tick()
 
         # Get elapsed time since last clock tick
         dt = clock.get_time()   # Time in milliseconds
+        
+        ##
+        # The replay advances one simulation step per frame, frames with recorded events are processed without a step in between like in the recording
+        if inputReplay is not None:
+            if inputReplay.isFinished(simulationTick):
+                logger.info('End of the replay reached after {} simulation steps'.format(simulationTick))
+                return(0)
+            
+            simulationDt = 0 if inputReplay.hasEvents(simulationTick) else simulationTimeStep
+        else:
+            simulationDt = dt
+        
+        profiler.lap('Wait')
 
 
         ###
@@ -107,23 +155,25 @@ def mainGameplayLoop(activeScreenUpdate: updateScreen.updateScreen, parameters:
 
         if loopTimer >= parameters['General']['UpdateFramerateDisplay']:
             logger.info('FPS {fps}, gameplay loops {loops}, time elapsed {time}'.format(fps = round(loopCounter / loopTimer * 1000), loops = loopCounter, time = round(loopTimer / 1000, 4)))
+            
+            if profiler.enabled:
+                logger.info(profiler.getSummary())
 
             # Reset values
             loopCounter = 0
             loopTimer = 0
-            
-            # Garbage collection
-            gc.collect()
         
         
         ###
-        # Reset values
-        redrawEnergyUi = False
-        
+        # Get all events from the event queue which happened since the last call/loop, or the recorded events when replaying
+        if inputReplay is not None:
+            pygame.event.pump()
+            events = inputReplay.getEvents(simulationTick)
+        else:
+            events = pygame.event.get()
         
-        ###
-        # Get all events from the event queue which happened since the last call/loop
-        events = pygame.event.get()
+        if inputRecorder is not None:
+            inputRecorder.record(simulationTick, events)
         
         
         ###
@@ -135,6 +185,9 @@ def mainGameplayLoop(activeScreenUpdate: updateScreen.updateScreen, parameters:
             ###
             # Quit, for now exit directly without any processing like e.g. saving the game state
             if event.type == pygame.QUIT:
+                if inputRecorder is not None:
+                    inputRecorder.close(simulationTick)
+                
                 return(1)
             
             
@@ -165,13 +218,15 @@ def mainGameplayLoop(activeScreenUpdate: updateScreen.updateScreen, parameters:
             if event.type == pygame.KEYDOWN:
                 if event.key in keyBindings.keysUsed['Keyboard']:
                     keyBindings.keyPressed['Keyboard'][keyBindings.keyBindingsInverse['Keyboard'][event.key]] = True
-                    keyBindings.mousePosition['Keyboard'][keyBindings.keyBindingsInverse['Keyboard'][event.key]]['PositionPressed'] = np.array(pygame.mouse.get_pos())
+                    keyBindings.mousePosition['Keyboard'][keyBindings.keyBindingsInverse['Keyboard'][event.key]]['PositionPressed'] = np.array(event.pos if inputReplay is not None else pygame.mouse.get_pos())
             
             # Keyboard button released
             if event.type == pygame.KEYUP:
                 if event.key in keyBindings.keysUsed['Keyboard']:
                     keyBindings.keyReleased['Keyboard'][keyBindings.keyBindingsInverse['Keyboard'][event.key]] = True
-                    keyBindings.mousePosition['Keyboard'][keyBindings.keyBindingsInverse['Keyboard'][event.key]]['PositionReleased'] = np.array(pygame.mouse.get_pos())
+                    keyBindings.mousePosition['Keyboard'][keyBindings.keyBindingsInverse['Keyboard'][event.key]]['PositionReleased'] = np.array(event.pos if inputReplay is not None else pygame.mouse.get_pos())
+        
+        profiler.lap('Events')
             
         
         ###
@@ -189,63 +244,42 @@ def mainGameplayLoop(activeScreenUpdate: updateScreen.updateScreen, parameters:
             
             
             ###
-            # Select the different actions
+            # Select the different actions for the clicked element, press and release have to be made over the same element
+            logger.debug('Check clicked elements')
+            
+            targetButtonDown = activePlayerShip.hitTargets.getTarget(keyBindings.mousePosition['Mouse']['LeftClick']['PositionPressed'])
+            targetButtonUp = activePlayerShip.hitTargets.getTarget(keyBindings.mousePosition['Mouse']['LeftClick']['PositionReleased'])
+            
+            if (targetButtonDown is None) or (targetButtonDown != targetButtonUp):
+                logger.debug('Press and release were not made over the same element')
             
             ##
             # Doors, clicking on crew will have higher priority than doors later
             # To open or close doors: Mouse has been clicked over the door (both key down and key up)
-            
-            # Check if click has been made over a door for both start and end of click
-            logger.debug('Check door rects')
-            
-            checkDoorsButtonDown = checkClicksAndCollisions.checkRects(keyBindings.mousePosition['Mouse']['LeftClick']['PositionPressed'], activePlayerShip.doorRectForSelection)
-            checkDoorsButtonUp = checkClicksAndCollisions.checkRects(keyBindings.mousePosition['Mouse']['LeftClick']['PositionReleased'], activePlayerShip.doorRectForSelection)
-            
-            # Door click boxes do not overlap, so if there is a valid click there is only one door selected for both click pressed and released
-            if (len(checkDoorsButtonDown) == 1) and (len(checkDoorsButtonUp) == 1):
-                # Check whether the press and release has been made over the same door
-                if checkDoorsButtonDown[0] == checkDoorsButtonUp[0]:
-                    ##
-                    # Read out the doorkey
-                    chosenDoorKey = activePlayerShip.doorKeysForRects[checkDoorsButtonDown[0]]
-                    logger.debug('Selected door: {}'.format(str(chosenDoorKey)))
-                    
-                    ##
-                    # Add the animation to the control object
-                    animationTracking['Doors'].append(chosenDoorKey)
+            elif targetButtonDown[0] == 'Doors':
+                ##
+                # Read out the doorkey
+                chosenDoorKey = targetButtonDown[1]
+                logger.debug('Selected door: {}'.format(str(chosenDoorKey)))
                 
-                else:
-                    logger.debug('Press and release were not made over the same system symbol')
-                
-            else:
-                logger.debug('Press or release were not made over a door')
-            
+                ##
+                # Add the animation to the control object
+                animationTracking['Doors'].append(chosenDoorKey)
             
             ##
             # System energy manipulation
-            logger.debug('Check system energy addition')
-            
-            checkSystemEnergyAdditionButtonDown = checkClicksAndCollisions.checkCenters(keyBindings.mousePosition['Mouse']['LeftClick']['PositionPressed'], activePlayerShip.energySystemsRectCenters, parameters['General']['UiEnergySymbolsMaxDistance'])
-            checkSystemEnergyAdditionButtonUp = checkClicksAndCollisions.checkCenters(keyBindings.mousePosition['Mouse']['LeftClick']['PositionReleased'], activePlayerShip.energySystemsRectCenters, parameters['General']['UiEnergySymbolsMaxDistance'])
-            
-            # Add energy to a system if possible. The symbols do not overlap
-            if (len(checkSystemEnergyAdditionButtonDown) == 1) and (len(checkSystemEnergyAdditionButtonUp) == 1):
-                # Check whether the press and release has been made over the same door
-                if checkSystemEnergyAdditionButtonDown[0] == checkSystemEnergyAdditionButtonUp[0]:
-                    ##
-                    # Read out the doorkey
-                    chosenSystem = activePlayerShip.energySystemsForRects[checkSystemEnergyAdditionButtonDown[0]]
-                    logger.debug('Selected system for energy addition: {}'.format(chosenSystem))
-                    
-                    ##
-                    # Add the animation to the control object
-                    animationTracking['AddSystemPower'].append(chosenSystem)
-                
-                else:
-                    logger.debug('Press and release were not made over the same door')
+            elif targetButtonDown[0] == 'Systems':
+                ##
+                # Read out the system
+                chosenSystem = targetButtonDown[1]
+                logger.debug('Selected system for energy addition: {}'.format(chosenSystem))
                 
+                ##
+                # Add the animation to the control object
+                animationTracking['AddSystemPower'].append(chosenSystem)
+            
             else:
-                logger.debug('Press or release were not made over a system symbol')
+                logger.debug('No action for the selected element {}'.format(str(targetButtonDown)))
         
         
         ##
@@ -260,33 +294,29 @@ def mainGameplayLoop(activeScreenUpdate: updateScreen.updateScreen, parameters:
             
             
             ###
-            # Select the different actions
-
+            # Select the different actions for the clicked element, press and release have to be made over the same element
+            logger.debug('Check clicked elements')
+            
+            targetButtonDown = activePlayerShip.hitTargets.getTarget(keyBindings.mousePosition['Mouse']['RightClick']['PositionPressed'])
+            targetButtonUp = activePlayerShip.hitTargets.getTarget(keyBindings.mousePosition['Mouse']['RightClick']['PositionReleased'])
+            
+            if (targetButtonDown is None) or (targetButtonDown != targetButtonUp):
+                logger.debug('Press and release were not made over the same element')
+            
             ##
             # System energy manipulation
-            logger.debug('Check system energy removal')
-            
-            checkSystemEnergyRemovalButtonDown = checkClicksAndCollisions.checkCenters(keyBindings.mousePosition['Mouse']['RightClick']['PositionPressed'], activePlayerShip.energySystemsRectCenters, parameters['General']['UiEnergySymbolsMaxDistance'])
-            checkSystemEnergyRemovalButtonUp = checkClicksAndCollisions.checkCenters(keyBindings.mousePosition['Mouse']['RightClick']['PositionReleased'], activePlayerShip.energySystemsRectCenters, parameters['General']['UiEnergySymbolsMaxDistance'])
-            
-            # Add energy to a system if possible
-            if (len(checkSystemEnergyRemovalButtonDown) == 1) and (len(checkSystemEnergyRemovalButtonUp) == 1):
-                # Check whether the press and release has been made over the same door
-                if checkSystemEnergyRemovalButtonDown[0] == checkSystemEnergyRemovalButtonUp[0]:
-                    ##
-                    # Read out the doorkey
-                    chosenSystem = activePlayerShip.energySystemsForRects[checkSystemEnergyRemovalButtonDown[0]]
-                    logger.debug('Selected system for energy removal: {}'.format(chosenSystem))
-
-                    ##
-                    # Add the animation to the control object
-                    animationTracking['RemoveSystemPower'].append(chosenSystem)
-                
-                else:
-                    logger.debug('Press and release were not made over the same system symbol')
+            elif targetButtonDown[0] == 'Systems':
+                ##
+                # Read out the system
+                chosenSystem = targetButtonDown[1]
+                logger.debug('Selected system for energy removal: {}'.format(chosenSystem))
                 
+                ##
+                # Add the animation to the control object
+                animationTracking['RemoveSystemPower'].append(chosenSystem)
+            
             else:
-                logger.debug('Press or release were not made over a system symbol')
+                logger.debug('No action for the selected element {}'.format(str(targetButtonDown)))
         
         
         ###
@@ -310,6 +340,22 @@ def mainGameplayLoop(activeScreenUpdate: updateScreen.updateScreen, parameters:
             # Reset the pause to unpressed
             keyBindings.keyPressed['Keyboard']['Space'] = False    # This will lead to missed input if one clicks faster than the framerate (should not happen)
             keyBindings.keyReleased['Keyboard']['Space'] = False
+        
+        ##
+        # Write the recorded frames as trace file
+        if keyBindings.keyReleased['Keyboard']['F12']:   # F12 released
+            if profiler.enabled:
+                profiler.dumpChromeTrace(parameters['General']['FrameProfilerTraceFile'].format(time = time.strftime('%Y%m%d_%H%M%S')))
+                logger.info(profiler.getSummary())
+            else:
+                logger.info('Frame profiler is disabled, no trace file written')
+            
+            ##
+            # Reset F12 to unpressed
+            keyBindings.keyPressed['Keyboard']['F12'] = False
+            keyBindings.keyReleased['Keyboard']['F12'] = False
+        
+        profiler.lap('Clicks')
             
             
         ###
@@ -339,6 +385,8 @@ def mainGameplayLoop(activeScreenUpdate: updateScreen.updateScreen, parameters:
             
             # Redraw energy ui
             redrawEnergyUi = True            
+        
+        profiler.lap('Power')
 
         
         ###
@@ -349,51 +397,103 @@ def mainGameplayLoop(activeScreenUpdate: updateScreen.updateScreen, parameters:
         if len(animationTracking['Doors']):
             # Start animations
             for doorKey in animationTracking['Doors']:
-                animationsPlayerShip['Doors'][chosenDoorKey].startAnimation(True)
+                animations.startAnimation('Doors', doorKey, animationsPlayerShip['Doors'][doorKey], True)
             
             # Reset tracking
             animationTracking['Doors'] = list()
 
         
         ###
-        # Update all animations and oxygen     
+        # Run the simulation with fixed time steps for the elapsed time
         # Only run animations if the game is not on pause        
-
+        renderFrame = True
+        
         if not pause:
+            simulationAccumulator += simulationDt
+            
             ##
-            # Animate player doors
-            doorsChanged = False
-            for doors in animationsPlayerShip['Doors'].items():
-                # Update door
-                updateDoorKey = doors[1].updateAnimation(dt)
+            # Run as many steps as fit into the elapsed time, limited per frame
+            simulationSteps = 0
+            while (simulationAccumulator >= simulationTimeStep) and (simulationSteps < parameters['General']['MaxSimulationStepsPerFrame']):
+                simulationStep(activePlayerShip, activeEnemyShip, animations, simulationTimeStep, profiler)
                 
-                # If framechange happened, update the door sprite
-                if updateDoorKey:
-                    activePlayerShip.updateDoor(doors[0])
-                    doorsChanged = True
+                simulationAccumulator -= simulationTimeStep
+                simulationSteps += 1
+                simulationTick += 1
             
-            # Update open room connectivity if necessary
-            if doorsChanged:
-                activePlayerShip.updateRoomConnectivityOpenDoors()
-        
+            ##
+            # Simulation fell behind, skip drawing to catch up or drop the backlog if too many frames were skipped
+            if simulationAccumulator >= simulationTimeStep:
+                if skippedRenderFrames < parameters['General']['MaxSkippedRenderFrames']:
+                    renderFrame = False
+                else:
+                    logger.debug('Simulation is behind by {} ms, drop the backlog'.format(simulationAccumulator - simulationAccumulator % simulationTimeStep))
+                    
+                    simulationAccumulator %= simulationTimeStep
         
-            ###
-            # Update oxygen
-            activePlayerShip.updateOxygen(dt)
-
-            if activeEnemyShip is not None:
-                activeEnemyShip.updateOxygen(dt)
+        else:
+            # Time elapsed in pause is not simulated
+            simulationAccumulator = 0
     
     
         ###
         # Redraw everything
-        activeScreenUpdate.drawScreen(redrawEnergyUi = redrawEnergyUi)
+        if renderFrame:
+            activeScreenUpdate.drawScreen(redrawEnergyUi = redrawEnergyUi)
+            
+            # Reset values
+            redrawEnergyUi = False
+            skippedRenderFrames = 0
+        
+        else:
+            skippedRenderFrames += 1
+        
+        profiler.endFrame()
         
         
     
     ###
     # Return 0 for normal end
+    if inputRecorder is not None:
+        inputRecorder.close(simulationTick)
+    
     return(0)
+
+
+##
+# Advance the simulation by one time step
+def simulationStep(activePlayerShip: playerShip.playerShip, activeEnemyShip: [None, enemyShip.enemyShip], animations: animationScheduler.animationScheduler, dt: int, profiler: frameProfiler.frameProfiler) -> None:
+    """
+    
+    Update all animations and the oxygen by the time step dt given in milliseconds.
+    Door animations of the player ship are in the group 'Doors', those of the enemy ship in the group 'EnemyDoors'.
+    
+    """
+    
+    ##
+    # Advance the running animations
+    changedAnimations = animations.update(dt)
+    
+    # If framechanges happened for player doors, update the door sprites and the open room connectivity once for all of them
+    if 'Doors' in changedAnimations:
+        activePlayerShip.updateDoors(changedAnimations['Doors'])
+        activePlayerShip.updateDoorConnectivity(changedAnimations['Doors'])
+    
+    if 'EnemyDoors' in changedAnimations:
+        activeEnemyShip.updateDoors(changedAnimations['EnemyDoors'])
+        activeEnemyShip.updateDoorConnectivity(changedAnimations['EnemyDoors'])
+    
+    profiler.lap('Doors')
+
+
+    ###
+    # Update oxygen
+    activePlayerShip.updateOxygen(dt)
+
+    if activeEnemyShip is not None:
+        activeEnemyShip.updateOxygen(dt)
+    
+    profiler.lap('Oxygen')
     
 
 
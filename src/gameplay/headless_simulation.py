@@ -0,0 +1,536 @@
+###
+#
+# Battle simulation without display, used to run battles faster than real time
+#
+###
+
+
+###
+# Load packages
+
+# Logging
+import logging
+
+# Typing
+from typing import Dict, List
+
+# Arrays and matrices
+import numpy as np
+
+
+###
+# Load ressources
+
+# Gameplay ressources
+import src.gameplay.setup_gameplay as setup
+import src.gameplay.game_loop as gameLoop
+
+# Ships
+import src.classes.ships.headless_ship as headlessShip
+
+# Projectiles
+import src.classes.elements.projectile_pool as projectilePool
+
+# Animations
+import src.classes.animations.animation_scheduler as animationScheduler
+
+# Frame profiling
+import src.misc.frame_profiler as frameProfiler
+
+
+###
+# Setup logging
+logger = logging.getLogger(__name__)
+
+
+###
+# Headless battle definition
+class headlessBattle(object):
+    """
+    
+    Battle between a player and an enemy ship which are only simulated. The ships are constructed from the parameters alone, no sprites are loaded and no images are drawn, so no display is needed.
+    Every step runs the same simulation step as the gameplay loop (door animations, open room connectivity, oxygen) with the fixed time step timeStep. Time steps can be run as fast as possible.
+    Actions (doors, power, damage) are applied between the steps and take effect in the next step.
+    
+    Weapons added with addWeapon() charge, fire and hit random rooms of the other ship. The current power of the weapon system, limited by its undamaged capacity, powers the weapons in the order they were added. As the ships don't manage the power of single weapons yet, adding or removing power of the weapon system powers the next or unpowers the last powered weapon.
+    Projectiles are fired at a random room and fly towards it from outside the shields of the target, the player shoots from the left and the enemy from the right. All projectiles are kept in one projectile pool.
+    A projectile reaching the shields takes down one shield layer if the target has one left, otherwise it damages the hull and the system of the room once it arrives and may start a fire or breach the hull. Shots of weapons without projectiles are resolved at once. Shield layers recharge one after another.
+    Fires are only counted in the state of the rooms, they don't spread or do damage yet. All random decisions are drawn from rng, so a battle is reproducible from its seed.
+    
+    Init:
+        - parameters [Dict]: All loaded parameters
+        - playerShipSelection [tuple]: Ship and variant of the player ship
+        - enemyShipSelection [tuple]: Ship and variant of the enemy ship
+        - timeStep [None, int]: Time step in milliseconds, parameters['General']['SimulationTimeStep'] if None
+        - seed [None, int]: Seed of the random number generator
+    
+    Fields:
+        - parameters [Dict]: Reference to all parameters
+        - ships [Dict]: The headless ships, keys 'Player' and 'Enemy'
+        - doorAnimations [Dict]: Door animation objects for both ships, keys 'Player' and 'Enemy'
+        - animations [animationScheduler]: Scheduler of the running door animations. Player doors are in the group 'Doors', enemy doors in the group 'EnemyDoors'
+        - profiler [frameProfiler]: Disabled profiler handed to the simulation step
+        - timeStep [int]: Time step in milliseconds
+        - time [int]: Simulated battle time in milliseconds
+        - rng [np.random.Generator]: Random number generator for all random decisions of the battle
+        - weapons [Dict]: Weapons of both ships, keys 'Player' and 'Enemy'. Every weapon is a dictionary with its parameters, its charge in milliseconds and the pending shots of the current volley
+        - shieldLayers [Dict]: Current shield layers of both ships
+        - shieldRecharge [Dict]: Recharge progress of the next shield layer of both ships in milliseconds
+        - shipKeys [List]: Keys of the ships in the order of their index in the projectile pool
+        - projectiles [projectilePool]: Flying projectiles of both ships
+        - shieldEllipses [np.array]: Shield ellipses of both ships in the order of shipKeys
+        - bounds [np.array]: Area of both ships in which projectiles fly, in the order of shipKeys
+        - statistics [Dict]: Shots fired, blocked and hit, fires and breaches caused by each ship and its lowest oxygen level
+    
+    Methods:
+        - getShip(playerShip [bool]): Returns the player or the enemy ship
+        - toggleDoor(playerShip [bool], doorKey [str]): Open or close a door as if it was clicked
+        - addSystemPower(playerShip [bool], system [str]): Try to add power to a system, for the weapon system enough to power the next weapon
+        - removeSystemPower(playerShip [bool], system [str]): Try to remove power from a system, for the weapon system the power of the last powered weapon
+        - damageToRoom(playerShip [bool], roomKey [int], damageSystem [int], damageHull [int]): Apply damage to a room of a ship
+        - addWeapon(playerShip [bool], weaponName [str]): Add an uncharged weapon to a ship
+        - getWeaponPower(shipKey [str]): Returns the power of the weapon system of a ship, limited by its undamaged capacity
+        - getPoweredWeapons(shipKey [str]): Returns whether each weapon of a ship is powered
+        - changeWeaponPower(shipKey [str], addPower [bool]): Power the next or unpower the last powered weapon of a ship
+        - updateWeapons(dt [int]): Charge the weapons by dt milliseconds and fire the charged ones
+        - fireShot(shipKey [str], targetKey [str], weaponName [str]): Fire a single shot of ship shipKey at a random room of ship targetKey
+        - updateProjectiles(dt [int]): Move the projectiles by dt milliseconds and resolve the ones reaching the shields or their room
+        - blockShot(shipKey [str], targetKey [str]): Let the shields of ship targetKey take a shot, returns whether a shield layer was left
+        - hitRoom(shipKey [str], targetKey [str], roomKey [int], weaponParameters [Dict]): Apply the damage of a shot to a room of ship targetKey
+        - updateShields(dt [int]): Recharge the shield layers by dt milliseconds
+        - isFinished(): Returns whether one of the ships is destroyed
+        - getWinner(): Returns 'Player' or 'Enemy' if only the other ship is destroyed, 'Draw' if both are and None if the battle is still running
+        - step(): Advance the battle by one time step
+        - run(duration [int], stopWhenFinished [bool]): Advance the battle by duration milliseconds. Returns the number of steps run
+        - getState(): Returns hull points, oxygen levels, system power and reactor power of both ships
+    
+    To debug and develop:
+        
+        parameters = setup.loadAllParameters()
+        battle = headlessBattle(parameters)
+        battle.run(60000)
+    
+    """
+    
+    
+    ###
+    # Initialization
+    def __init__(self, parameters: Dict, playerShipSelection: tuple = ('Kestrel', 'A'), enemyShipSelection: tuple = ('RebelFighter', ''), timeStep: [None, int] = None, seed: [None, int] = None) -> None:
+        logger.debug('Initialize the headless battle {player} against {enemy}'.format(player = ''.join(playerShipSelection), enemy = ''.join(enemyShipSelection)))
+        
+        self.parameters = parameters
+        
+        ###
+        # Create the ships
+        self.ships = dict()
+        self.ships['Player'] = headlessShip.headlessShip(self.parameters, playerShipSelection[0], playerShipSelection[1], playerShip = True)
+        self.ships['Enemy'] = headlessShip.headlessShip(self.parameters, enemyShipSelection[0], enemyShipSelection[1], playerShip = False)
+        
+        for ship in self.ships.values():
+            ship.shipSetup()
+        
+        
+        ###
+        # Door animations and their scheduler
+        self.doorAnimations = dict()
+        for shipKey, ship in self.ships.items():
+            self.doorAnimations[shipKey] = setup.loadAllAnimations(self.parameters, ship)['Doors']
+        
+        self.animations = animationScheduler.animationScheduler()
+        
+        # The simulation step is shared with the gameplay loop, but nothing is timed here
+        self.profiler = frameProfiler.frameProfiler([], 1, enabled = False)
+        
+        
+        ###
+        # Time
+        self.timeStep = self.parameters['General']['SimulationTimeStep'] if timeStep is None else timeStep
+        self.time = 0
+        
+        self.rng = np.random.default_rng(seed)
+        
+        
+        ###
+        # Weapons and shields, the shields start fully charged
+        self.weapons = {shipKey: list() for shipKey in self.ships.keys()}
+        
+        self.shieldLayers = {shipKey: ship.currentMaxShieldStrength for shipKey, ship in self.ships.items()}
+        self.shieldRecharge = {shipKey: 0 for shipKey in self.ships.keys()}
+        
+        
+        ###
+        # Projectiles, the ships don't move so their shields and bounds are fixed
+        self.shipKeys = ['Player', 'Enemy']
+        self.projectiles = projectilePool.projectilePool([weapon for weapon in self.parameters['Weapons'] if weapon not in ['BasePath']], self.parameters['General']['ProjectilePoolSize'])
+        
+        self.shieldEllipses = np.array([self.ships[shipKey].getShieldEllipse() for shipKey in self.shipKeys])
+        
+        spawnDistance = self.parameters['General']['ProjectileSpawnDistancePixels']
+        self.bounds = np.concatenate((self.shieldEllipses[:, :2] - self.shieldEllipses[:, 2:] - 2 * spawnDistance, self.shieldEllipses[:, :2] + self.shieldEllipses[:, 2:] + 2 * spawnDistance), axis = 1)
+        
+        
+        ###
+        # Outcome statistics
+        self.statistics = dict()
+        for shipKey in self.ships.keys():
+            self.statistics[shipKey] = {'ShotsFired': 0, 'ShotsBlocked': 0, 'Hits': 0, 'Fires': 0, 'Breaches': 0, 'OxygenMinimum': 100.}
+    
+    
+    ###
+    # Select the ship
+    def getShip(self, playerShip: bool) -> headlessShip.headlessShip:
+        return(self.ships['Player' if playerShip else 'Enemy'])
+    
+    
+    ###
+    # Open or close a door
+    def toggleDoor(self, playerShip: bool, doorKey: str) -> None:
+        shipKey = 'Player' if playerShip else 'Enemy'
+        
+        self.animations.startAnimation('Doors' if playerShip else 'EnemyDoors', doorKey, self.doorAnimations[shipKey][doorKey], True)
+    
+    
+    ###
+    # Change the power of a system
+    def addSystemPower(self, playerShip: bool, system: str) -> None:
+        if system == 'WeaponControl':
+            self.changeWeaponPower('Player' if playerShip else 'Enemy', True)
+        else:
+            self.getShip(playerShip).addSystemPower(system)
+        
+        self.getShip(playerShip).setCurrentMaxShieldSprite()
+    
+    
+    def removeSystemPower(self, playerShip: bool, system: str) -> None:
+        if system == 'WeaponControl':
+            self.changeWeaponPower('Player' if playerShip else 'Enemy', False)
+        else:
+            self.getShip(playerShip).removeSystemPower(system)
+        
+        self.getShip(playerShip).setCurrentMaxShieldSprite()
+    
+    
+    ###
+    # Damage a room
+    def damageToRoom(self, playerShip: bool, roomKey: int, damageSystem: int, damageHull: int) -> None:
+        self.getShip(playerShip).damageToRoom(roomKey, damageSystem, damageHull)
+    
+    
+    ###
+    # Add a weapon
+    def addWeapon(self, playerShip: bool, weaponName: str) -> None:
+        weapon = dict()
+        weapon['Name'] = weaponName
+        weapon['Parameters'] = self.parameters['Weapons'][weaponName]
+        weapon['Charge'] = 0
+        weapon['ShotsPending'] = 0
+        weapon['ShotTimer'] = 0
+        
+        self.weapons['Player' if playerShip else 'Enemy'].append(weapon)
+    
+    
+    ###
+    # Power of the weapons
+    def getWeaponPower(self, shipKey: str) -> int:
+        ship = self.ships[shipKey]
+        
+        # Current power, limited by the undamaged capacity of the weapon system
+        if 'WeaponControl' not in ship.systemsPresent:
+            return(0)
+        
+        return(min(ship.systems['WeaponControl']['PowerCurrent'], ship.systems['WeaponControl']['PowerMax'] - ship.systems['WeaponControl']['Damaged']))
+    
+    
+    def getPoweredWeapons(self, shipKey: str) -> List:
+        powerAvailable = self.getWeaponPower(shipKey)
+        
+        poweredWeapons = list()
+        for weapon in self.weapons[shipKey]:
+            poweredWeapons.append(bool(weapon['Parameters']['PowerNeeded'] <= powerAvailable))
+            
+            if poweredWeapons[-1]:
+                powerAvailable -= weapon['Parameters']['PowerNeeded']
+        
+        return(poweredWeapons)
+    
+    
+    def changeWeaponPower(self, shipKey: str, addPower: bool) -> None:
+        ship = self.ships[shipKey]
+        
+        if 'WeaponControl' not in ship.systemsPresent:
+            return
+        
+        system = ship.systems['WeaponControl']
+        
+        if system['Destroyed'] or system['IonCharges']:
+            logger.debug('Weapon system of the {} is destroyed or ionized'.format(shipKey))
+            return
+        
+        poweredWeapons = self.getPoweredWeapons(shipKey)
+        
+        ###
+        # Power for the next weapon
+        if addPower:
+            if all(poweredWeapons):
+                logger.debug('All weapons of the {} are powered'.format(shipKey))
+                return
+            
+            powerNecessary = self.weapons[shipKey][poweredWeapons.index(False)]['Parameters']['PowerNeeded']
+            
+            if system['PowerCurrent'] + powerNecessary > system['PowerMax'] - system['Damaged']:
+                logger.debug('Weapon system of the {} has no capacity for the next weapon'.format(shipKey))
+                return
+            
+            if ship.reactor['PowerAvailable'] < powerNecessary:
+                logger.debug('Not enough reactor power for the next weapon of the {}'.format(shipKey))
+                return
+            
+            # The backup battery is used first, like for all other systems
+            powerFromBackupBattery = min(ship.reactor['BackupPowerAvailable'], powerNecessary)
+            
+            ship.reactor['PowerAvailable'] -= powerNecessary - powerFromBackupBattery
+            ship.reactor['BackupPowerAvailable'] -= powerFromBackupBattery
+            
+            system['PowerCurrent'] += powerNecessary
+            system['PowerBackup'] += powerFromBackupBattery
+        
+        ###
+        # Power of the last powered weapon
+        else:
+            if not any(poweredWeapons):
+                logger.debug('No weapon of the {} is powered'.format(shipKey))
+                return
+            
+            lastPowered = len(poweredWeapons) - 1 - poweredWeapons[::-1].index(True)
+            powerToBeRemoved = min(self.weapons[shipKey][lastPowered]['Parameters']['PowerNeeded'], system['PowerCurrent'] - system['PowerZoltans'])
+            
+            # The backup battery gets its power back first
+            powerToBackupBattery = min(system['PowerBackup'], powerToBeRemoved)
+            
+            system['PowerCurrent'] -= powerToBeRemoved
+            system['PowerBackup'] -= powerToBackupBattery
+            
+            ship.reactor['PowerAvailable'] += powerToBeRemoved - powerToBackupBattery
+            ship.reactor['BackupPowerAvailable'] += powerToBackupBattery
+    
+    
+    ###
+    # Charge and fire the weapons
+    def updateWeapons(self, dt: int) -> None:
+        for shipKey, targetKey in (('Player', 'Enemy'), ('Enemy', 'Player')):
+            if not self.weapons[shipKey]:
+                continue
+            
+            powerAvailable = self.getWeaponPower(shipKey)
+            
+            for weapon in self.weapons[shipKey]:
+                weaponParameters = weapon['Parameters']
+                
+                ##
+                # Charge the powered weapons, unpowered weapons lose their charge
+                if weaponParameters['PowerNeeded'] <= powerAvailable:
+                    powerAvailable -= weaponParameters['PowerNeeded']
+                    
+                    if not weapon['ShotsPending']:
+                        weapon['Charge'] += dt
+                    
+                    # Start a volley once charged
+                    if weapon['Charge'] >= weaponParameters['CooldownSeconds'] * 1000:
+                        weapon['Charge'] = 0
+                        weapon['ShotsPending'] = weaponParameters['ShotsFired']
+                        weapon['ShotTimer'] = 0
+                    
+                else:
+                    weapon['Charge'] = max(weapon['Charge'] - dt * self.parameters['General']['WeaponDepowerRate'], 0)
+                
+                ##
+                # Fire the shots of the volley which are due
+                if weapon['ShotsPending']:
+                    weapon['ShotTimer'] -= dt
+                    while weapon['ShotsPending'] and (weapon['ShotTimer'] <= 0):
+                        self.fireShot(shipKey, targetKey, weapon['Name'])
+                        
+                        weapon['ShotsPending'] -= 1
+                        weapon['ShotTimer'] += weaponParameters['TimeBetweenShotsSeconds'] * 1000
+    
+    
+    ###
+    # Fire a single shot
+    def fireShot(self, shipKey: str, targetKey: str, weaponName: str) -> None:
+        weaponParameters = self.parameters['Weapons'][weaponName]
+        target = self.ships[targetKey]
+        
+        self.statistics[shipKey]['ShotsFired'] += 1
+        
+        # Aim at a random room
+        roomKey = target.presentRooms[self.rng.integers(len(target.presentRooms))]
+        
+        ##
+        # Shots without projectiles arrive at once
+        if not weaponParameters['Projectile']:
+            if not self.blockShot(shipKey, targetKey):
+                self.hitRoom(shipKey, targetKey, roomKey, weaponParameters)
+            
+            return
+        
+        ##
+        # The projectile appears outside the shields on the side of the firing ship and flies to the center of the room
+        roomRect = target.rooms[roomKey].rect
+        ellipse = self.shieldEllipses[self.shipKeys.index(targetKey)]
+        side = -1 if shipKey == 'Player' else 1
+        
+        position = np.array([ellipse[0] + side * (ellipse[2] + self.parameters['General']['ProjectileSpawnDistancePixels']), roomRect.centery])
+        
+        self.projectiles.spawn(weaponName, self.shipKeys.index(shipKey), position, np.array(roomRect.center), roomKey, np.array([roomRect.left, roomRect.top, roomRect.right - 1, roomRect.bottom - 1]), 
+                               weaponParameters['ProjectileSpeed'], weaponParameters['ProjectileRadiusPixels'], weaponParameters['ProjectileSpritesNumber'])
+    
+    
+    ###
+    # Move the projectiles and resolve the ones which arrived
+    def updateProjectiles(self, dt: int) -> None:
+        # Nothing flies most of the time
+        if not self.projectiles.active.any():
+            return
+        
+        shieldsUp = np.array([self.shieldLayers[shipKey] > 0 for shipKey in self.shipKeys])
+        
+        shieldCrossings, roomHits, lost = self.projectiles.update(dt, self.shieldEllipses, shieldsUp, self.bounds, self.parameters['General']['ProjectileFramesPerSecond'])
+        
+        ##
+        # Projectiles reaching raised shields, several of them may arrive in the same step
+        for slot in shieldCrossings:
+            shipKey = self.shipKeys[self.projectiles.owner[slot]]
+            
+            if self.blockShot(shipKey, self.shipKeys[1 - self.projectiles.owner[slot]]):
+                self.projectiles.release(slot)
+        
+        ##
+        # Projectiles arriving in their room
+        for slot in roomHits:
+            shipKey = self.shipKeys[self.projectiles.owner[slot]]
+            weaponParameters = self.parameters['Weapons'][self.projectiles.weaponNames[self.projectiles.weapon[slot]]]
+            
+            self.hitRoom(shipKey, self.shipKeys[1 - self.projectiles.owner[slot]], self.projectiles.targetRoom[slot], weaponParameters)
+    
+    
+    ###
+    # Shields take a shot
+    def blockShot(self, shipKey: str, targetKey: str) -> bool:
+        if self.shieldLayers[targetKey] <= 0:
+            return(False)
+        
+        self.shieldLayers[targetKey] -= 1
+        self.statistics[shipKey]['ShotsBlocked'] += 1
+        
+        return(True)
+    
+    
+    ###
+    # Damage a room by a shot
+    def hitRoom(self, shipKey: str, targetKey: str, roomKey: int, weaponParameters: Dict) -> None:
+        target = self.ships[targetKey]
+        statistics = self.statistics[shipKey]
+        
+        target.damageToRoom(roomKey, weaponParameters['DamageHull'], weaponParameters['DamageHull'])
+        statistics['Hits'] += 1
+        
+        # Damage to the shield system takes down layers
+        self.shieldLayers[targetKey] = min(self.shieldLayers[targetKey], target.currentMaxShieldStrength)
+        
+        if self.rng.random() < weaponParameters['FireChance']:
+            target.addFire(roomKey)
+            statistics['Fires'] += 1
+        
+        if self.rng.random() < weaponParameters['BreachChance']:
+            target.addBreach(roomKey)
+            statistics['Breaches'] += 1
+    
+    
+    ###
+    # Recharge the shields one layer after another
+    def updateShields(self, dt: int) -> None:
+        for shipKey, ship in self.ships.items():
+            if self.shieldLayers[shipKey] < ship.currentMaxShieldStrength:
+                self.shieldRecharge[shipKey] += dt
+                
+                if self.shieldRecharge[shipKey] >= self.parameters['General']['ShieldRechargeTimeSeconds'] * 1000:
+                    self.shieldLayers[shipKey] += 1
+                    self.shieldRecharge[shipKey] = 0
+            
+            else:
+                self.shieldLayers[shipKey] = ship.currentMaxShieldStrength
+                self.shieldRecharge[shipKey] = 0
+    
+    
+    ###
+    # Check whether a ship is destroyed
+    def isFinished(self) -> bool:
+        return(any(ship.hullPoints <= 0 for ship in self.ships.values()))
+    
+    
+    ###
+    # Winner of the battle
+    def getWinner(self) -> [None, str]:
+        playerDestroyed = self.ships['Player'].hullPoints <= 0
+        enemyDestroyed = self.ships['Enemy'].hullPoints <= 0
+        
+        if playerDestroyed and enemyDestroyed:
+            return('Draw')
+        elif enemyDestroyed:
+            return('Player')
+        elif playerDestroyed:
+            return('Enemy')
+        else:
+            return(None)
+    
+    
+    ###
+    # Advance by one time step
+    def step(self) -> None:
+        gameLoop.simulationStep(self.ships['Player'], self.ships['Enemy'], self.animations, self.timeStep, self.profiler)
+        
+        self.updateWeapons(self.timeStep)
+        self.updateProjectiles(self.timeStep)
+        self.updateShields(self.timeStep)
+        
+        # The lowest oxygen level can only change if the oxygen changed in this step
+        for shipKey, ship in self.ships.items():
+            if ship.oxygenChanged:
+                self.statistics[shipKey]['OxygenMinimum'] = min(self.statistics[shipKey]['OxygenMinimum'], float(ship.oxygenLevels.min()))
+        
+        self.time += self.timeStep
+    
+    
+    ###
+    # Advance by the given time in milliseconds
+    def run(self, duration: int, stopWhenFinished: bool = True) -> int:
+        steps = 0
+        while steps * self.timeStep < duration:
+            if stopWhenFinished and self.isFinished():
+                break
+            
+            self.step()
+            steps += 1
+        
+        return(steps)
+    
+    
+    ###
+    # Current state of the battle
+    def getState(self) -> Dict:
+        state = dict()
+        state['Time'] = self.time
+        state['Projectiles'] = self.projectiles.getActive().shape[0]
+        
+        for shipKey, ship in self.ships.items():
+            state[shipKey] = dict()
+            state[shipKey]['HullPoints'] = ship.hullPoints
+            state[shipKey]['Oxygen'] = {roomKey: ship.oxygenLevels[index] for roomKey, index in ship.oxygenRoomIndex.items()}
+            state[shipKey]['SystemPower'] = {system: ship.systems[system]['PowerCurrent'] for system in ship.systemsPresent}
+            state[shipKey]['SystemDamage'] = {system: ship.systems[system]['Damaged'] for system in ship.systemsPresent}
+            state[shipKey]['PowerAvailable'] = ship.reactor['PowerAvailable']
+            state[shipKey]['ShieldStrength'] = ship.currentMaxShieldStrength
+            state[shipKey]['ShieldLayers'] = self.shieldLayers[shipKey]
+            state[shipKey]['Breaches'] = len(ship.breachedRooms)
+        
+        return(state)
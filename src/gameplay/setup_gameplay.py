@@ -12,7 +12,7 @@
 import logging
 
 # Typing
-from typing import Dict
+from typing import Callable, Dict
 
 # Pygame
 import pygame
@@ -48,6 +48,12 @@ import src.classes.sprites.weapon_sprites as weaponSprites
 
 import src.classes.sprites.main_box_ui_sprites as mainBoxUiSprites
 
+# Sprite cache
+import src.classes.setup.sprite_cache as spriteCache
+
+# Decoding of the images on worker threads
+import src.classes.setup.asset_pipeline as assetPipeline
+
 # Animation control objects
 import src.classes.animations.animation_doors as animationDoors
 
@@ -159,10 +165,13 @@ def screenSetup(parameters: Dict) -> pygame.Surface:
 
 ##
 # Function to load all the sprites
-def loadAllSprites(parameters: Dict) -> Dict:
+def loadAllSprites(parameters: Dict, progressCallback: [None, Callable] = None) -> Dict:
     """
     
     Function to load in the sprites needed throughout the game.
+    The images of all sprite objects without a valid sprite cache entry are requested from the asset pipeline at once, so they are decoded on the worker threads while the sprites are created.
+    The images are known from the parameters (getImagePaths of the sprite modules), images loaded on the last start which are not listed there are requested from the manifest as well.
+    progressCallback(decoded [int], requested [int]) is called while the images are decoded, see createLoadingProgressCallback.
     
     """
     
@@ -170,8 +179,33 @@ def loadAllSprites(parameters: Dict) -> Dict:
     
     
     ###
-    # Initialize the dictionary for the sprites
+    # Initialize the dictionary for the sprites, every sprite object is read from the sprite cache if it has a valid entry
+    # The ship sprites are loaded per ship when a ship is set up, they store their sprite groups in the cache themselves
     sprites = dict()
+    cache = spriteCache.spriteCache(parameters)
+    assets = assetPipeline.assetPipeline(parameters, progressCallback)
+    
+    spriteModules = dict()
+    spriteModules['GeneralShip'] = generalShipSprites
+    spriteModules['EnemyUi'] = enemyShipUiSprites
+    spriteModules['EnergyUi'] = energyUiSprites
+    spriteModules['Weapons'] = weaponSprites
+    spriteModules['MainBoxUi'] = mainBoxUiSprites
+    
+    spriteObjects = dict()
+    spriteObjects['GeneralShip'] = generalShipSprites.generalShipSprites
+    spriteObjects['EnemyUi'] = enemyShipUiSprites.enemyShipUiSprites
+    spriteObjects['EnergyUi'] = energyUiSprites.energyUiSprites
+    spriteObjects['Weapons'] = weaponSprites.weaponSprites
+    spriteObjects['MainBoxUi'] = mainBoxUiSprites.mainBoxUiSprites
+    
+    
+    ###
+    # Start decoding the images of all sprite objects which have to be created, also on the first start without a manifest
+    for name in spriteObjects.keys():
+        if not cache.isValid(name):
+            assets.requestImages(spriteModules[name].getImagePaths(parameters))
+            assets.requestManifest(name)
     
     
     ###
@@ -179,31 +213,22 @@ def loadAllSprites(parameters: Dict) -> Dict:
     
     ##
     # Load player ship sprites
-    sprites['PlayerShip'] = playerShipSprites.playerShipSprites(parameters)
+    sprites['PlayerShip'] = playerShipSprites.playerShipSprites(parameters, cache, assets)
     
-    ##
-    # Load general ship sprites
-    sprites['GeneralShip'] = generalShipSprites.generalShipSprites(parameters)
-
     ##
     # Load player ship sprites
-    sprites['EnemyShip'] = enemyShipSprites.enemyShipSprites(parameters)
+    sprites['EnemyShip'] = enemyShipSprites.enemyShipSprites(parameters, cache, assets)
     
     ##
-    # Load enemy ship ui elements
-    sprites['EnemyUi'] = enemyShipUiSprites.enemyShipUiSprites(parameters)
-
-    ##
-    # Load all energy ui elements
-    sprites['EnergyUi'] = energyUiSprites.energyUiSprites(parameters)
+    # Load the general ship sprites, the enemy ship ui elements, all energy ui elements, all weapon and projectile sprites, and the main box and text parameters
+    for name, spriteObject in spriteObjects.items():
+        sprites[name] = assets.load(name, lambda: cache.get(name, lambda: spriteObject(parameters)))
     
-    ##
-    # Load all weapon and projectile sprites
-    sprites['Weapons'] = weaponSprites.weaponSprites(parameters)
     
-    ##
-    # Load the main box and text parameters
-    sprites['MainBoxUi'] = mainBoxUiSprites.mainBoxUiSprites(parameters)
+    ###
+    # Remember the loaded images for the next start
+    assets.discardPending()
+    assets.saveManifest()
     
     
     ###
@@ -211,6 +236,30 @@ def loadAllSprites(parameters: Dict) -> Dict:
     return(sprites)
 
 
+##
+# Function to show the progress of the loading
+def createLoadingProgressCallback(screen: pygame.Surface, parameters: Dict) -> Callable:
+    """
+    
+    Returns a function which draws a loading bar with the number of decoded and requested images onto the screen, to be used as progress callback of the asset pipeline.
+    
+    """
+    
+    barRect = pygame.Rect(parameters['General']['LoadingBarRect'])
+    
+    def drawLoadingProgress(decoded: int, requested: int) -> None:
+        # Keep the window responsive
+        pygame.event.pump()
+        
+        pygame.draw.rect(screen, parameters['Colors']['Grey2'], barRect)
+        if requested:
+            pygame.draw.rect(screen, parameters['Colors']['Grey1'], (barRect.x, barRect.y, int(barRect.width * min(decoded / requested, 1)), barRect.height))
+        
+        pygame.display.update(barRect)
+    
+    return(drawLoadingProgress)
+
+
 ##
 # Function to load all the animation controls
 def loadAllAnimations(parameters: Dict, ship: [playerShip.playerShip]) -> Dict:
@@ -0,0 +1,194 @@
+###
+#
+# Define a class which measures the time spent in the individual phases of the gameplay loop
+#
+###
+
+
+###
+# Load packages
+
+# Logging
+import logging
+
+# Typing
+from typing import Dict, List
+
+# Timing
+import time
+
+# Writing trace files
+import json
+
+# Arrays and matrices
+import numpy as np
+
+
+###
+# Setup logging
+logger = logging.getLogger(__name__)
+
+
+###
+# Define the frame profiler class
+class frameProfiler(object):
+    """
+    
+    Measures the time of each phase of the last frames in a ring buffer. Phases are consecutive: lap(phaseName) assigns the time since the last lap (or the start of the frame) to the phase.
+    Rolling statistics are calculated from the buffer on request and the buffered frames can be written as Chrome trace file (viewable in chrome://tracing or ui.perfetto.dev).
+    If the profiler is disabled all methods return immediately.
+    
+    Init:
+        - phaseNames [List]: Names of the phases in the order in which they usually occur
+        - bufferSize [int]: Number of frames kept in the ring buffer
+        - enabled [bool]: Whether the timing is active
+    
+    Fields:
+        - phaseNames [List]: Names of the phases
+        - phaseIndex [Dict]: Mapping phase name:column in the buffers
+        - bufferSize [int]: Number of frames kept in the ring buffer
+        - enabled [bool]: Whether the timing is active
+        - phaseDurations [np.ndarray]: Duration of the phases in milliseconds, one row per frame
+        - phaseStarts [np.ndarray]: Start of the phases in milliseconds relative to the start of the frame, one row per frame (-1 if the phase did not occur)
+        - frameStarts [np.ndarray]: Start of the frames in seconds (time.perf_counter)
+        - currentFrame [int]: Row of the buffers the running frame is written to
+        - framesRecorded [int]: Number of complete frames in the buffer
+    
+    Methods:
+        - startFrame(): Start timing a new frame
+        - lap(phaseName [str]): Assign the time since the last lap to the phase
+        - endFrame(): Finish the running frame
+        - getFrameDurations(): Returns the phase durations of the buffered frames in milliseconds, oldest frame first
+        - getPercentiles(percentiles [List]): Returns the percentiles of the phase and frame durations over the buffered frames
+        - getSummary(percentiles [List]): Returns the percentiles as a string for logging
+        - dumpChromeTrace(filePath [str]): Write the buffered frames as Chrome trace file
+    
+    """
+    
+    
+    ###
+    # Initialization
+    def __init__(self, phaseNames: List, bufferSize: int, enabled: bool = True) -> None:
+        logger.debug('Initialize the frame profiler')
+        
+        self.phaseNames = list(phaseNames)
+        self.phaseIndex = {phaseName: index for index, phaseName in enumerate(self.phaseNames)}
+        self.bufferSize = bufferSize
+        self.enabled = enabled
+        
+        ###
+        # Ring buffers
+        self.phaseDurations = np.zeros((self.bufferSize, len(self.phaseNames)))
+        self.phaseStarts = -np.ones((self.bufferSize, len(self.phaseNames)))
+        self.frameStarts = np.zeros(self.bufferSize)
+        
+        self.currentFrame = 0
+        self.framesRecorded = 0
+        
+        self.lastLap = time.perf_counter()
+    
+    
+    ###
+    # Start a new frame
+    def startFrame(self) -> None:
+        if not self.enabled:
+            return
+        
+        self.lastLap = time.perf_counter()
+        
+        self.frameStarts[self.currentFrame] = self.lastLap
+        self.phaseDurations[self.currentFrame] = 0
+        self.phaseStarts[self.currentFrame] = -1
+    
+    
+    ###
+    # Assign the time since the last lap to a phase
+    def lap(self, phaseName: str) -> None:
+        if not self.enabled:
+            return
+        
+        currentTime = time.perf_counter()
+        index = self.phaseIndex[phaseName]
+        
+        # Phases occurring multiple times per frame are added up and start with their first occurrence
+        if self.phaseStarts[self.currentFrame, index] < 0:
+            self.phaseStarts[self.currentFrame, index] = (self.lastLap - self.frameStarts[self.currentFrame]) * 1000
+        
+        self.phaseDurations[self.currentFrame, index] += (currentTime - self.lastLap) * 1000
+        self.lastLap = currentTime
+    
+    
+    ###
+    # Finish the frame and move on to the next row of the buffer
+    def endFrame(self) -> None:
+        if not self.enabled:
+            return
+        
+        self.currentFrame = (self.currentFrame + 1) % self.bufferSize
+        self.framesRecorded = min(self.framesRecorded + 1, self.bufferSize)
+    
+    
+    ###
+    # Row indices of the complete frames in the buffer, oldest frame first
+    def getBufferedRows(self) -> np.ndarray:
+        return((np.arange(self.currentFrame - self.framesRecorded, self.currentFrame)) % self.bufferSize)
+    
+    
+    ###
+    # Durations of the buffered frames
+    def getFrameDurations(self) -> np.ndarray:
+        return(self.phaseDurations[self.getBufferedRows()])
+    
+    
+    ###
+    # Rolling percentiles of all phases and the complete frame
+    def getPercentiles(self, percentiles: List = [50, 95, 99]) -> Dict:
+        frameDurations = self.getFrameDurations()
+        if not frameDurations.shape[0]:
+            return(dict())
+        
+        phasePercentiles = np.percentile(frameDurations, percentiles, axis = 0)
+        framePercentiles = np.percentile(frameDurations.sum(axis = 1), percentiles)
+        
+        results = dict()
+        for phaseName, index in self.phaseIndex.items():
+            results[phaseName] = {'P' + str(percentile): phasePercentiles[i, index] for i, percentile in enumerate(percentiles)}
+        
+        results['Frame'] = {'P' + str(percentile): framePercentiles[i] for i, percentile in enumerate(percentiles)}
+        
+        return(results)
+    
+    
+    ###
+    # Percentiles as string for logging
+    def getSummary(self, percentiles: List = [50, 95]) -> str:
+        results = self.getPercentiles(percentiles)
+        
+        summary = list()
+        for phaseName, phaseResults in results.items():
+            summary.append('{phase} {values}'.format(phase = phaseName, values = '/'.join(['{:.2f}'.format(value) for value in phaseResults.values()])))
+        
+        return('Phase times in ms (p{percentiles}) over {frames} frames: {summary}'.format(percentiles = '/p'.join([str(percentile) for percentile in percentiles]), frames = self.framesRecorded, summary = ', '.join(summary)))
+    
+    
+    ###
+    # Write the buffered frames as Chrome trace file
+    def dumpChromeTrace(self, filePath: str) -> None:
+        logger.info('Write the last {frames} frames to the trace file {filePath}'.format(frames = self.framesRecorded, filePath = filePath))
+        
+        ###
+        # One complete event (ph X) per frame and per phase, times in microseconds
+        traceEvents = list()
+        for row in self.getBufferedRows():
+            frameStart = self.frameStarts[row] * 1e6
+            traceEvents.append({'name': 'Frame', 'ph': 'X', 'pid': 0, 'tid': 0, 'ts': frameStart, 'dur': self.phaseDurations[row].sum() * 1000})
+            
+            for phaseName, index in self.phaseIndex.items():
+                if self.phaseStarts[row, index] >= 0:
+                    traceEvents.append({'name': phaseName, 'ph': 'X', 'pid': 0, 'tid': 1, 'ts': frameStart + self.phaseStarts[row, index] * 1000, 'dur': self.phaseDurations[row, index] * 1000})
+        
+        
+        ###
+        # Write the file
+        with open(filePath, 'w') as traceFile:
+            json.dump({'traceEvents': traceEvents, 'displayTimeUnit': 'ms'}, traceFile)
@@ -14,6 +14,9 @@ from typing import Tuple, List, Dict
 # Pygame
 import pygame
 
+# Arrays
+import numpy as np
+
 
 ###
 # Functions
@@ -32,6 +35,91 @@ def copySprite(sprite: pygame.sprite.Sprite) -> pygame.sprite.Sprite:
     return(newSprite)
 
 
+##
+# Function to create a sprite which shows the same image as the given sprite but has its own rect. The image must not be drawn onto
+def referenceSprite(sprite: pygame.sprite.Sprite) -> pygame.sprite.Sprite:
+    # Create sprite
+    newSprite = pygame.sprite.Sprite()
+    
+    # Reference the image, copy the rect
+    newSprite.image = sprite.image
+    newSprite.rect = sprite.rect.copy()
+    
+    # Return sprite
+    return(newSprite)
+
+
+##
+# Function to copy a region of a surface into the same region of another surface without any blending
+def copySurfaceRegion(targetSurface: pygame.Surface, sourceSurface: pygame.Surface, rect: pygame.Rect) -> None:
+    # Color values
+    targetPixels = pygame.surfarray.pixels3d(targetSurface)
+    targetPixels[rect.left:rect.right, rect.top:rect.bottom] = pygame.surfarray.pixels3d(sourceSurface)[rect.left:rect.right, rect.top:rect.bottom]
+    del targetPixels
+    
+    # Alpha values
+    targetAlpha = pygame.surfarray.pixels_alpha(targetSurface)
+    targetAlpha[rect.left:rect.right, rect.top:rect.bottom] = pygame.surfarray.pixels_alpha(sourceSurface)[rect.left:rect.right, rect.top:rect.bottom]
+    del targetAlpha
+
+
+##
+# Function to merge overlapping rects into a minimal list of non-overlapping rects
+def mergeRects(rects: List) -> List:
+    ###
+    # Go through all rects and combine them with every overlapping rect found so far
+    mergedRects = list()
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        
+        # Skip empty rects
+        if not (rect.w and rect.h):
+            continue
+        
+        # Merge until no more overlap is found (a merged rect can overlap with rects which were separate before)
+        overlapIndex = rect.collidelist(mergedRects)
+        while overlapIndex >= 0:
+            rect.union_ip(mergedRects.pop(overlapIndex))
+            overlapIndex = rect.collidelist(mergedRects)
+        
+        mergedRects.append(rect)
+    
+    
+    ###
+    # Return
+    return(mergedRects)
+
+
+##
+# Function to create the collision data of a shield image
+def createShieldCollision(image: pygame.Surface) -> Dict:
+    """
+    
+    Create the hit geometry of a shield image, all coordinates are relative to the topleft corner of the image:
+        - Ellipse [np.array]: Center x, center y, semi-axis x, semi-axis y of the ellipse bounding the opaque part of the image
+        - Mask [pygame.mask.Mask]: Opaque pixels of the image
+    
+    """
+    
+    mask = pygame.mask.from_surface(image)
+    
+    boundingRects = mask.get_bounding_rects()
+    if len(boundingRects):
+        boundingRect = boundingRects[0].unionall(boundingRects[1:])
+    else:
+        boundingRect = image.get_rect()
+    
+    return({'Ellipse': np.array([boundingRect.centerx, boundingRect.centery, boundingRect.w / 2, boundingRect.h / 2], dtype = float), 'Mask': mask})
+
+
+##
+# Function to scale the collision data of a shield image to a new image size
+def scaleShieldCollision(shieldCollision: Dict, size: Tuple) -> Dict:
+    scale = np.array(size) / np.array(shieldCollision['Mask'].get_size())
+    
+    return({'Ellipse': shieldCollision['Ellipse'] * np.tile(scale, 2), 'Mask': shieldCollision['Mask'].scale(tuple(int(value) for value in size))})
+
+
 ##
 # Function for color interpolation
 def colorInterpolation(farbe1: [Tuple, List], farbe2: [Tuple, List], rho: float) -> Tuple:
@@ -0,0 +1,182 @@
+###
+#
+# Define a class which finds the clickable elements under a point on the screen
+#
+###
+
+
+###
+# Load packages
+
+# Logging
+import logging
+
+# Typing
+from typing import Dict, List, Tuple
+
+
+###
+# Setup logging
+logger = logging.getLogger(__name__)
+
+
+###
+# Define the hit test registry class
+class hitTestRegistry(object):
+    """
+    
+    Registry of all clickable elements (doors, system symbols, rooms, later crew and weapons) in a uniform grid over the screen.
+    Every target is stored in all grid cells its bounding box touches, so a point only has to be checked against the few targets of its cell.
+    Targets are either rects (inclusive of the first and exclusive of the last pixel, like pygame.Rect) or circles given by a center and a maximal distance.
+    Targets are identified by their group (e.g. 'Doors') and their key within the group (e.g. the doorKey). Groups with a higher priority are returned first.
+    
+    Init:
+        - cellSize [int]: Edge length of the grid cells in pixels
+        - priorities [Dict]: Priority of every group, groups which are not listed have priority 0
+    
+    Fields:
+        - cellSize [int]: Edge length of the grid cells in pixels
+        - priorities [Dict]: Priority of every group
+        - targets [Dict]: Bounding box (x1, y1, x2, y2, inclusive) and circle (center x, center y, max distance, None for rects) of every target by (group, key)
+        - targetCells [Dict]: Grid cells of every target by (group, key)
+        - cells [Dict]: Targets in every grid cell as list ordered by priority, by cell (x, y)
+    
+    Methods:
+        - addRect(group [str], key, rect [Tuple]): Add or replace a rectangular target given as (x, y, width, height)
+        - addCircle(group [str], key, center [Tuple], maxDistance [int, float]): Add or replace a target hit within maxDistance of center
+        - remove(group [str], key): Remove a target
+        - removeGroup(group [str]): Remove all targets of a group
+        - getTarget(position [Tuple]): Returns the (group, key) of the target with the highest priority at the position, None if there is none
+        - getTargets(position [Tuple]): Returns the (group, key) of all targets at the position, ordered by priority
+        - getTargetsInRect(rect [Tuple], groups [None, List]): Returns the (group, key) of all targets whose bounding box intersects the rect given as (x, y, width, height), optionally only of the given groups
+    
+    Auxiliary methods (called internally):
+        - addTarget(group [str], key, boundingBox [Tuple], circle [None, Tuple]): Store a target in all grid cells touched by its bounding box
+        - isHit(target [Tuple], x [int], y [int]): Check whether the target contains the point
+    
+    """
+    
+    
+    ###
+    # Initialization
+    def __init__(self, cellSize: int, priorities: Dict) -> None:
+        self.cellSize = cellSize
+        self.priorities = priorities
+        
+        self.targets = dict()
+        self.targetCells = dict()
+        self.cells = dict()
+    
+    
+    ###
+    # Add targets
+    def addRect(self, group: str, key, rect: Tuple) -> None:
+        x, y, width, height = [int(value) for value in rect]
+        
+        self.addTarget(group, key, (x, y, x + width - 1, y + height - 1), None)
+    
+    
+    def addCircle(self, group: str, key, center: Tuple, maxDistance: [int, float]) -> None:
+        x, y = [int(value) for value in center]
+        
+        self.addTarget(group, key, (x - int(maxDistance), y - int(maxDistance), x + int(maxDistance), y + int(maxDistance)), (x, y, maxDistance))
+    
+    
+    ###
+    # Store a target in all cells touched by its bounding box
+    def addTarget(self, group: str, key, boundingBox: Tuple, circle: [None, Tuple]) -> None:
+        if (group, key) in self.targets:
+            self.remove(group, key)
+        
+        if (boundingBox[2] < boundingBox[0]) or (boundingBox[3] < boundingBox[1]):
+            return
+        
+        self.targets[(group, key)] = (boundingBox, circle)
+        self.targetCells[(group, key)] = list()
+        
+        for cellX in range(boundingBox[0] // self.cellSize, boundingBox[2] // self.cellSize + 1):
+            for cellY in range(boundingBox[1] // self.cellSize, boundingBox[3] // self.cellSize + 1):
+                cellTargets = self.cells.setdefault((cellX, cellY), list())
+                
+                # Keep the cell ordered by priority, targets of the same priority in the order they were added
+                cellTargets.append((group, key))
+                cellTargets.sort(key = lambda target: -self.priorities.get(target[0], 0))
+                
+                self.targetCells[(group, key)].append((cellX, cellY))
+    
+    
+    ###
+    # Remove targets
+    def remove(self, group: str, key) -> None:
+        if (group, key) not in self.targets:
+            return
+        
+        for cell in self.targetCells.pop((group, key)):
+            self.cells[cell].remove((group, key))
+            
+            if not self.cells[cell]:
+                del self.cells[cell]
+        
+        del self.targets[(group, key)]
+    
+    
+    def removeGroup(self, group: str) -> None:
+        for target in [target for target in self.targets.keys() if target[0] == group]:
+            self.remove(*target)
+    
+    
+    ###
+    # Check whether a target contains the point
+    def isHit(self, target: Tuple, x: int, y: int) -> bool:
+        boundingBox, circle = self.targets[target]
+        
+        if not ((boundingBox[0] <= x <= boundingBox[2]) and (boundingBox[1] <= y <= boundingBox[3])):
+            return(False)
+        
+        if circle is None:
+            return(True)
+        
+        return((x - circle[0])**2 + (y - circle[1])**2 <= circle[2]**2)
+    
+    
+    ###
+    # Targets at a point
+    def getTarget(self, position: Tuple) -> [None, Tuple]:
+        x, y = int(position[0]), int(position[1])
+        
+        for target in self.cells.get((x // self.cellSize, y // self.cellSize), list()):
+            if self.isHit(target, x, y):
+                return(target)
+        
+        return(None)
+    
+    
+    def getTargets(self, position: Tuple) -> List:
+        x, y = int(position[0]), int(position[1])
+        
+        return([target for target in self.cells.get((x // self.cellSize, y // self.cellSize), list()) if self.isHit(target, x, y)])
+    
+    
+    ###
+    # Targets inside a rect, e.g. for a selection box
+    def getTargetsInRect(self, rect: Tuple, groups: [None, List] = None) -> List:
+        x, y, width, height = [int(value) for value in rect]
+        x1, y1, x2, y2 = min(x, x + width), min(y, y + height), max(x, x + width) - 1, max(y, y + height) - 1
+        
+        foundTargets = list()
+        checkedTargets = set()
+        for cellX in range(x1 // self.cellSize, x2 // self.cellSize + 1):
+            for cellY in range(y1 // self.cellSize, y2 // self.cellSize + 1):
+                for target in self.cells.get((cellX, cellY), list()):
+                    if (target in checkedTargets) or ((groups is not None) and (target[0] not in groups)):
+                        continue
+                    
+                    checkedTargets.add(target)
+                    
+                    boundingBox = self.targets[target][0]
+                    if (boundingBox[0] <= x2) and (x1 <= boundingBox[2]) and (boundingBox[1] <= y2) and (y1 <= boundingBox[3]):
+                        foundTargets.append(target)
+        
+        foundTargets.sort(key = lambda target: -self.priorities.get(target[0], 0))
+        
+        return(foundTargets)
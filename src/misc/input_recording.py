@@ -0,0 +1,218 @@
+###
+#
+# Classes to record the input events of a gameplay session to a binary file and to replay them
+#
+###
+
+
+###
+# Load packages
+
+# Logging
+import logging
+
+# Typing
+from typing import List
+
+# Binary file format
+import struct
+
+# Pygame
+import pygame
+
+
+###
+# Setup logging
+logger = logging.getLogger(__name__)
+
+
+###
+# File format
+#
+# Header: magic, file version, simulation time step in milliseconds
+# Records: frame of the gameplay loop, simulation tick (number of simulation steps run before the frame), event type, button or key, x and y position of the mouse
+# The last record has the type End and the tick at which the recording was stopped
+recordingMagic = b'FTLINPUT'
+recordingVersion = 1
+
+headerStruct = struct.Struct('<8sHH')
+recordStruct = struct.Struct('<IIBihh')
+
+# Event types in the file, mouse motion is not recorded as the gameplay loop does not use it
+recordEnd = 0
+recordTypes = {pygame.QUIT: 1, pygame.MOUSEBUTTONDOWN: 2, pygame.MOUSEBUTTONUP: 3, pygame.KEYDOWN: 4, pygame.KEYUP: 5}
+recordTypesInverse = {recordType: eventType for eventType, recordType in recordTypes.items()}
+
+
+###
+# Define the recorder class
+class inputRecorder(object):
+    """
+    
+    Writes the input events used by the gameplay loop to a binary file, together with the frame and the simulation tick at which they were processed.
+    Keyboard events are stored with the mouse position at the time they were processed, as the gameplay loop uses it for key presses.
+    
+    Init:
+        - filePath [str]: File to write to
+        - simulationTimeStep [int]: Time step of the simulation in milliseconds, stored in the header
+    
+    Fields:
+        - filePath [str]: File to write to
+        - recordingFile [file]: Open file
+        - frame [int]: Frame counter, increased on every call of record()
+        - recordedEvents [int]: Number of recorded events
+    
+    Methods:
+        - record(tick [int], events [List]): Record the events of a frame processed at the given simulation tick
+        - close(tick [int]): Write the end of the recording and close the file
+    
+    """
+    
+    
+    ###
+    # Initialization
+    def __init__(self, filePath: str, simulationTimeStep: int) -> None:
+        logger.info('Record the input to {}'.format(filePath))
+        
+        self.filePath = filePath
+        self.recordingFile = open(self.filePath, 'wb')
+        self.recordingFile.write(headerStruct.pack(recordingMagic, recordingVersion, simulationTimeStep))
+        
+        self.frame = 0
+        self.recordedEvents = 0
+    
+    
+    ###
+    # Record the events of a frame
+    def record(self, tick: int, events: List) -> None:
+        for event in events:
+            if event.type not in recordTypes:
+                continue
+            
+            if event.type in [pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP]:
+                code = event.button
+                position = event.pos
+            elif event.type in [pygame.KEYDOWN, pygame.KEYUP]:
+                code = event.key
+                position = pygame.mouse.get_pos()
+            else:
+                code = 0
+                position = (0, 0)
+            
+            self.recordingFile.write(recordStruct.pack(self.frame, tick, recordTypes[event.type], code, position[0], position[1]))
+            self.recordedEvents += 1
+        
+        self.frame += 1
+    
+    
+    ###
+    # Finish the recording
+    def close(self, tick: int) -> None:
+        if self.recordingFile.closed:
+            return
+        
+        logger.info('Recorded {events} input events over {ticks} simulation steps to {filePath}'.format(events = self.recordedEvents, ticks = tick, filePath = self.filePath))
+        
+        self.recordingFile.write(recordStruct.pack(self.frame, tick, recordEnd, 0, 0, 0))
+        self.recordingFile.close()
+
+
+###
+# Define the replay class
+class inputReplay(object):
+    """
+    
+    Reads a recording written by inputRecorder and returns its events as pygame events at the simulation ticks they were recorded at.
+    Events recorded in the same frame are returned together, events of different frames at the same tick (e.g. while paused) are returned in separate frames.
+    Keyboard events carry the recorded mouse position in the field pos.
+    
+    Init:
+        - filePath [str]: Recording to read
+    
+    Fields:
+        - filePath [str]: Recording to read
+        - simulationTimeStep [int]: Time step of the simulation in milliseconds the recording was made with
+        - frames [List]: Recorded frames as tuples (tick, list of pygame events), in recording order
+        - nextFrame [int]: Index of the next frame to return
+        - endTick [int]: Simulation tick at which the recording was stopped
+    
+    Methods:
+        - hasEvents(tick [int]): Returns whether the next recorded frame is due at the given tick
+        - getEvents(tick [int]): Returns the events of the next recorded frame if it is due at the given tick, otherwise an empty list
+        - isFinished(tick [int]): Returns whether all frames were returned and the end of the recording is reached
+    
+    """
+    
+    
+    ###
+    # Initialization
+    def __init__(self, filePath: str) -> None:
+        logger.info('Replay the input from {}'.format(filePath))
+        
+        self.filePath = filePath
+        
+        with open(self.filePath, 'rb') as recordingFile:
+            data = recordingFile.read()
+        
+        
+        ###
+        # Header
+        magic, version, self.simulationTimeStep = headerStruct.unpack_from(data, 0)
+        if (magic != recordingMagic) or (version != recordingVersion):
+            raise ValueError('{} is not an input recording of version {}'.format(self.filePath, recordingVersion))
+        
+        
+        ###
+        # Group the events by frame
+        self.frames = list()
+        self.endTick = 0
+        
+        lastFrame = None
+        for frame, tick, recordType, code, x, y in recordStruct.iter_unpack(data[headerStruct.size:]):
+            if recordType == recordEnd:
+                self.endTick = tick
+                break
+            
+            eventType = recordTypesInverse[recordType]
+            if eventType in [pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP]:
+                event = pygame.event.Event(eventType, button = code, pos = (x, y))
+            elif eventType in [pygame.KEYDOWN, pygame.KEYUP]:
+                event = pygame.event.Event(eventType, key = code, pos = (x, y))
+            else:
+                event = pygame.event.Event(eventType)
+            
+            if frame != lastFrame:
+                self.frames.append((tick, list()))
+                lastFrame = frame
+            
+            self.frames[-1][1].append(event)
+        
+        else:
+            logger.warning('Recording {} has no end, it was probably not closed properly'.format(self.filePath))
+            self.endTick = self.frames[-1][0] if len(self.frames) else 0
+        
+        self.nextFrame = 0
+    
+    
+    ###
+    # Check whether the next frame is due
+    def hasEvents(self, tick: int) -> bool:
+        return((self.nextFrame < len(self.frames)) and (self.frames[self.nextFrame][0] <= tick))
+    
+    
+    ###
+    # Events of the next frame if it is due
+    def getEvents(self, tick: int) -> List:
+        if not self.hasEvents(tick):
+            return(list())
+        
+        events = self.frames[self.nextFrame][1]
+        self.nextFrame += 1
+        
+        return(events)
+    
+    
+    ###
+    # Check whether the replay is over
+    def isFinished(self, tick: int) -> bool:
+        return((self.nextFrame >= len(self.frames)) and (tick >= self.endTick))
@@ -48,6 +48,21 @@ def loadGeneralParameters() -> Dict:
     
     generalParameters['MaxFramerate'] = 60
     generalParameters['UpdateFramerateDisplay'] = 1000
+    
+    generalParameters['SimulationTimeStep'] = 10    # Fixed time step of the simulation in milliseconds, independent of the framerate
+    generalParameters['MaxSimulationStepsPerFrame'] = 5  # Maximum number of simulation steps run before a frame is drawn
+    generalParameters['MaxSkippedRenderFrames'] = 2 # Maximum number of frames in a row which are not drawn if the simulation falls behind
+    
+    generalParameters['DirtyRectRendering'] = True  # Only redraw the screen regions which changed since the last frame
+    
+    generalParameters['RoomImageCacheSize'] = 2000   # Maximum number of rendered room images shared between all rooms of all ships
+    generalParameters['DoorImageCacheSize'] = 500    # Maximum number of rendered door images shared between all doors of all ships
+    generalParameters['EnergyUiCacheSize'] = 200     # Maximum number of power states for which the energy ui sprites are kept
+    
+    generalParameters['FrameProfiler'] = True   # Record the time of each phase of the gameplay loop
+    generalParameters['FrameProfilerBufferSize'] = 600  # Number of frames kept for the statistics and the trace file
+    generalParameters['FrameProfilerTraceFile'] = 'frame_trace_{time}.json'    # Trace file written on pressing F12, viewable in chrome://tracing
+    generalParameters['InputRecordingFile'] = 'input_recording_{time}.bin'     # Default file for recording the input of a session
 
     generalParameters['PositionOffsetFight'] = np.array([450, int(generalParameters['DisplayHeight'] / 2)])
     generalParameters['PositionOffsetIdle'] = np.array([int(generalParameters['DisplayWidth'] / 2), int(generalParameters['DisplayHeight'] / 2)])
@@ -58,13 +73,20 @@ def loadGeneralParameters() -> Dict:
     ##
     # Paths to datafiles
     generalParameters['PathFolderResources'] = 'data/ftldata/'
+    generalParameters['PathFtlDat'] = 'data/ftl.dat'    # Resources are read directly from this archive if it exists, otherwise from the unpacked PathFolderResources
     generalParameters['PathFoldersBackgroundPictures'] = ['data/images/background']
+    generalParameters['SpriteCache'] = True    # Store the loaded and derived sprites on disk and reuse them on the next start
+    generalParameters['SpriteCacheFolder'] = 'data/sprite_cache/'    # Folder of the sprite cache, entries are replaced if the images, the sprite code or the parameters change
+    generalParameters['ShipSpritesEvictUnused'] = True     # Free the sprites of a ship when no ship on screen uses them anymore
+    generalParameters['AssetPipelineWorkers'] = None     # Number of threads decoding the images, None for one per core
+    generalParameters['AssetManifestFile'] = 'data/sprite_cache/asset_manifest.json'   # Images loaded by the sprite objects on the last start, requested at once on the next start
 
 
     ##
     # Background pictures
     generalParameters['BackgroundScalePictures'] = True
     generalParameters['BackgroundPictureFormats'] = ['.png', '.jpeg', '.jpg']
+    generalParameters['BackgroundImageCacheSize'] = 3     # Number of scaled background pictures kept in the display format
     
 
     ##
@@ -84,6 +106,8 @@ def loadGeneralParameters() -> Dict:
     generalParameters['ShieldMaxLevel'] = 6         # Maximal available shield level
     generalParameters['ShieldMultAlpha'] = 230
     generalParameters['ZoltanShieldMaxHealth'] = 5
+    generalParameters['ShieldRechargeTimeSeconds'] = 2  # Time to recharge one shield layer after it was hit
+    generalParameters['ShieldEllipseMarginPixels'] = 30 # Distance between the rooms and the shield ellipse when no shield sprite defines it
     
     # Oxygen
     generalParameters['MinOxygenPrzNecessary'] = 5  # Minimal oxygen level without taking damage
@@ -91,7 +115,7 @@ def loadGeneralParameters() -> Dict:
     generalParameters['OxygenLevel1'] = 2       # 2% oxygen gets refilled per second
     generalParameters['OxygenLossGeneral'] = 1  # 1% oxygen gets lost per second
     generalParameters['OxygenLossSpace'] = 500  # 500% oxygen gets lost to space if a room to space is open
-    generalParameters['OxygenLossBreach'] = 3
+    generalParameters['OxygenLossBreach'] = 3   # 3% oxygen gets lost per second and hull breach
     
     generalParameters['OxygenEquilibriumSpeed'] = 1.6
     
@@ -101,6 +125,10 @@ def loadGeneralParameters() -> Dict:
     
     generalParameters['WeaponDepowerRate'] = 2  # Factor how much faster weapons will depower than power up
     
+    generalParameters['ProjectilePoolSize'] = 64    # Initial number of slots for flying projectiles, the pool grows if needed
+    generalParameters['ProjectileFramesPerSecond'] = 10 # Speed of the projectile animations
+    generalParameters['ProjectileSpawnDistancePixels'] = 100    # Distance outside the shields of the target at which projectiles appear
+    
     # Systems
     generalParameters['MainSystems'] = ['Shields', 'Engines', 'Oxygen', 'WeaponControl', 'DroneControl', 'Medbay', 'CrewTeleporter', 'Cloaking', 'Artillery', 'Clonebay', 'MindControl', 'Hacking']
     generalParameters['SubSystems'] = ['Piloting', 'Sensors', 'DoorSystem', 'BackupBattery']
@@ -132,11 +160,18 @@ def loadGeneralParameters() -> Dict:
     generalParameters['UiEnergyBarsOffset'] = np.array([24, 14])
     generalParameters['UiEnergySymbolsMaxDistance'] = 13
     
+    # Clickable elements
+    generalParameters['HitTestCellSize'] = 35   # Edge length of the grid cells in pixels used to find the clicked element
+    generalParameters['HitTestPriorities'] = {'Systems': 3, 'Crew': 2, 'Doors': 1, 'Rooms': 0}   # Elements of higher priority are selected over overlapping elements
+    
     
     ##
     # Texts
     generalParameters['TextFont'] = 'lucidaconsole'
     generalParameters['PauseOffsetY'] = 550
+    
+    # Loading screen
+    generalParameters['LoadingBarRect'] = (440, 600, 400, 12)  # Loading bar shown while the images are decoded as (x, y, width, height)
 
     
     
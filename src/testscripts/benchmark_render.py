@@ -0,0 +1,413 @@
+###
+#
+# Headless benchmark for the screen update. This script assumes that the working directory is at the root folder of the project
+# The game is started with the SDL dummy drivers and synthetic stand-in images, so neither a window nor the FTL data is needed
+#
+# Usage:
+#   python src/testscripts/benchmark_render.py
+#   python src/testscripts/benchmark_render.py --frames 1000 --scenarios Idle DoorStorm
+#   python src/testscripts/benchmark_render.py --save baseline.json
+#   python src/testscripts/benchmark_render.py --compare baseline.json --tolerance 0.2
+#
+###
+
+
+###
+# Load packages
+
+# OS
+import os, sys
+
+# Run without a window and without sound. Has to be set before pygame is initialized
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
+# Logging
+import logging
+
+# Typing
+from typing import Dict, List
+
+# Command line arguments
+import argparse
+
+# Timing
+import time
+
+# Storing and reading results
+import json
+
+# Checksums for the synthetic image colors
+import zlib
+
+# Pygame
+import pygame
+
+# Arrays and matrices
+import numpy as np
+
+
+###
+# Set main game directory and system path variable if necessary
+if '__file__' in dir():
+    os.chdir(os.path.abspath(__file__).replace('\\', '/').split('/src/')[0])
+    sys.path.append(os.getcwd())
+
+
+###
+# Load ressources
+
+# Gameplay ressources
+import src.gameplay.setup_gameplay as setup
+
+# Background images
+import src.classes.setup.background_images as backgroundImages
+
+# Ships
+import src.classes.ships.player_ship as playerShip
+import src.classes.ships.enemy_ship as enemyShip
+
+# Screen update
+import src.classes.screen.update_screen as updateScreen
+
+# Animations
+import src.classes.animations.animation_scheduler as animationScheduler
+
+
+###
+# Setup logging
+logger = logging.getLogger(__name__)
+
+
+###
+# Synthetic images
+
+##
+# Sizes of the stand-in images, selected by the first keyword found in the image path. Roughly the sizes of the original FTL images
+syntheticImageSizes = [
+    ('strip12', (12 * 20, 40)),         # Weapon sprite sheets
+    ('strip4', (4 * 40, 20)),           # Projectile sprite sheets
+    ('box_hostiles', (300, 400)),       # Enemy box
+    ('shields', (500, 300)),            # Player and enemy shields
+    ('_base', (600, 400)),              # Ship hulls
+    ('_gib', (150, 150)),               # Ship gibs
+    ('cloak', (600, 400)),              # Ship cloaks
+    ('wireUI', (30, 40)),               # Energy ui
+    ('interior', (70, 70)),             # Room and console images
+    ]
+
+
+##
+# Replacement for pygame.image.load
+def loadSyntheticImage(path: str, *args, **kwargs) -> pygame.Surface:
+    """
+    
+    Returns a semi-transparent surface with a color derived from the path instead of loading the image, so each image is distinguishable and the results are reproducible.
+    
+    """
+    
+    ###
+    # Select the size
+    path = str(path)
+    
+    imageSize = (32, 32)
+    for keyword, size in syntheticImageSizes:
+        if keyword in path:
+            imageSize = size
+            break
+    
+    
+    ###
+    # Create the image
+    checksum = zlib.crc32(path.encode())
+    
+    image = pygame.Surface(imageSize, pygame.SRCALPHA)
+    image.fill((checksum & 255, (checksum >> 8) & 255, (checksum >> 16) & 255, 200))
+    
+    return(image)
+
+
+###
+# Setup of the game objects
+
+##
+# Load everything which is shared between the scenarios
+def setupBenchmark() -> Dict:
+    logger.info('Setup the game with synthetic images')
+    
+    ###
+    # Replace the image loading
+    pygame.image.load = loadSyntheticImage
+    
+    
+    ###
+    # Load the parameters, without background pictures a black background is used
+    parameters = setup.loadAllParameters()
+    parameters['General']['PathFoldersBackgroundPictures'] = list()
+    parameters['General']['SpriteCache'] = False
+    parameters['General']['AssetManifestFile'] = None
+    
+    
+    ###
+    # Start the display and load the sprites
+    benchmark = dict()
+    benchmark['Parameters'] = parameters
+    benchmark['Screen'] = setup.screenSetup(parameters)
+    benchmark['BackgroundImages'] = backgroundImages.backgroundImages(parameters)
+    benchmark['SpritesAll'] = setup.loadAllSprites(parameters)
+    
+    
+    ###
+    # Time step per frame in milliseconds
+    benchmark['dt'] = int(1000 / parameters['General']['MaxFramerate']) if parameters['General']['MaxFramerate'] else 16
+    
+    return(benchmark)
+
+
+##
+# Create fresh ships and screen update for a scenario
+def setupScenario(benchmark: Dict, enemyPresent: bool) -> Dict:
+    ###
+    # Fix the random selections (background image)
+    np.random.seed(0)
+    
+    
+    ###
+    # Ships
+    game = dict()
+    game['PlayerShip'] = playerShip.playerShip(benchmark['Parameters'], benchmark['SpritesAll'])
+    game['PlayerShip'].shipSetup()
+    game['PlayerShip'].moveRectsForBattle(True)
+    
+    if enemyPresent:
+        game['EnemyShip'] = enemyShip.enemyShip(benchmark['Parameters'], benchmark['SpritesAll'])
+        game['EnemyShip'].shipSetup()
+    else:
+        game['EnemyShip'] = None
+    
+    
+    ###
+    # Screen update and animations, draw the first frame completely
+    game['ScreenUpdate'] = updateScreen.updateScreen(benchmark['Screen'], benchmark['BackgroundImages'], game['PlayerShip'], game['EnemyShip'], benchmark['SpritesAll'], benchmark['Parameters'])
+    game['ScreenUpdate'].drawScreen(redrawEnergyUi = True)
+    
+    game['AnimationsPlayerShip'] = setup.loadAllAnimations(benchmark['Parameters'], game['PlayerShip'])
+    game['Animations'] = animationScheduler.animationScheduler()
+    
+    return(game)
+
+
+###
+# Scenarios. Every scenario changes the game state for one frame like the game loop would and returns whether the energy ui has to be redrawn
+
+##
+# Nothing changes
+def scenarioIdle(game: Dict, frame: int, dt: int) -> bool:
+    return(False)
+
+
+##
+# All player doors are opened and closed continuously
+def scenarioDoorStorm(game: Dict, frame: int, dt: int) -> bool:
+    ship = game['PlayerShip']
+    
+    # Restart finished animations in the other direction
+    for doorKey, animation in game['AnimationsPlayerShip']['Doors'].items():
+        if not game['Animations'].isRunning('Doors', doorKey):
+            game['Animations'].startAnimation('Doors', doorKey, animation, True)
+    
+    changedAnimations = game['Animations'].update(dt)
+    if 'Doors' in changedAnimations:
+        ship.updateDoors(changedAnimations['Doors'])
+        ship.updateDoorConnectivity(changedAnimations['Doors'])
+    
+    return(False)
+
+
+##
+# All doors including the airlocks are open and the oxygen is vented into space. The rooms are refilled once they are empty
+def scenarioBreachVenting(game: Dict, frame: int, dt: int) -> bool:
+    ship = game['PlayerShip']
+    
+    ###
+    # Open all doors with the first frame
+    if frame == 0:
+        for doorKey, door in ship.doors.items():
+            door.currentPosition = door.maximumPixel
+            door.selectSprite()
+            ship.updateDoor(doorKey)
+        
+        ship.updateRoomConnectivityOpenDoors()
+    
+    
+    ###
+    # Vent the oxygen
+    ship.updateOxygen(dt)
+    
+    
+    ###
+    # Refill empty ships
+    if all([ship.rooms[roomKey].oxygen == 0 for roomKey in ship.presentRooms]):
+        for roomKey in ship.presentRooms:
+            ship.rooms[roomKey].oxygen = 100
+            ship.rooms[roomKey].selectSprite()
+            ship.updateRoom(roomKey)
+    
+    return(False)
+
+
+##
+# Power is removed from and added to the systems every frame
+def scenarioPowerSpam(game: Dict, frame: int, dt: int) -> bool:
+    ship = game['PlayerShip']
+    
+    # Systems with power handling, cycle through them
+    systems = [system for system in sorted(ship.systemsPresent) if system not in ['WeaponControl', 'DroneControl'] and ship.systems[system]['PowerMax']]
+    system = systems[(frame // 2) % len(systems)]
+    
+    if frame % 2:
+        ship.addSystemPower(system)
+    else:
+        ship.removeSystemPower(system)
+    
+    return(True)
+
+
+##
+# Enemy ship is shown and its rooms change every frame, the oxygen of both ships is updated like in the game loop
+def scenarioEnemyPresent(game: Dict, frame: int, dt: int) -> bool:
+    ship = game['EnemyShip']
+    
+    ###
+    # Change one enemy room per frame
+    roomKey = ship.presentRooms[frame % len(ship.presentRooms)]
+    ship.rooms[roomKey].oxygen = (frame * 7) % 100
+    ship.rooms[roomKey].selectSprite()
+    ship.updateRoom(roomKey)
+    
+    
+    ###
+    # Oxygen updates
+    game['PlayerShip'].updateOxygen(dt)
+    ship.updateOxygen(dt)
+    
+    return(False)
+
+
+##
+# All scenarios with the functions and whether the enemy ship is shown
+scenarios = {
+    'Idle': (scenarioIdle, False),
+    'DoorStorm': (scenarioDoorStorm, False),
+    'BreachVenting': (scenarioBreachVenting, False),
+    'PowerSpam': (scenarioPowerSpam, False),
+    'EnemyPresent': (scenarioEnemyPresent, True),
+    }
+
+
+###
+# Run and evaluate
+
+##
+# Run a scenario and return the time of drawScreen() for every frame in milliseconds
+def runScenario(benchmark: Dict, scenarioName: str, frames: int, warmupFrames: int) -> np.ndarray:
+    logger.info('Run scenario {}'.format(scenarioName))
+    
+    scenarioFunction, enemyPresent = scenarios[scenarioName]
+    game = setupScenario(benchmark, enemyPresent)
+    
+    ###
+    # Run the frames, only the drawing is timed
+    frameTimes = list()
+    for frame in range(warmupFrames + frames):
+        redrawEnergyUi = scenarioFunction(game, frame, benchmark['dt'])
+        
+        timeStart = time.perf_counter()
+        game['ScreenUpdate'].drawScreen(redrawEnergyUi = redrawEnergyUi)
+        timeEnd = time.perf_counter()
+        
+        if frame >= warmupFrames:
+            frameTimes.append((timeEnd - timeStart) * 1000)
+    
+    return(np.array(frameTimes))
+
+
+##
+# Statistics of the frame times
+def evaluateFrameTimes(frameTimes: np.ndarray) -> Dict:
+    results = {'Mean': float(np.mean(frameTimes)), 'Max': float(np.max(frameTimes))}
+    for percentile in [50, 90, 95, 99]:
+        results['P' + str(percentile)] = float(np.percentile(frameTimes, percentile))
+    
+    return(results)
+
+
+##
+# Compare the results to a saved baseline. Returns the names of the regressed scenarios
+def compareToBaseline(results: Dict, baseline: Dict, tolerance: float, statistic: str = 'P95') -> List:
+    regressions = list()
+    for scenarioName in results.keys():
+        if scenarioName not in baseline:
+            continue
+        
+        if results[scenarioName][statistic] > baseline[scenarioName][statistic] * (1 + tolerance):
+            regressions.append(scenarioName)
+    
+    return(regressions)
+
+
+###
+# Main routine
+if __name__ == "__main__":
+    ###
+    # Command line arguments
+    parser = argparse.ArgumentParser(description = 'Headless benchmark of the screen update')
+    parser.add_argument('--frames', type = int, default = 300, help = 'Number of timed frames per scenario')
+    parser.add_argument('--warmup', type = int, default = 30, help = 'Number of untimed frames before the timing starts')
+    parser.add_argument('--scenarios', nargs = '+', choices = list(scenarios.keys()), default = list(scenarios.keys()), help = 'Scenarios to run')
+    parser.add_argument('--save', default = None, help = 'Save the results as json to this file')
+    parser.add_argument('--compare', default = None, help = 'Compare the results to a json file saved before, exits with 1 if a scenario regressed')
+    parser.add_argument('--tolerance', type = float, default = 0.2, help = 'Allowed relative increase of the p95 frame time when comparing')
+    parser.add_argument('--verbose', action = 'store_true', help = 'Show the debug output of the game')
+    arguments = parser.parse_args()
+    
+    logging.basicConfig(level = logging.DEBUG if arguments.verbose else logging.WARNING)
+    
+    
+    ###
+    # Run all scenarios
+    benchmark = setupBenchmark()
+    
+    results = dict()
+    for scenarioName in arguments.scenarios:
+        results[scenarioName] = evaluateFrameTimes(runScenario(benchmark, scenarioName, arguments.frames, arguments.warmup))
+    
+    pygame.quit()
+    
+    
+    ###
+    # Print the results
+    statistics = ['Mean', 'P50', 'P90', 'P95', 'P99', 'Max']
+    
+    print('Frame times of drawScreen() in ms, {} frames per scenario'.format(arguments.frames))
+    print('{:<16}'.format('Scenario') + ''.join(['{:>9}'.format(statistic) for statistic in statistics]))
+    for scenarioName, scenarioResults in results.items():
+        print('{:<16}'.format(scenarioName) + ''.join(['{:>9.3f}'.format(scenarioResults[statistic]) for statistic in statistics]))
+    
+    
+    ###
+    # Save and compare
+    if arguments.save is not None:
+        with open(arguments.save, 'w') as resultsFile:
+            json.dump(results, resultsFile, indent = 4)
+    
+    if arguments.compare is not None:
+        with open(arguments.compare, 'r') as baselineFile:
+            baseline = json.load(baselineFile)
+        
+        regressions = compareToBaseline(results, baseline, arguments.tolerance)
+        if len(regressions):
+            print('P95 frame time regressed by more than {}% for: {}'.format(round(arguments.tolerance * 100), ', '.join(regressions)))
+            sys.exit(1)
+        
+        print('No regressions compared to {}'.format(arguments.compare))
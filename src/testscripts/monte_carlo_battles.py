@@ -0,0 +1,152 @@
+###
+#
+# Run many seeded headless battles in parallel and print the outcome statistics. This script assumes that the working directory is at the root folder of the project
+# Neither a window nor the FTL data is needed
+#
+# Usage:
+#   python src/testscripts/monte_carlo_battles.py --battles 1000
+#   python src/testscripts/monte_carlo_battles.py --enemy-weapons BasicLaser BasicLaser --override BasicLaser:BreachChance=0.2
+#   python src/testscripts/monte_carlo_battles.py --sweep BasicLaser:CooldownSeconds=6,8,10,12 --save sweep.json
+#
+###
+
+
+###
+# Load packages
+
+# OS
+import os, sys
+
+# Logging
+import logging
+
+# Typing
+from typing import Dict
+
+# Command line arguments
+import argparse
+
+# Timing
+import time
+
+# Storing the results
+import json
+
+
+###
+# Set main game directory and system path variable if necessary
+if '__file__' in dir():
+    os.chdir(os.path.abspath(__file__).replace('\\', '/').split('/src/')[0])
+    sys.path.append(os.getcwd())
+
+
+###
+# Load ressources
+
+# Gameplay ressources
+import src.gameplay.setup_gameplay as setup
+import src.gameplay.battle_monte_carlo as battleMonteCarlo
+
+
+###
+# Setup logging
+logger = logging.getLogger(__name__)
+
+
+###
+# Functions
+
+##
+# Parse weapon parameter arguments of the form Weapon:Parameter=Value[,Value...]
+def parseWeaponParameter(argument: str) -> tuple:
+    weaponName, assignment = argument.split(':', 1)
+    parameterName, values = assignment.split('=', 1)
+    
+    return(weaponName, parameterName, [float(value) for value in values.split(',')])
+
+
+##
+# Print the aggregated outcomes
+def printOutcomes(label: str, results: Dict) -> None:
+    winners = ', '.join(['{winner} {share:.1%}'.format(winner = winner, share = share) for winner, share in results['Winner'].items()])
+    print('{label}: {battles} battles, {winners}'.format(label = label, battles = results['Battles'], winners = winners))
+    
+    if results['TimeToKillSeconds'] is not None:
+        print('    Time to kill in s: ' + ', '.join(['{} {:.1f}'.format(statistic, value) for statistic, value in results['TimeToKillSeconds'].items()]))
+    
+    for statistic in ['HullRemaining', 'OxygenMinimum']:
+        print('    {statistic}: '.format(statistic = statistic) + ', '.join(['{ship} mean {mean:.1f} min {min:.1f}'.format(ship = shipKey, mean = values['Mean'], min = values['Min']) for shipKey, values in results[statistic].items()]))
+
+
+###
+# Main routine
+if __name__ == "__main__":
+    ###
+    # Command line arguments
+    parser = argparse.ArgumentParser(description = 'Monte Carlo simulation of headless battles')
+    parser.add_argument('--battles', type = int, default = 200, help = 'Number of battles (per sweep value)')
+    parser.add_argument('--seed', type = int, default = 0, help = 'Seed of the first battle, the following battles use the next seeds')
+    parser.add_argument('--workers', type = int, default = None, help = 'Number of worker processes, defaults to the number of cores')
+    parser.add_argument('--player-ship', nargs = 2, default = list(battleMonteCarlo.defaultBattleSettings['PlayerShip']), help = 'Ship and variant of the player')
+    parser.add_argument('--enemy-ship', nargs = 2, default = list(battleMonteCarlo.defaultBattleSettings['EnemyShip']), help = 'Ship and variant of the enemy')
+    parser.add_argument('--player-weapons', nargs = '*', default = None, help = 'Weapons of the player, defaults to the initial weapons of the ship')
+    parser.add_argument('--enemy-weapons', nargs = '*', default = ['BasicLaser'], help = 'Weapons of the enemy')
+    parser.add_argument('--override', action = 'append', default = list(), help = 'Changed weapon parameter as Weapon:Parameter=Value, can be repeated')
+    parser.add_argument('--sweep', default = None, help = 'Weapon parameter to sweep as Weapon:Parameter=Value1,Value2,...')
+    parser.add_argument('--max-duration', type = float, default = battleMonteCarlo.defaultBattleSettings['MaxDurationSeconds'], help = 'Maximal battle duration in seconds')
+    parser.add_argument('--time-step', type = int, default = None, help = 'Simulation time step in milliseconds')
+    parser.add_argument('--save', default = None, help = 'Save the aggregated results as json to this file')
+    parser.add_argument('--verbose', action = 'store_true', help = 'Show the info output of the main process')
+    arguments = parser.parse_args()
+    
+    logging.basicConfig(level = logging.INFO if arguments.verbose else logging.ERROR)
+    
+    
+    ###
+    # Battle settings
+    battleSettings = dict()
+    battleSettings['PlayerShip'] = tuple(arguments.player_ship)
+    battleSettings['EnemyShip'] = tuple(arguments.enemy_ship)
+    battleSettings['PlayerWeapons'] = arguments.player_weapons
+    battleSettings['EnemyWeapons'] = arguments.enemy_weapons
+    battleSettings['MaxDurationSeconds'] = arguments.max_duration
+    battleSettings['TimeStep'] = arguments.time_step
+    
+    battleSettings['WeaponOverrides'] = dict()
+    for override in arguments.override:
+        weaponName, parameterName, values = parseWeaponParameter(override)
+        battleSettings['WeaponOverrides'].setdefault(weaponName, dict())[parameterName] = values[0]
+    
+    parameters = setup.loadAllParameters()
+    seeds = battleMonteCarlo.createSeeds(arguments.battles, arguments.seed)
+    
+    
+    ###
+    # Run the battles
+    startTime = time.perf_counter()
+    
+    if arguments.sweep is None:
+        outcomes = battleMonteCarlo.runBattles(parameters, battleSettings, seeds, arguments.workers)
+        results = {'All': battleMonteCarlo.aggregateOutcomes(outcomes)}
+        battleSeconds = sum([outcome['TimeSeconds'] for outcome in outcomes])
+    
+    else:
+        weaponName, parameterName, values = parseWeaponParameter(arguments.sweep)
+        sweepResults = battleMonteCarlo.sweepWeaponParameter(parameters, battleSettings, weaponName, parameterName, values, seeds, arguments.workers)
+        results = {'{weapon} {parameter} = {value}'.format(weapon = weaponName, parameter = parameterName, value = value): valueResults for value, valueResults in sweepResults.items()}
+        battleSeconds = None
+    
+    wallSeconds = time.perf_counter() - startTime
+    
+    
+    ###
+    # Print and save the results
+    for label, labelResults in results.items():
+        printOutcomes(label, labelResults)
+    
+    print('Simulated {battles} battles in {seconds:.1f} s'.format(battles = sum([labelResults['Battles'] for labelResults in results.values()]), seconds = wallSeconds) +
+          (', {:.0f} battle seconds per second'.format(battleSeconds / wallSeconds) if battleSeconds is not None else ''))
+    
+    if arguments.save is not None:
+        with open(arguments.save, 'w') as resultsFile:
+            json.dump(results, resultsFile, indent = 4)
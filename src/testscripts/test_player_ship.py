@@ -62,15 +62,16 @@ if __name__ == "__main__":
     
     
     ###
-    # Load pictures and sprites
+    # Load pictures and sprites, the progress is shown as loading bar
+    loadingProgress = setup.createLoadingProgressCallback(screen, parameters)
     
     ##
-    # Load the background images
+    # Index the background images, they are loaded when selected
     allBackgroundImages = backgroundImages.backgroundImages(parameters)
     
     ##
     # Load the sprites
-    spritesAll = setup.loadAllSprites(parameters)
+    spritesAll = setup.loadAllSprites(parameters, loadingProgress)
     
     
     ###
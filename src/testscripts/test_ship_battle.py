@@ -2,6 +2,11 @@
 #
 # Test script for the player ship only. This script assumes that the working directory is at the root folder of the project
 #
+# Usage:
+#   python src/testscripts/test_ship_battle.py
+#   python src/testscripts/test_ship_battle.py --record session.bin
+#   python src/testscripts/test_ship_battle.py --replay session.bin
+#
 ###
 
 
@@ -14,6 +19,12 @@ import os, sys
 # Logging
 import logging
 
+# Command line arguments
+import argparse
+
+# Time stamps for the recording files
+import time
+
 # Pygame
 import pygame
 
@@ -45,6 +56,9 @@ import src.classes.ships.enemy_ship as enemyShip
 # Screen update
 import src.classes.screen.update_screen as updateScreen
 
+# Input recording and replay
+import src.misc.input_recording as inputRecording
+
 
 ###
 # Setup logging
@@ -57,6 +71,19 @@ logging.basicConfig(level = logging.DEBUG)
 ###
 # Main routine
 if __name__ == "__main__":
+    ###
+    # Command line arguments
+    parser = argparse.ArgumentParser(description = 'Battle between the player and an enemy ship')
+    parser.add_argument('--record', nargs = '?', const = '', default = None, help = 'Record the input to this file, without a file name to the InputRecordingFile of the general parameters')
+    parser.add_argument('--replay', default = None, help = 'Replay a recorded input file without a window and as fast as possible')
+    arguments = parser.parse_args()
+    
+    # The replay runs without a window and without sound. Has to be set before pygame is initialized
+    if arguments.replay is not None:
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    
+    
     ###
     # Load values and parameters from files
     parameters = setup.loadAllParameters()
@@ -73,15 +100,16 @@ if __name__ == "__main__":
     
     
     ###
-    # Load pictures and sprites
+    # Load pictures and sprites, the progress is shown as loading bar
+    loadingProgress = setup.createLoadingProgressCallback(screen, parameters)
     
     ##
-    # Load the background images
+    # Index the background images, they are loaded when selected
     allBackgroundImages = backgroundImages.backgroundImages(parameters)
     
     ##
     # Load the sprites
-    spritesAll = setup.loadAllSprites(parameters)
+    spritesAll = setup.loadAllSprites(parameters, loadingProgress)
     
     
     ###
@@ -123,9 +151,20 @@ if __name__ == "__main__":
     
     
     
+    ###
+    # Input recording or replay
+    inputRecorder = None
+    if arguments.record is not None:
+        inputRecorder = inputRecording.inputRecorder(arguments.record or parameters['General']['InputRecordingFile'].format(time = time.strftime('%Y%m%d_%H%M%S')), parameters['General']['SimulationTimeStep'])
+    
+    inputReplay = None
+    if arguments.replay is not None:
+        inputReplay = inputRecording.inputReplay(arguments.replay)
+    
+    
     ###
     # Game loop
-    gameLoop.mainGameplayLoop(activeScreenUpdate, parameters, keyBindings, activePlayerShip, activeEnemyShip, animationsPlayerShip)
+    gameLoop.mainGameplayLoop(activeScreenUpdate, parameters, keyBindings, activePlayerShip, activeEnemyShip, animationsPlayerShip, inputRecorder = inputRecorder, inputReplay = inputReplay)
 
 
     ###